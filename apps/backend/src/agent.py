@@ -1,11 +1,13 @@
-from typing import Deque, Tuple, List, Optional
+from typing import Any, Deque, Dict, Tuple, List, Optional, Union
+import copy
 import torch
 import torch.nn as nn
 from collections import deque
 import random
 import numpy as np
 from game import Game
-from model import LinearQNet, QTrainer
+from model import ConvQNet, LinearQNet, QNetwork, QTrainer
+from observation import NUM_CHANNELS, GridEncoder
 
 
 # Define constants for the DQN agent
@@ -16,6 +18,43 @@ GAMMA = 0.9  # Discount factor for future rewards
 EPSILON_START = 80  # Starting exploration rate (80% random actions)
 EPSILON_MIN = 0  # Minimum exploration rate
 EPSILON_DECAY = 80  # How quickly epsilon decays
+TARGET_UPDATE = 0  # Training steps between target-network syncs (0 = no target network)
+GRID_MAX_MEMORY = 20_000  # Smaller replay memory for grid observations (each state is a board image)
+GRID_MEMORY_BYTES = 64 * 1024 * 1024  # Board images one agent's replay memory may hold (caps it on large boards)
+
+# Reward shaping (see calculate_reward)
+REWARD_CLOSER = 1  # Moving closer to food
+REWARD_AWAY = -1.5  # Moving away from food
+REWARD_FOOD = 10  # Eating food
+REWARD_DEATH = -10  # Dying
+
+
+def new_model(observation: str) -> QNetwork:
+    """A freshly initialized network for an observation mode."""
+    if observation == "grid":
+        # Conv network: board image (4 planes) -> 3 Q-values
+        return ConvQNet(NUM_CHANNELS, 3)
+    # Neural network: 13 inputs -> 256 hidden -> 3 outputs
+    # 13 inputs: danger signals (3), current direction (4), food direction (4), distances (2)
+    # 3 outputs: Q-values for [straight, right, left]
+    return LinearQNet(13, 256, 3)
+
+
+# Untrained networks shared by every new agent, one per observation mode
+_initial_models: Dict[str, QNetwork] = {}
+
+
+def initial_model(observation: str) -> QNetwork:
+    """
+    The shared starting network for an observation mode.
+
+    New agents read from this network until their first training update,
+    when they take a private copy (see DQN.own_model). Thousands of idle
+    sessions then cost one network instead of thousands.
+    """
+    if observation not in _initial_models:
+        _initial_models[observation] = new_model(observation)
+    return _initial_models[observation]
 
 
 class DQN:
@@ -27,30 +66,151 @@ class DQN:
     and penalties for bad actions (hitting walls or itself).
     """
 
-    def __init__(self) -> None:
-        """Initialize the DQN agent with all necessary components."""
+    def __init__(
+        self,
+        target_update: int = TARGET_UPDATE,
+        tau: Optional[float] = None,
+        double: bool = False,
+        observation: str = "features",
+        max_memory: Optional[int] = None,
+        batch_size: int = BATCH_SIZE,
+        lr: float = LR,
+        gamma: float = GAMMA,
+        epsilon_start: float = EPSILON_START,
+        epsilon_min: float = EPSILON_MIN,
+        epsilon_decay: float = EPSILON_DECAY,
+        reward_closer: float = REWARD_CLOSER,
+        reward_away: float = REWARD_AWAY,
+        reward_food: float = REWARD_FOOD,
+        reward_death: float = REWARD_DEATH,
+        share_model: bool = True,
+    ) -> None:
+        """
+        Initialize the DQN agent with all necessary components.
+
+        Every hyperparameter defaults to the constant of the same name at the
+        top of this file, so ``DQN()`` is the standard agent and sweeps can
+        override any of them.
+
+        Args:
+            target_update: Training steps between target-network syncs
+                (0 = compute targets with the model being trained)
+            tau: Polyak averaging rate for the target network instead of
+                periodic syncs (e.g. 0.005)
+            double: Use Double DQN targets (requires a target network)
+            observation: "features" for the 13-feature vector and LinearQNet,
+                or "grid" for a whole-board image and ConvQNet
+            max_memory: Replay memory size (default depends on observation)
+            batch_size: Experiences per long-memory training batch
+            lr: Learning rate for the neural network
+            gamma: Discount factor for future rewards
+            epsilon_start: Exploration rate of the first game (out of 200)
+            epsilon_min: Exploration rate never goes below this
+            epsilon_decay: Games it takes epsilon to fall from start to 0
+            reward_closer, reward_away, reward_food, reward_death: Reward
+                shaping used by calculate_reward
+            share_model: Start from the shared untrained network (copied on
+                the first training update) instead of fresh random weights
+        """
         # Training statistics
         self.n_games = 0
         self.total_score = 0
         self.record = 0
         
         # Epsilon-greedy exploration parameters
-        self.epsilon = EPSILON_START
+        self.epsilon_start = epsilon_start
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.epsilon = epsilon_start
+        self.epsilon_origin = 0  # Game count the decay starts from (a curriculum restarts it per stage)
+        
+        # Training and reward settings
+        self.batch_size = batch_size
+        self.reward_closer = reward_closer
+        self.reward_away = reward_away
+        self.reward_food = reward_food
+        self.reward_death = reward_death
+        
+        # What the agent sees: hand-made features or the whole board
+        if observation not in ("features", "grid"):
+            raise ValueError(f"Unknown observation mode: {observation}")
+        self.observation = observation
+        self.encoder: Optional[GridEncoder] = None
         
-        # Memory for experience replay (stores transitions)
-        self.memory: Deque[Tuple] = deque(maxlen=MAX_MEMORY)
+        # Last board image handed out by get_grid_state, and the encoder
+        # state it shows (see get_grid_state)
+        self.grid_frame: Optional[np.ndarray] = None
+        self.grid_key: Optional[Tuple[Any, int, Tuple[int, int]]] = None
         
-        # Neural network: 13 inputs -> 256 hidden -> 3 outputs
-        # 13 inputs: danger signals (3), current direction (4), food direction (4), distances (2)
-        # 3 outputs: Q-values for [straight, right, left]
-        self.model = LinearQNet(13, 256, 3)
-        self.trainer = QTrainer(self.model, lr=LR, gamma=GAMMA)
+        # Memory for experience replay (stores transitions).
+        # Allocated on the first remember(), so idle agents don't hold one.
+        self.max_memory = max_memory or (GRID_MAX_MEMORY if observation == "grid" else MAX_MEMORY)
+        self._memory: Optional[Deque[Tuple]] = None
+        
+        # Neural network, shared with other new agents until we train it
+        # (copy-on-write, see own_model)
+        if share_model:
+            self.model: QNetwork = initial_model(observation)
+            self.owns_model = False
+        else:
+            self.model = new_model(observation)
+            self.owns_model = True
+        
+        # The trainer (and its Adam state) is created with the private copy
+        self.trainer_options: Dict[str, Any] = {
+            "lr": lr, "gamma": gamma,
+            "target_update": target_update, "tau": tau, "double": double,
+        }
+        self._trainer: Optional[QTrainer] = None
         
         # Store previous distance for reward calculation
         self.prev_distance = None
         self.prev_length = 1
 
-    def get_state(self, game: Game) -> List[float]:
+    @property
+    def memory(self) -> Deque[Tuple]:
+        """Replay memory, created on first use."""
+        if self._memory is None:
+            self._memory = deque(maxlen=self.memory_limit())
+        return self._memory
+
+    @memory.setter
+    def memory(self, memory: Deque[Tuple]) -> None:
+        self._memory = memory
+
+    def memory_limit(self) -> int:
+        """
+        Experiences the replay memory may hold.
+
+        For grid observations this is also bounded by GRID_MEMORY_BYTES, at
+        one board image per experience (see get_grid_state), so memory use
+        doesn't grow with the board area.
+        """
+        if self.encoder is None:
+            return self.max_memory
+        frame_bytes = self.encoder.image.nbytes
+        return max(1, min(self.max_memory, GRID_MEMORY_BYTES // frame_bytes))
+
+    @property
+    def trainer(self) -> QTrainer:
+        """The model's trainer; first access gives the agent its own model."""
+        if self._trainer is None:
+            self.own_model()
+            self._trainer = QTrainer(self.model, **self.trainer_options)
+        return self._trainer
+
+    def own_model(self) -> None:
+        """
+        Replace the shared starting network with a private copy.
+
+        Must happen before anything changes the weights (training, loading
+        a saved model); reading (get_action, saving) works on the shared one.
+        """
+        if not self.owns_model:
+            self.model = copy.deepcopy(self.model)
+            self.owns_model = True
+
+    def get_state(self, game: Game) -> Union[List[float], np.ndarray]:
         """
         Extract the current state of the game as input features for the neural network.
 
@@ -59,7 +219,13 @@ class DQN:
         - Food direction relative to snake head (up, down, left, right)
         - Normalized distances to food
         - Current snake direction
+
+        In "grid" observation mode the state is the board image instead
+        (see get_grid_state).
         """
+        if self.observation == "grid":
+            return self.get_grid_state(game)
+        
         head = game.snake.head
         point_l = (head[0] - 1, head[1])
         point_r = (head[0] + 1, head[1])
@@ -143,6 +309,35 @@ class DQN:
         
         return state
 
+    def get_grid_state(self, game: Game) -> np.ndarray:
+        """
+        Render the board as a (4, height + 2, width + 2) uint8 image.
+
+        The encoder updates its image incrementally from the snake's last
+        move, so this is cheap even on large boards. A copy is returned
+        because the state is kept in replay memory. If nothing changed since
+        the previous call the previous copy is returned again, so the
+        next_state of one experience and the state of the following one
+        are a single array: replay memory holds one image per experience.
+        """
+        if (
+            self.encoder is None
+            or self.encoder.grid_width != game.grid_width
+            or self.encoder.grid_height != game.grid_height
+        ):
+            self.encoder = GridEncoder(game.grid_width, game.grid_height)
+            self.grid_frame = None
+            # A larger board fits fewer images into GRID_MEMORY_BYTES
+            limit = self.memory_limit()
+            if self._memory is not None and self._memory.maxlen != limit:
+                self._memory = deque(self._memory, maxlen=limit)
+        
+        key = (game.snake, game.snake.moves, game.food.position)
+        if self.grid_frame is None or key != self.grid_key:
+            self.grid_frame = self.encoder.encode(game).copy()
+            self.grid_key = key
+        return self.grid_frame
+
     def calculate_reward(self, game: Game, done: bool) -> int:
         """
         Calculate the reward for the current game state.
@@ -165,15 +360,15 @@ class DQN:
         # Distance-based rewards (encourage moving toward food)
         if self.prev_distance is not None:
             if current_distance < self.prev_distance:
-                reward += 1  # Moving closer to food
+                reward += self.reward_closer  # Moving closer to food
             elif current_distance > self.prev_distance:
-                reward -= 1.5  # Moving away from food
+                reward += self.reward_away  # Moving away from food
         
         self.prev_distance = current_distance
         
         # Big reward for eating food
         if len(game.snake.body) > self.prev_length:
-            reward += 10
+            reward += self.reward_food
             self.prev_distance = None  # Reset for new food
         
         # Store current length for next comparison
@@ -181,7 +376,7 @@ class DQN:
         
         # Big penalty for dying
         if done:
-            reward -= 10
+            reward += self.reward_death
             self.prev_distance = None
         
         return reward
@@ -199,9 +394,9 @@ class DQN:
 
     def train_long_memory(self) -> None:
         """Train the neural network on a batch of experiences from memory."""
-        if len(self.memory) > BATCH_SIZE:
+        if len(self.memory) > self.batch_size:
             # Sample a random batch from memory
-            mini_sample = random.sample(self.memory, BATCH_SIZE)
+            mini_sample = random.sample(self.memory, self.batch_size)
         else:
             # Use all available memory if less than batch size
             mini_sample = self.memory
@@ -234,9 +429,10 @@ class DQN:
         Actions: [1,0,0] = straight, [0,1,0] = turn right, [0,0,1] = turn left
         """
         # Decay epsilon over time (explore less as agent learns)
-        self.epsilon = EPSILON_START - self.n_games
-        if self.epsilon < EPSILON_MIN:
-            self.epsilon = EPSILON_MIN
+        games = self.n_games - self.epsilon_origin
+        self.epsilon = self.epsilon_start - games * self.epsilon_start / self.epsilon_decay
+        if self.epsilon < self.epsilon_min:
+            self.epsilon = self.epsilon_min
         
         # Initialize action array
         final_move = [0, 0, 0]
@@ -249,7 +445,8 @@ class DQN:
         else:
             # Best action from neural network (exploitation)
             state_tensor = torch.tensor(state, dtype=torch.float)
-            prediction = self.model(state_tensor)
+            with torch.no_grad():
+                prediction = self.model(state_tensor)
             move = torch.argmax(prediction).item()
             final_move[move] = 1
         
@@ -1,15 +1,32 @@
 import asyncio
+import math
+import os
 import time
+import numpy as np
 import socketio
+import torch
 from aiohttp import web
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from agent import DQN
+from arena import ARENA_HEIGHT, ARENA_WIDTH, MAX_ARENA_FOODS, MAX_ARENA_SIZE, MAX_ARENA_SNAKES, Arena, ArenaTrainer
+from board import LARGE_BOARD_CELLS, MINIMAP_EVERY, LargeGame, make_game
+from backpressure import HIGH_WATERMARK, FrameGate, flow_summary, outgoing_backlog
+from cluster import is_clustered, server_options
+from compute_pool import POOL_WORKERS, THREADS_PER_WORKER, ComputePool
+from eviction import PARK_WAIT, EvictionManager, new_token, public_run_id
+from fastpath import FASTPATH_ROUTE, fastpath_handler
 from game import Game
+from recorder import INDEX_RECORD, RECORDING_ID_PATTERN, RECORDINGS_DIR, EpisodeRecorder, RecordingReader, new_recording_id
+from simulation import TURBO_FRAME_TIME, RateMeter, TurboRunner, end_episode, play_step
+from spectators import SpectatorHub
+from stats_store import TOP_LIMIT, StatsStore
+from vecenv import VecEnv, pack_observations
 
 
 # Create SocketIO server with CORS settings
-sio = socketio.AsyncServer(cors_allowed_origins="*")
+# (under cluster.py, server_options() routes emits through the local queue)
+sio = socketio.AsyncServer(cors_allowed_origins="*", **server_options())
 
 # Create web application
 app = web.Application()
@@ -17,6 +34,31 @@ app = web.Application()
 # Attach socketio to the app
 sio.attach(app)
 
+# Spectator rooms: one broadcast per game, however many people watch it
+hub = SpectatorHub(sio)
+
+# Per-session flow control for game_update emits (keyed by sid)
+flow_gates: Dict[str, FrameGate] = {}
+
+# Define constants for replays of recorded episodes
+REPLAY_TICKS_PER_SECOND = 20  # Default replay speed
+REPLAY_MAX_FPS = 60  # Faster replays skip frames instead of sending more
+REPLAY_MAX_TICKS_PER_SECOND = 1000  # Fastest replay speed accepted
+
+# Running replays (keyed by the viewer's sid)
+replays: Dict[str, "asyncio.Task[None]"] = {}
+
+# Games of disconnected clients, kept (in RAM, then on disk) for a resume
+evictions = EvictionManager()
+
+# Pinned worker threads that run every session's heavy training work
+# (started by main, so importing this module has no side effects)
+compute = ComputePool()
+
+# Every finished game, written to ./stats.db in batches off the event loop
+# (started by main, like the compute pool)
+stats_store = StatsStore()
+
 
 # Basic health check endpoint
 async def handle_ping(request: Any) -> Any:
@@ -24,6 +66,109 @@ async def handle_ping(request: Any) -> Any:
     return web.json_response({"message": "pong"})
 
 
+async def handle_games(request: Any) -> Any:
+    """List live games that can be spectated, with their audience sizes"""
+    return web.json_response(hub.summary())
+
+
+async def handle_sessions(request: Any) -> Any:
+    """Flow control over all sessions: throttled sessions, strides and dropped frames"""
+    return web.json_response(flow_summary(list(flow_gates.values())))
+
+
+async def handle_recordings(request: Any) -> Any:
+    """Recorded sessions and how many episodes each holds"""
+    recordings = {}
+    if os.path.isdir(RECORDINGS_DIR):
+        for name in sorted(os.listdir(RECORDINGS_DIR)):
+            recording_id, extension = os.path.splitext(name)
+            if extension == ".idx":
+                size = os.path.getsize(os.path.join(RECORDINGS_DIR, name))
+                recordings[recording_id] = size // INDEX_RECORD.size
+    return web.json_response(recordings)
+
+
+async def handle_recording(request: Any) -> Any:
+    """Episodes of one recording: ticks, score, board size, start time"""
+    recording_id = request.match_info["recording_id"]
+    if not RECORDING_ID_PATTERN.match(recording_id):
+        raise web.HTTPNotFound()
+    try:
+        reader = RecordingReader(recording_id)
+    except FileNotFoundError:
+        raise web.HTTPNotFound()
+    try:
+        return web.json_response(reader.summary())
+    finally:
+        reader.close()
+
+
+async def handle_parked(request: Any) -> Any:
+    """Disconnected sessions kept for a resume: counts and memory use"""
+    return web.json_response(evictions.stats())
+
+
+async def handle_compute(request: Any) -> Any:
+    """Training pool: per-worker utilization, queue wait and backlog"""
+    return web.json_response(compute.stats())
+
+
+def query_int(request: Any, name: str, default: int) -> int:
+    """An integer query-string parameter (400 if it isn't one)"""
+    try:
+        return int(request.query.get(name, default))
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"{name} must be an integer")
+
+
+async def stats_response(query: Any, *args: Any) -> Any:
+    """Run a (cached) stats query off the event loop and send its JSON"""
+    body = await asyncio.get_running_loop().run_in_executor(None, query, *args)
+    return web.Response(body=body, content_type="application/json")
+
+
+async def handle_leaderboard(request: Any) -> Any:
+    """Best games ever played (?limit=10, optional ?model=)"""
+    return await stats_response(stats_store.leaderboard, query_int(request, "limit", 10), request.query.get("model"))
+
+
+async def handle_history(request: Any) -> Any:
+    """Latest games of one run (?run=<run_id from game_started>) or one model (?model=)"""
+    run = request.query.get("run")
+    model = request.query.get("model")
+    if run is None and model is None:
+        raise web.HTTPBadRequest(text="run or model is required")
+    return await stats_response(stats_store.history, run, model, query_int(request, "limit", TOP_LIMIT))
+
+
+async def handle_curve(request: Any) -> Any:
+    """Mean and best score over time (optional ?model=, ?since=<unix time>, ?buckets=)"""
+    try:
+        since = float(request.query.get("since", 0))
+    except ValueError:
+        raise web.HTTPBadRequest(text="since must be a number")
+    buckets = query_int(request, "buckets", 100)
+    return await stats_response(stats_store.curve, request.query.get("model"), since, buckets)
+
+
+async def handle_stats_writer(request: Any) -> Any:
+    """Stats store writer: games written, dropped, queued and flush time"""
+    return web.json_response(stats_store.stats())
+
+
+def store_game(session: Dict[str, Any], game: Game, agent: DQN, game_over_stats: Dict[str, Any]) -> None:
+    """Queue a finished game for the stats database (never blocks the loop)"""
+    stats_store.add(
+        session.get("run_id") or "",
+        session.get("model") or agent.observation,
+        game_over_stats["games"],
+        game_over_stats["score"],
+        game_over_stats["record"],
+        game.grid_width,
+        game.grid_height,
+    )
+
+
 @sio.event
 async def connect(sid: str, environ: Dict[str, Any]) -> None:
     """Handle client connections - called when a frontend connects to the server"""
@@ -53,6 +198,35 @@ async def disconnect(sid: str) -> None:
             # Mark session as inactive to stop game loop
             session["active"] = False
             await sio.save_session(sid, session)
+            
+            # Keep the training progress until the client comes back
+            # (the loop must finish its current step before we hand it over;
+            # one that doesn't stop in time is cancelled)
+            task = session.get("task")
+            if task is not None:
+                await asyncio.wait({task}, timeout=PARK_WAIT)
+                if not task.done():
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+            # A cancelled loop can leave its job running on the compute pool;
+            # a session's jobs run in order, so this no-op waits for it
+            await compute.run(sid, lambda: None)
+            if session.get("recorder") is not None:
+                # Keep the unfinished episode too
+                session["recorder"].close(session["game"])
+                session["recorder"] = None
+            if session.get("agent") is not None:
+                await evictions.park(session["resume_token"], session["game"], session["agent"], session.get("turbo", False))
+                session["game"] = session["agent"] = None
+
+        # Stop any replay, stop watching other games and end this client's own feed
+        stop_replay_task(sid)
+        await hub.remove_viewer(sid)
+        await hub.close(sid)
+        flow_gates.pop(sid, None)
+        if is_clustered(sio):
+            # The game this client watched may be owned by another worker
+            await sio.manager.forward("unwatch", viewer=sid)
     except Exception as e:
         print(f"[ERROR][disconnect] sid={sid} -> {e}")
 
@@ -69,20 +243,47 @@ async def start_game(sid: str, data: Dict[str, Any]) -> None:
         grid_width = data.get("grid_width")
         grid_height = data.get("grid_height")
         tick = data.get("game_tick")
+        turbo = bool(data.get("turbo"))
+        observation = data.get("observation", "features")
+        resume_token = data.get("resume_token")
+        record = bool(data.get("record"))
+        snakes = clamp_whole(data.get("snakes") or 1, "snakes", 1, MAX_ARENA_SNAKES)
         
-        # Create new game instance
-        game = Game()
+        # Several snakes on one board: a separate loop, see start_arena
+        if snakes > 1:
+            await start_arena(sid, session, data, snakes)
+            return
         
-        # Override defaults if provided
-        if grid_width:
-            game.grid_width = grid_width
-        if grid_height:
-            game.grid_height = grid_height
-        if tick:
-            game.game_tick = tick
+        # Pick up a previous session's game and agent if the client has one
+        resumed = await evictions.resume(resume_token) if resume_token else None
+        if resumed:
+            print(f"[START_GAME] sid={sid} resumed after {resumed['agent'].n_games} games")
+            game = resumed["game"]
+            agent = resumed["agent"]
+            turbo = resumed["turbo"]
+        else:
+            resume_token = new_token()
+            
+            # Create new game instance (boards over LARGE_BOARD_CELLS cells
+            # are sparse and only send the view around the head)
+            game = make_game(grid_width, grid_height)
+            if isinstance(game, LargeGame) and observation == "grid":
+                raise ValueError(f"The grid observation needs a board of at most {LARGE_BOARD_CELLS} cells")
+            
+            # Override defaults if provided
+            if tick:
+                game.game_tick = tick
+            
+            # Create DQN agent ("grid" observation = whole-board image + conv net)
+            agent = DQN(observation=observation)
         
-        # Create DQN agent
-        agent = DQN()
+        # Record every episode to ./recordings if asked to
+        if session.get("recorder") is not None:
+            session["recorder"].close()
+        recorder = None
+        if record:
+            recorder = EpisodeRecorder(new_recording_id())
+            recorder.begin(game)
         
         # Update session
         session["game"] = game
@@ -90,19 +291,124 @@ async def start_game(sid: str, data: Dict[str, Any]) -> None:
         session["active"] = True
         session["prev_state"] = None
         session["prev_action"] = None
+        session["turbo"] = turbo
+        session["resume_token"] = resume_token
+        session["run_id"] = public_run_id(resume_token)  # What the stats endpoints show
+        session["recorder"] = recorder
+        session["arena"] = None
+        session["model"] = data.get("model") or agent.observation  # Leaderboard label
         await sio.save_session(sid, session)
         
-        # Send initial game state to client
-        await sio.emit("game_started", game.to_dict(), to=sid)
+        # Make the game available to spectators under a public id
+        game_id = hub.open(sid, game)
+        
+        # Start sending every frame; the gate backs off if the client lags
+        flow_gates[sid] = FrameGate()
+        
+        # Send initial game state to client (game_id is what spectators join,
+        # resume_token is what the client sends back after a reconnect and
+        # must stay private; run_id is its public name in /stats)
+        initial_state = game.to_dict()
+        initial_state["game_id"] = game_id
+        initial_state["resume_token"] = resume_token
+        initial_state["run_id"] = session["run_id"]
+        initial_state["resumed"] = bool(resumed)
+        initial_state["recording_id"] = recorder.recording_id if recorder else None
+        initial_state["agent_stats"] = {"games": agent.n_games, "record": agent.record, "epsilon": agent.epsilon}
+        await sio.emit("game_started", initial_state, to=sid)
         
         # Start the game update loop in background
-        asyncio.create_task(update_game(sid))
+        # (turbo trains as fast as possible and only previews the game)
+        if turbo:
+            session["task"] = asyncio.create_task(update_game_turbo(sid))
+        else:
+            session["task"] = asyncio.create_task(update_game(sid))
+        await sio.save_session(sid, session)
         
     except Exception as e:
         print(f"[ERROR][start_game] sid={sid} -> {e}")
         await sio.emit("error", {"message": str(e)}, to=sid)
 
 
+def clamp_whole(value: Any, name: str, low: int, high: int) -> int:
+    """A client-supplied count, limited to [low, high] (ValueError unless a whole number)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value != int(value):
+        raise ValueError(f"{name} must be a whole number")
+    return max(low, min(int(value), high))
+
+
+async def start_arena(sid: str, session: Dict[str, Any], data: Dict[str, Any], snakes: int) -> None:
+    """
+    start_game with {"snakes": K}: K snakes share one board and one policy.
+    
+    Arenas have their own loop (update_arena) and are not recorded,
+    spectated, run in turbo mode, saved or kept after a disconnect.
+    """
+    foods = data.get("foods")
+    arena = Arena(
+        grid_width=clamp_whole(data.get("grid_width") or ARENA_WIDTH, "grid_width", 2, MAX_ARENA_SIZE),
+        grid_height=clamp_whole(data.get("grid_height") or ARENA_HEIGHT, "grid_height", 2, MAX_ARENA_SIZE),
+        snakes=snakes,
+        foods=None if foods is None else clamp_whole(foods, "foods", 1, MAX_ARENA_FOODS),
+    )
+    if data.get("game_tick"):
+        arena.game_tick = data["game_tick"]
+    trainer = ArenaTrainer(arena, DQN())
+    
+    # Replace whatever single game this client had
+    if session.get("recorder") is not None:
+        session["recorder"].close()
+    await hub.close(sid)
+    
+    # Update session
+    session["game"] = arena
+    session["agent"] = None  # Nothing to park on disconnect
+    session["arena"] = trainer
+    session["recorder"] = None
+    session["active"] = True
+    await sio.save_session(sid, session)
+    flow_gates[sid] = FrameGate()
+    
+    initial_state = arena.to_dict()
+    initial_state["game_id"] = None  # Arenas can't be spectated
+    initial_state["agent_stats"] = trainer.stats()
+    await sio.emit("game_started", initial_state, to=sid)
+    
+    session["task"] = asyncio.create_task(update_arena(sid))
+    await sio.save_session(sid, session)
+
+
+@sio.event
+async def spectate(sid: str, data: Dict[str, Any]) -> None:
+    """Watch another client's game (data: {"game_id": <game_id from /games>})"""
+    try:
+        game_id = data.get("game_id")
+        
+        if game_id and await hub.add_viewer(sid, game_id):
+            print(f"[SPECTATE] sid={sid} watching game_id={game_id}")
+        elif game_id and is_clustered(sio):
+            # Not ours: the worker that owns the game will add the viewer
+            await sio.manager.forward("spectate", viewer=sid, game_id=game_id)
+        else:
+            await sio.emit("error", {"message": f"No live game with id {game_id}"}, to=sid)
+            
+    except Exception as e:
+        print(f"[ERROR][spectate] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+
+
+@sio.event
+async def stop_spectating(sid: str, data: Dict[str, Any]) -> None:
+    """Stop watching whatever game this client is spectating"""
+    try:
+        await hub.remove_viewer(sid)
+        if is_clustered(sio):
+            await sio.manager.forward("unwatch", viewer=sid)
+    except Exception as e:
+        print(f"[ERROR][stop_spectating] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+
+
 @sio.event
 async def save_model(sid: str, data: Dict[str, Any]) -> None:
     """Save the current AI model to disk"""
@@ -110,7 +416,9 @@ async def save_model(sid: str, data: Dict[str, Any]) -> None:
         session = await sio.get_session(sid)
         agent = session.get("agent")
         
-        if agent:
+        if session.get("arena") is not None:
+            await sio.emit("error", {"message": "Arena games can't save models"}, to=sid)
+        elif agent:
             agent.model.save()
             await sio.emit("model_saved", {"message": "Model saved successfully"}, to=sid)
         else:
@@ -123,14 +431,23 @@ async def save_model(sid: str, data: Dict[str, Any]) -> None:
 
 @sio.event
 async def load_model(sid: str, data: Dict[str, Any]) -> None:
-    """Load a previously saved AI model"""
+    """Load a previously saved AI model (data: file_name, optional epsilon_start)"""
     try:
         session = await sio.get_session(sid)
         agent = session.get("agent")
         file_name = data.get("file_name")
         
-        if agent and file_name:
+        if session.get("arena") is not None:
+            await sio.emit("error", {"message": "Arena games can't load models"}, to=sid)
+        elif agent and file_name:
+            agent.own_model()  # Never overwrite the shared starting network
             agent.model.load(file_name)
+            agent.trainer.sync_target()
+            session["model"] = file_name  # Its games count towards the loaded model
+            await sio.save_session(sid, session)
+            # A pretrained (warm-start) model needs less exploration
+            if data.get("epsilon_start") is not None:
+                agent.epsilon_start = float(data["epsilon_start"])
             await sio.emit("model_loaded", {"message": f"Model {file_name} loaded successfully"}, to=sid)
         else:
             await sio.emit("error", {"message": "Agent or filename not provided"}, to=sid)
@@ -140,83 +457,244 @@ async def load_model(sid: str, data: Dict[str, Any]) -> None:
         await sio.emit("error", {"message": str(e)}, to=sid)
 
 
+@sio.event
+async def replay(sid: str, data: Dict[str, Any]) -> None:
+    """
+    Stream a recorded episode to this client.
+    
+    data: {"recording_id", "episode", "tick" (default: the start position),
+    "ticks_per_second" (default REPLAY_TICKS_PER_SECOND, at most
+    REPLAY_MAX_TICKS_PER_SECOND)}
+    """
+    try:
+        # Check every argument before opening any file
+        recording_id = data.get("recording_id")
+        if not isinstance(recording_id, str) or not RECORDING_ID_PATTERN.match(recording_id):
+            await sio.emit("error", {"message": f"No recording with id {recording_id}"}, to=sid)
+            return
+        episode = int(data.get("episode", 0))
+        tick = int(data.get("tick", -1))
+        speed = float(data.get("ticks_per_second", REPLAY_TICKS_PER_SECOND))
+        if not math.isfinite(speed) or speed <= 0:
+            raise ValueError("ticks_per_second must be a positive number")
+        speed = min(speed, REPLAY_MAX_TICKS_PER_SECOND)
+        
+        try:
+            reader = RecordingReader(recording_id)
+        except FileNotFoundError:
+            await sio.emit("error", {"message": f"No recording with id {recording_id}"}, to=sid)
+            return
+        try:
+            info = reader.episode(episode)
+        except IndexError as e:
+            reader.close()
+            await sio.emit("error", {"message": str(e)}, to=sid)
+            return
+        
+        # One replay per client: a new request replaces the old one
+        # (from here on the stream owns the reader and closes it)
+        stop_replay_task(sid)
+        replays[sid] = asyncio.create_task(stream_replay(sid, reader, recording_id, episode, info, tick, speed))
+        
+    except Exception as e:
+        print(f"[ERROR][replay] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+
+
+@sio.event
+async def stop_replay(sid: str, data: Dict[str, Any]) -> None:
+    """Stop the replay this client is watching"""
+    stop_replay_task(sid)
+
+
+def stop_replay_task(sid: str) -> None:
+    """Cancel a client's running replay, if any."""
+    task = replays.pop(sid, None)
+    if task is not None:
+        task.cancel()
+
+
+@sio.event
+async def env_create(sid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Create a client-driven environment of several games (see vecenv.py).
+    
+    Nothing ticks on its own: the games only advance when the client sends
+    env_step. Replies (as the event's acknowledgement) with the first
+    observations, or with {"error": ...}.
+    """
+    print(f"[ENV_CREATE] sid={sid}, data={data}")
+    
+    try:
+        session = await sio.get_session(sid)
+        env = VecEnv(
+            int(data.get("games") or 1),
+            data.get("grid_width"),
+            data.get("grid_height"),
+            data.get("observation", "features"),
+        )
+        session["env"] = env
+        await sio.save_session(sid, session)
+        return dict(pack_observations(env.observe()), games=len(env))
+        
+    except Exception as e:
+        print(f"[ERROR][env_create] sid={sid} -> {e}")
+        return {"error": str(e)}
+
+
+@sio.event
+async def env_step(sid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Step every game of the client's environment with one action each.
+    
+    ``actions`` is one byte per game (or a list): 0 straight, 1 right,
+    2 left. Replies with observations, rewards (float32) and dones (bool)
+    as binary attachments, plus the scores of the episodes that ended.
+    """
+    try:
+        session = await sio.get_session(sid)
+        env: VecEnv = session.get("env")
+        if env is None:
+            return {"error": "No environment: send env_create first"}
+        
+        actions = data.get("actions")
+        actions = np.frombuffer(actions, dtype=np.uint8) if isinstance(actions, bytes) else np.asarray(actions, dtype=np.int64)
+        if actions.size and (actions.min() < 0 or actions.max() > 2):
+            raise ValueError("Actions are 0 (straight), 1 (right) or 2 (left)")
+        
+        # Off the event loop: a step of thousands of games takes a while
+        observations, rewards, dones, scores = await compute.run(sid, env.step, actions.tolist())
+        return dict(
+            pack_observations(observations),
+            rewards=rewards.tobytes(),
+            dones=dones.tobytes(),
+            scores=scores,
+            stats=env.stats(),
+        )
+        
+    except Exception as e:
+        print(f"[ERROR][env_step] sid={sid} -> {e}")
+        return {"error": str(e)}
+
+
+@sio.event
+async def env_close(sid: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the client's environment (replies {"closed": True} or {"error": ...})"""
+    try:
+        session = await sio.get_session(sid)
+        session["env"] = None
+        await sio.save_session(sid, session)
+        return {"closed": True}
+        
+    except Exception as e:
+        print(f"[ERROR][env_close] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+        return {"error": str(e)}
+
+
+async def stream_replay(
+    sid: str,
+    reader: RecordingReader,
+    recording_id: str,
+    episode: int,
+    info: Dict[str, Any],
+    tick: int,
+    speed: float,
+) -> None:
+    """Send replay_frame events for an episode at ``speed`` ticks per second"""
+    print(f"[REPLAY] sid={sid} recording={recording_id} episode={episode} from tick {tick} at {speed}/s")
+    
+    # Above REPLAY_MAX_FPS, send every stride-th tick (and always the last)
+    stride = max(1, math.ceil(speed / REPLAY_MAX_FPS))
+    delay = stride / speed
+    
+    try:
+        await sio.emit("replay_started", {
+            "recording_id": recording_id, "episode": episode, "ticks": info["ticks"],
+            "score": info["score"], "complete": info["complete"],
+        }, to=sid)
+        last_tick = info["ticks"] - 1
+        for frame in reader.frames(episode, tick):
+            if frame["tick"] % stride and frame["tick"] != last_tick:
+                continue
+            # A client that is behind skips frames instead of queueing them
+            if frame["tick"] == last_tick or outgoing_backlog(sio, sid) <= HIGH_WATERMARK:
+                await sio.emit("replay_frame", frame, to=sid)
+            await asyncio.sleep(delay)
+        await sio.emit("replay_done", {"recording_id": recording_id, "episode": episode}, to=sid)
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        print(f"[ERROR][stream_replay] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+    finally:
+        reader.close()
+        if replays.get(sid) is asyncio.current_task():
+            del replays[sid]
+
+
 async def update_game(sid: str) -> None:
     """Main game loop - runs continuously while the game is active"""
     print(f"[LOOP] Starting game loop for sid={sid}")
+    meter = RateMeter()
     
     try:
+        session = await sio.get_session(sid)
+        game: Game = session.get("game")
+        
         while True:
-            # Check if session still exists
+            # Check if session still exists (and still plays this loop's game,
+            # not one from a later start_game)
             session = await sio.get_session(sid)
-            if not session or not session.get("active"):
+            if not session or not session.get("active") or session.get("game") is not game:
                 print(f"[LOOP] Ending game loop for sid={sid} (inactive session)")
                 break
             
-            game: Game = session.get("game")
             agent: DQN = session.get("agent")
             
             if not game or not agent:
                 print(f"[LOOP] No active game or agent for sid={sid}")
                 break
             
-            # Get current state
-            current_state = agent.get_state(game)
-            
-            # Get action from agent
-            action = agent.get_action(current_state)
-            
-            # Convert action to direction change
-            # [1,0,0] = straight, [0,1,0] = right, [0,0,1] = left
-            await apply_action(game, action)
-            
-            # Step the game forward
-            game.step()
+            # Observe, act, step the game and learn from the result (the
+            # short-memory training step runs on the compute pool too)
+            recorder = session.get("recorder")
+            _, done = await compute.run(sid, play_step, game, agent, recorder)
+            meter.add()
             
-            # Get new state after action
-            new_state = agent.get_state(game)
-            
-            # Calculate reward
-            done = not game.running
-            reward = agent.calculate_reward(game, done)
-            
-            # Train short memory (immediate learning)
-            agent.train_short_memory(current_state, action, reward, new_state, done)
-            
-            # Remember this experience
-            agent.remember(current_state, action, reward, new_state, done)
-            
-            # Send updated state to frontend
-            game_state = game.to_dict()
-            game_state["agent_stats"] = {
+            agent_stats = {
                 "games": agent.n_games,
                 "record": agent.record,
-                "epsilon": agent.epsilon
+                "epsilon": agent.epsilon,
+                "steps_per_sec": round(meter.rate, 1)
             }
-            await sio.emit("game_update", game_state, to=sid)
             
-            # If game ended, train long memory and reset
+            # Send updated state to frontend, unless the client is lagging
+            # (the simulation keeps stepping either way)
+            gate = flow_gates.get(sid)
+            if gate is None or gate.should_send(outgoing_backlog(sio, sid)):
+                game_state = game.to_dict()
+                game_state["agent_stats"] = agent_stats
+                if gate is not None:
+                    game_state["flow"] = gate.stats()
+                await sio.emit("game_update", game_state, to=sid)
+            
+            # Large boards: whole-board overview at a lower rate
+            if isinstance(game, LargeGame) and game.ticks % MINIMAP_EVERY == 0:
+                await sio.emit("minimap", game.minimap(), to=sid)
+            
+            # Broadcast the same frame to spectators (encoded once per room)
+            await hub.publish(sid, agent_stats)
+            
+            # If game ended, train long memory, reset and notify the client
             if done:
-                # Update statistics
-                agent.n_games += 1
-                if game.score > agent.record:
-                    agent.record = game.score
-                
-                # Train long memory (batch learning)
-                agent.train_long_memory()
-                
-                # Send game over notification
-                await sio.emit("game_over", {
-                    "score": game.score,
-                    "games": agent.n_games,
-                    "record": agent.record
-                }, to=sid)
+                # Long-memory training runs on the compute pool
+                game_over_stats = await compute.run(sid, end_episode, game, agent, recorder)
+                await sio.emit("game_over", game_over_stats, to=sid)
+                await hub.publish_game_over(sid, game_over_stats)
+                store_game(session, game, agent, game_over_stats)
                 
-                print(f"[GAME_OVER] sid={sid} - Game {agent.n_games} - Score: {game.score} - Record: {agent.record}")
-                
-                # Reset game for next round
-                game.reset()
-                agent.prev_distance = None
-                agent.prev_length = 1
+                print(f"[GAME_OVER] sid={sid} - Game {agent.n_games} - Score: {game_over_stats['score']} - Record: {agent.record}")
                 
                 # Small delay before next game
                 await asyncio.sleep(0.5)
@@ -229,53 +707,178 @@ async def update_game(sid: str) -> None:
         await sio.emit("error", {"message": str(e)}, to=sid)
 
 
-async def apply_action(game: Game, action: list) -> None:
+async def update_arena(sid: str) -> None:
+    """Arena game loop: every snake moves once per tick, one forward pass for all"""
+    print(f"[LOOP] Starting arena loop for sid={sid}")
+    meter = RateMeter()
+    
+    try:
+        session = await sio.get_session(sid)
+        trainer: ArenaTrainer = session["arena"]
+        
+        while True:
+            # Check if session still exists
+            session = await sio.get_session(sid)
+            if not session or not session.get("active") or session.get("arena") is not trainer:
+                print(f"[LOOP] Ending arena loop for sid={sid} (inactive session)")
+                break
+            
+            await compute.run(sid, trainer.tick)
+            meter.add(len(trainer.arena.snakes))
+            
+            # Send updated state to frontend, unless the client is lagging
+            gate = flow_gates.get(sid)
+            if gate is None or gate.should_send(outgoing_backlog(sio, sid)):
+                game_state = trainer.arena.to_dict()
+                game_state["agent_stats"] = dict(trainer.stats(), steps_per_sec=round(meter.rate, 1))
+                if gate is not None:
+                    game_state["flow"] = gate.stats()
+                await sio.emit("game_update", game_state, to=sid)
+            
+            # Wait for game tick
+            await asyncio.sleep(trainer.arena.game_tick)
+            
+    except Exception as e:
+        print(f"[ERROR][update_arena] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+
+
+async def update_game_turbo(sid: str) -> None:
     """
-    Convert agent action to game direction change.
+    Training-speed game loop.
     
-    Actions: [1,0,0] = straight, [0,1,0] = right, [0,0,1] = left
+    The simulation and learning run flat out on the compute pool, in slices
+    of TURBO_FRAME_TIME. Between slices the client gets a preview of the
+    latest state (about 30 fps) and a game_over event for every finished
+    episode, so rendering never slows training down.
     """
-    current_direction = game.snake.direction
+    print(f"[LOOP] Starting turbo loop for sid={sid}")
+    
+    try:
+        session = await sio.get_session(sid)
+        runner = TurboRunner(session["game"], session["agent"], session.get("recorder"))
+        agent: DQN = runner.agent
+        frames = 0
+        
+        while True:
+            # Check if session still exists
+            session = await sio.get_session(sid)
+            if not session or not session.get("active") or session.get("agent") is not agent:
+                print(f"[LOOP] Ending turbo loop for sid={sid} (inactive session)")
+                break
+            
+            # Simulate one slice off the event loop
+            episodes, game_state = await compute.run(sid, runner.run_for, TURBO_FRAME_TIME)
+            
+            agent_stats = {
+                "games": agent.n_games,
+                "record": agent.record,
+                "epsilon": agent.epsilon,
+                "steps_per_sec": round(runner.meter.rate, 1)
+            }
+            
+            # Preview frame (subject to the same backpressure as normal play)
+            gate = flow_gates.get(sid)
+            if gate is None or gate.should_send(outgoing_backlog(sio, sid)):
+                game_state["agent_stats"] = agent_stats
+                if gate is not None:
+                    game_state["flow"] = gate.stats()
+                await sio.emit("game_update", game_state, to=sid)
+            
+            # Large boards: whole-board overview every few previews
+            frames += 1
+            if isinstance(runner.game, LargeGame) and frames % MINIMAP_EVERY == 0:
+                await sio.emit("minimap", runner.game.minimap(), to=sid)
+            
+            # Frames are far apart, so spectators get full snapshots
+            await hub.publish(sid, agent_stats, keyframe=True)
+            
+            # Per-episode results
+            for game_over_stats in episodes:
+                await sio.emit("game_over", game_over_stats, to=sid)
+                await hub.publish_game_over(sid, game_over_stats)
+                store_game(session, runner.game, agent, game_over_stats)
+            
+    except Exception as e:
+        print(f"[ERROR][update_game_turbo] sid={sid} -> {e}")
+        await sio.emit("error", {"message": str(e)}, to=sid)
+
+
+async def handle_remote_spectate(message: Dict[str, Any]) -> None:
+    """Cluster mode: another worker's client wants to watch one of our games"""
+    await hub.add_viewer(message["viewer"], message["game_id"])
+
+
+async def handle_remote_unwatch(message: Dict[str, Any]) -> None:
+    """Cluster mode: a client on another worker stopped watching"""
+    await hub.remove_viewer(message["viewer"])
+
+
+async def main(
+    port: int = 8765,
+    reuse_port: bool = False,
+    compute_workers: int = POOL_WORKERS,
+    compute_cpus: Optional[List[int]] = None,
+) -> None:
+    """
+    Start the web server and socketio server.
+
+    Args:
+        port: TCP port to listen on
+        reuse_port: Share the port with other processes (SO_REUSEPORT), used
+            by cluster.py so the kernel spreads connections across workers
+        compute_workers: Training pool threads (default: one per core)
+        compute_cpus: Cores to pin them to (default: every allowed core);
+            cluster.py gives each worker process its own share
+    """
+    # torch's thread count is process-wide: set it once, here, so the pool's
+    # workers x threads stays within the cores
+    torch.set_num_threads(THREADS_PER_WORKER)
+    compute.start(compute_workers, compute_cpus)
+    stats_store.start()
+    
+    # Accept spectate requests forwarded by other workers, and suspend
+    # disconnected sessions to disk at once: the reconnect may reach any worker
+    if is_clustered(sio):
+        sio.manager.on("spectate", handle_remote_spectate)
+        sio.manager.on("unwatch", handle_remote_unwatch)
+        evictions.park_seconds = 0
     
-    # action[0] = straight (no change)
-    if action[1] == 1:  # Turn right
-        if current_direction == (0, -1):  # UP -> RIGHT
-            game.queue_change("RIGHT")
-        elif current_direction == (1, 0):  # RIGHT -> DOWN
-            game.queue_change("DOWN")
-        elif current_direction == (0, 1):  # DOWN -> LEFT
-            game.queue_change("LEFT")
-        elif current_direction == (-1, 0):  # LEFT -> UP
-            game.queue_change("UP")
-    elif action[2] == 1:  # Turn left
-        if current_direction == (0, -1):  # UP -> LEFT
-            game.queue_change("LEFT")
-        elif current_direction == (-1, 0):  # LEFT -> DOWN
-            game.queue_change("DOWN")
-        elif current_direction == (0, 1):  # DOWN -> RIGHT
-            game.queue_change("RIGHT")
-        elif current_direction == (1, 0):  # RIGHT -> UP
-            game.queue_change("UP")
-    # If action[0] == 1, continue straight (do nothing)
-
-
-async def main() -> None:
-    """Start the web server and socketio server"""
     # Add ping endpoint
     app.router.add_get("/ping", handle_ping)
+    app.router.add_get("/games", handle_games)
+    app.router.add_get("/sessions", handle_sessions)
+    app.router.add_get("/parked", handle_parked)
+    app.router.add_get("/compute", handle_compute)
+    app.router.add_get("/recordings", handle_recordings)
+    app.router.add_get("/recordings/{recording_id}", handle_recording)
+    app.router.add_get("/stats/leaderboard", handle_leaderboard)
+    app.router.add_get("/stats/history", handle_history)
+    app.router.add_get("/stats/curve", handle_curve)
+    app.router.add_get("/stats/writer", handle_stats_writer)
+    
+    # Binary WebSocket for bots driving many games (see fastpath.py)
+    # (games step on the compute pool, like every other session's)
+    app.router.add_get(FASTPATH_ROUTE, fastpath_handler(compute.run))
+    
+    # Suspend long-parked sessions to disk in the background
+    asyncio.create_task(evictions.run())
     
     # Create and configure server
     runner = web.AppRunner(app)
     await runner.setup()
-    site = web.TCPSite(runner, "0.0.0.0", 8765)
+    site = web.TCPSite(runner, "0.0.0.0", port, reuse_port=reuse_port or None)
     
-    print("[SERVER] Starting on http://localhost:8765")
+    print(f"[SERVER] Starting on http://localhost:{port}")
     print("[SERVER] DQN Snake AI ready to train!")
     await site.start()
     
-    # Keep server running
-    while True:
-        await asyncio.sleep(3600)
+    # Keep server running (on Ctrl-C, write the games still queued)
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        stats_store.close()
 
 
 if __name__ == "__main__":
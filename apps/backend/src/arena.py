@@ -0,0 +1,396 @@
+import random
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import torch
+
+from agent import REWARD_AWAY, REWARD_CLOSER, REWARD_DEATH, REWARD_FOOD, DQN
+
+
+# Define constants for multi-snake arenas
+ARENA_WIDTH = 64  # Default board size for arenas (cells)
+ARENA_HEIGHT = 64
+SNAKES_PER_FOOD = 2  # Default number of food items: one per this many snakes
+LONG_TRAIN_TICKS = 20  # Ticks between replay-memory training batches
+SPAWN_TRIES = 100  # Random picks before falling back to scanning for a free cell
+MAX_ARENA_SNAKES = 256  # Most snakes a client may put on one board
+MAX_ARENA_SIZE = 512  # Largest arena width or height a client may ask for
+MAX_ARENA_FOODS = 1024  # Most food items a client may put on one board
+
+Cell = Tuple[int, int]
+
+
+class ArenaSnake:
+    """One snake of an arena; its body is a deque so both ends are O(1)."""
+
+    __slots__ = ("id", "body", "direction", "alive", "score", "grow", "prev_distance", "target", "games", "record")
+
+    def __init__(self, snake_id: int) -> None:
+        """Create a snake that is not on the board yet (see Arena.spawn)."""
+        self.id = snake_id
+        self.body: Deque[Cell] = deque()
+        self.direction: Cell = (0, 1)
+        self.alive = False
+        self.score = 0
+        self.grow = False
+        self.prev_distance: Optional[int] = None
+        self.target: Optional[Cell] = None  # Food item the snake is heading for
+        self.games = 0
+        self.record = 0
+
+    @property
+    def head(self) -> Cell:
+        """Position of the head."""
+        return self.body[0]
+
+
+class Arena:
+    """
+    A board shared by several snakes and several food items.
+
+    Every cell covered by a snake is in ``occupancy`` (cell -> snake id), so
+    checking whether a snake's next cell is free costs one dict lookup
+    however many snakes there are.
+
+    All snakes move at the same time. A tick is resolved in phases that
+    only look at the state before the tick, which makes the outcome
+    independent of snake order:
+
+    1. Every living snake picks its next head cell.
+    2. Tails of snakes that are not growing leave the board, so a head may
+       follow another snake's tail into the cell it just left.
+    3. A snake dies if its next cell is outside the board, is occupied, or
+       is also the next cell of another snake (a head-on crash kills both).
+       Two heads moving into each other's cells also kill both: for a
+       snake of length 1 the head is its tail and left in phase 2, but
+       the snakes still pass through each other.
+    4. Survivors move; dead snakes are removed. Heads on food eat it.
+    5. Dead snakes respawn on a random free cell, as a new episode.
+
+    Rewards add up like DQN.calculate_reward: distance shaping for the
+    move plus ``reward_food`` for eating. A snake that dies doesn't move,
+    so it gets ``reward_death`` only (as in Game, where the head stays put).
+
+    Randomness (spawns and food) comes from ``seed``, so a seeded arena with
+    the same actions plays out identically.
+    """
+
+    def __init__(
+        self,
+        grid_width: int = ARENA_WIDTH,
+        grid_height: int = ARENA_HEIGHT,
+        snakes: int = 8,
+        foods: Optional[int] = None,
+        seed: Optional[int] = None,
+        reward_closer: float = REWARD_CLOSER,
+        reward_away: float = REWARD_AWAY,
+        reward_food: float = REWARD_FOOD,
+        reward_death: float = REWARD_DEATH,
+    ) -> None:
+        """Place ``snakes`` snakes and ``foods`` food items on an empty board."""
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.game_tick = 0.03  # Same default as Game
+        self.rng = random.Random(seed)
+        self.reward_closer = reward_closer
+        self.reward_away = reward_away
+        self.reward_food = reward_food
+        self.reward_death = reward_death
+
+        self.occupancy: Dict[Cell, int] = {}
+        self.foods: Set[Cell] = set()
+        self.snakes = [ArenaSnake(i) for i in range(snakes)]
+        for snake in self.snakes:
+            self.spawn(snake)
+        for _ in range(foods if foods is not None else max(1, snakes // SNAKES_PER_FOOD)):
+            self.spawn_food()
+        self.ticks = 0
+
+    def free_cell(self) -> Optional[Cell]:
+        """
+        A random cell with no snake and no food.
+
+        Random picks are O(1) each and almost always succeed; only a nearly
+        full board falls back to scanning it.
+        """
+        for _ in range(SPAWN_TRIES):
+            cell = (self.rng.randrange(self.grid_width), self.rng.randrange(self.grid_height))
+            if cell not in self.occupancy and cell not in self.foods:
+                return cell
+        free = [
+            (x, y) for x in range(self.grid_width) for y in range(self.grid_height)
+            if (x, y) not in self.occupancy and (x, y) not in self.foods
+        ]
+        return self.rng.choice(free) if free else None
+
+    def spawn(self, snake: ArenaSnake) -> None:
+        """Start a new episode for ``snake``: length 1 on a free cell."""
+        cell = self.free_cell()
+        snake.body.clear()
+        snake.alive = cell is not None
+        snake.score = 0
+        snake.grow = False
+        snake.prev_distance = None
+        snake.target = None
+        if cell is not None:
+            snake.body.append(cell)
+            snake.direction = self.rng.choice([(0, 1), (0, -1), (1, 0), (-1, 0)])
+            self.occupancy[cell] = snake.id
+
+    def spawn_food(self) -> None:
+        """Add one food item on a free cell (if there is one)."""
+        cell = self.free_cell()
+        if cell is not None:
+            self.foods.add(cell)
+
+    def target_food(self, snake: ArenaSnake) -> Cell:
+        """
+        The food item ``snake`` is heading for.
+
+        It is the nearest food at the time it was picked and stays the
+        target until someone eats it. Searching every food item for every
+        snake on every tick would be O(snakes x foods); this way the search
+        only runs when a target disappears.
+        """
+        if snake.target not in self.foods:
+            head = snake.head
+            snake.target = min(
+                self.foods, key=lambda food: abs(food[0] - head[0]) + abs(food[1] - head[1]), default=head,
+            )
+            snake.prev_distance = None  # Distance to a new target: no shaping this tick
+        return snake.target
+
+    def blocked(self, cell: Cell) -> bool:
+        """Would moving into ``cell`` kill a snake (wall or any snake's body)?"""
+        x, y = cell
+        return not (0 <= x < self.grid_width and 0 <= y < self.grid_height) or cell in self.occupancy
+
+    def observe(self, snake: ArenaSnake) -> List[float]:
+        """
+        The 13 features DQN.get_state computes for a single game, seen
+        from ``snake``: danger straight/right/left (walls and every snake),
+        direction, direction of the target food and distance to it.
+        """
+        if not snake.alive:
+            return [0.0] * 13
+        x, y = snake.head
+        dx, dy = snake.direction
+        food = self.target_food(snake)
+        return [
+            float(self.blocked((x + dx, y + dy))),  # Straight
+            float(self.blocked((x - dy, y + dx))),  # Right
+            float(self.blocked((x + dy, y - dx))),  # Left
+            float(snake.direction == (-1, 0)),
+            float(snake.direction == (1, 0)),
+            float(snake.direction == (0, -1)),
+            float(snake.direction == (0, 1)),
+            float(food[0] < x),
+            float(food[0] > x),
+            float(food[1] < y),
+            float(food[1] > y),
+            (food[0] - x) / self.grid_width,
+            (food[1] - y) / self.grid_height,
+        ]
+
+    @staticmethod
+    def swaps(snake_id: int, targets: Dict[int, Cell], heads: Dict[int, Cell], head_owners: Dict[Cell, int]) -> bool:
+        """Whether snake ``snake_id`` and another snake move into each other's head cells this tick."""
+        other = head_owners.get(targets[snake_id])
+        return other is not None and other != snake_id and targets[other] == heads[snake_id]
+
+    def states(self) -> np.ndarray:
+        """Features of every snake, as one (snakes, 13) array for a batched forward pass."""
+        return np.array([self.observe(snake) for snake in self.snakes], dtype=np.float32)
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Move every snake at once (see the class docstring for the rules).
+
+        Args:
+            actions: One action per snake: 0 = straight, 1 = right, 2 = left
+
+        Returns:
+            Reward of every snake and whether it died this tick
+        """
+        count = len(self.snakes)
+        rewards = np.zeros(count, dtype=np.float32)
+        dones = np.zeros(count, dtype=bool)
+        living = [snake for snake in self.snakes if snake.alive]
+
+        # 1. Turn and pick the next head cell
+        targets: Dict[int, Cell] = {}
+        arrivals: Dict[Cell, int] = {}
+        heads = {snake.id: snake.head for snake in living}  # Before the move (phase 2 may empty a body)
+        head_owners = {head: snake_id for snake_id, head in heads.items()}
+        for snake in living:
+            dx, dy = snake.direction
+            action = actions[snake.id]
+            if action == 1:
+                snake.direction = (-dy, dx)
+            elif action == 2:
+                snake.direction = (dy, -dx)
+            x, y = snake.head
+            target = (x + snake.direction[0], y + snake.direction[1])
+            targets[snake.id] = target
+            arrivals[target] = arrivals.get(target, 0) + 1
+
+        # 2. Tails move out first
+        for snake in living:
+            if not snake.grow:
+                del self.occupancy[snake.body.pop()]
+
+        # 3. Decide every death before changing anything else
+        dead = [
+            snake for snake in living
+            if arrivals[targets[snake.id]] > 1
+            or self.blocked(targets[snake.id])
+            or self.swaps(snake.id, targets, heads, head_owners)
+        ]
+        for snake in dead:
+            snake.alive = False
+
+        # 4. Remove the dead, move the survivors, eat
+        for snake in dead:
+            for cell in snake.body:
+                if self.occupancy.get(cell) == snake.id:
+                    del self.occupancy[cell]
+            snake.body.clear()
+            rewards[snake.id] = self.reward_death
+            dones[snake.id] = True
+            snake.games += 1
+            snake.record = max(snake.record, snake.score)
+
+        survivors = [snake for snake in living if snake.alive]
+        for snake in survivors:
+            target = targets[snake.id]
+            snake.body.appendleft(target)
+            self.occupancy[target] = snake.id
+            snake.grow = False
+
+            # Distance shaping, as in DQN.calculate_reward (measured before
+            # anything is eaten, so snake order doesn't matter)
+            food = self.target_food(snake)
+            distance = abs(food[0] - target[0]) + abs(food[1] - target[1])
+            if snake.prev_distance is not None:
+                if distance < snake.prev_distance:
+                    rewards[snake.id] += self.reward_closer
+                elif distance > snake.prev_distance:
+                    rewards[snake.id] += self.reward_away
+            snake.prev_distance = distance
+
+        eaten = 0
+        for snake in survivors:
+            target = targets[snake.id]
+            if target in self.foods:
+                self.foods.discard(target)
+                snake.score += 1
+                snake.grow = True
+                snake.prev_distance = None  # Reset for new food
+                rewards[snake.id] += self.reward_food
+                eaten += 1
+
+        # 5. Refill food and bring the dead back
+        for _ in range(eaten):
+            self.spawn_food()
+        for snake in dead:
+            self.spawn(snake)
+        self.ticks += 1
+        return rewards, dones
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Arena state for the frontend.
+
+        ``snake``/``food``/``score`` describe the current leader, so clients
+        that only draw one snake still work; ``snakes`` and ``foods`` have
+        everything.
+        """
+        leader = max(self.snakes, key=lambda snake: (snake.score, len(snake.body)))
+        return {
+            "grid_width": self.grid_width,
+            "grid_height": self.grid_height,
+            "game_tick": self.game_tick,
+            "snake": list(leader.body),
+            "food": next(iter(self.foods), None),
+            "score": leader.score,
+            "snakes": [{"id": s.id, "body": list(s.body), "score": s.score} for s in self.snakes if s.alive],
+            "foods": list(self.foods),
+        }
+
+
+class ArenaTrainer:
+    """
+    One DQN policy playing every snake of an arena.
+
+    Each tick all snakes are observed into one array and the network runs
+    once for the whole batch, instead of once per snake. The transitions
+    of all snakes train the network in one batched step and go into the
+    shared replay memory; a replay batch is trained every LONG_TRAIN_TICKS.
+    """
+
+    def __init__(self, arena: Arena, agent: Optional[DQN] = None, seed: Optional[int] = None) -> None:
+        """Control every snake of ``arena`` with ``agent`` (a new DQN by default)."""
+        self.arena = arena
+        self.agent = agent or DQN()
+        self.rng = np.random.default_rng(seed)
+        self.one_hot = np.eye(3, dtype=np.int64)
+        self.states = arena.states()
+
+    @property
+    def epsilon(self) -> float:
+        """Exploration rate, decaying with games per snake (as DQN does per game)."""
+        agent = self.agent
+        games = agent.n_games / len(self.arena.snakes)
+        return max(agent.epsilon_min, agent.epsilon_start - games * agent.epsilon_start / agent.epsilon_decay)
+
+    def act(self, states: np.ndarray) -> np.ndarray:
+        """Epsilon-greedy actions for every snake from a single forward pass."""
+        with torch.no_grad():
+            actions = self.agent.model(torch.from_numpy(states)).argmax(dim=1).numpy()
+        self.agent.epsilon = self.epsilon
+        explore = self.rng.random(len(actions)) * 200 < self.agent.epsilon
+        actions[explore] = self.rng.integers(0, 3, int(explore.sum()))
+        return actions
+
+    def tick(self, learn: bool = True) -> np.ndarray:
+        """
+        Observe, act, move every snake and learn from the results.
+
+        Returns:
+            Which snakes died this tick
+        """
+        states = self.states
+        actions = self.act(states)
+        playing = np.array([snake.alive for snake in self.arena.snakes])
+        rewards, dones = self.arena.step(actions.tolist())
+        next_states = self.arena.states()
+        self.states = next_states
+
+        if learn:
+            agent = self.agent
+            one_hot = self.one_hot[actions]
+            if not playing.all():
+                # Snakes that found no free cell to respawn on didn't play
+                states, one_hot, rewards, next_states, dones = (
+                    states[playing], one_hot[playing], rewards[playing], next_states[playing], dones[playing]
+                )
+            agent.trainer.train_step(states, one_hot, rewards, next_states, dones)
+            agent.memory.extend(zip(states, one_hot, rewards.tolist(), next_states, dones.tolist()))
+            if self.arena.ticks % LONG_TRAIN_TICKS == 0:
+                agent.train_long_memory()
+
+        deaths = int(dones.sum())
+        if deaths:
+            self.agent.n_games += deaths
+            self.agent.record = max(self.agent.record, max(snake.record for snake in self.arena.snakes))
+        return dones
+
+    def stats(self) -> Dict[str, Any]:
+        """Agent statistics for game_update (same keys as single games, plus snakes alive)."""
+        return {
+            "games": self.agent.n_games,
+            "record": self.agent.record,
+            "epsilon": self.agent.epsilon,
+            "alive": sum(snake.alive for snake in self.arena.snakes),
+        }
@@ -0,0 +1,114 @@
+import socketio
+from typing import Any, Dict, Iterable
+
+
+# Define constants for adaptive frame rate
+HIGH_WATERMARK = 4  # Queued packets above which we start skipping frames
+LOW_WATERMARK = 1  # Queued packets at or below which we send more often again
+MAX_STRIDE = 32  # Never send less than every 32nd frame
+
+
+def outgoing_backlog(sio: socketio.AsyncServer, sid: str) -> int:
+    """
+    Count the packets waiting to be written to a client's connection.
+
+    Engine.IO keeps one outgoing queue per connection. When a client reads
+    slower than we send, packets pile up there, so its size is a cheap and
+    client-independent measure of how far behind the client is.
+    """
+    try:
+        eio_sid = sio.manager.eio_sid_from_sid(sid, "/")
+        socket = sio.eio.sockets.get(eio_sid) if eio_sid else None
+    except Exception:
+        return 0
+    if socket is None:
+        return 0
+    return socket.queue.qsize()
+
+
+class FrameGate:
+    """
+    Per-session decision of which simulation frames get sent to the client.
+
+    The simulation always steps at full speed; only the emits are thinned
+    out. Every ``stride``-th frame is a candidate, and since a candidate is
+    always the newest state, skipping frames never makes the client fall
+    further behind. The stride doubles while the client's outgoing queue is
+    above ``HIGH_WATERMARK`` and halves again once it drains to
+    ``LOW_WATERMARK``.
+    """
+
+    def __init__(self) -> None:
+        """Start sending every frame."""
+        self.stride = 1  # Send every k-th frame
+        self.frames = 0  # Frames produced by the simulation
+        self.sent = 0  # Frames actually emitted
+        self.dropped = 0  # Frames skipped because of backpressure
+        self.queue_depth = 0  # Outgoing queue size at the last check
+        self.max_queue_depth = 0
+
+    def should_send(self, queue_depth: int) -> bool:
+        """
+        Decide whether to emit the current frame.
+
+        Args:
+            queue_depth: Packets currently waiting in the client's send queue
+        """
+        self.frames += 1
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+
+        # Not a candidate frame at the current rate
+        if self.frames % self.stride:
+            self.dropped += 1
+            return False
+
+        # Client is falling behind: back off and skip this frame as well
+        if queue_depth > HIGH_WATERMARK:
+            self.stride = min(self.stride * 2, MAX_STRIDE)
+            self.dropped += 1
+            return False
+
+        # Client has caught up: gradually restore the full rate
+        if queue_depth <= LOW_WATERMARK and self.stride > 1:
+            self.stride //= 2
+
+        self.sent += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Flow-control counters for this session."""
+        return {
+            "stride": self.stride,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "frames": self.frames,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
+
+def flow_summary(gates: Iterable[FrameGate]) -> Dict[str, Any]:
+    """
+    Flow-control counters summed over all sessions (for the /sessions endpoint).
+
+    Only totals are published: per-session entries would be keyed by sid.
+    """
+    summary = {
+        "sessions": 0,
+        "throttled": 0,  # Sessions currently sending less than every frame
+        "max_stride": 1,
+        "max_queue_depth": 0,
+        "frames": 0,
+        "sent": 0,
+        "dropped": 0,
+    }
+    for gate in gates:
+        summary["sessions"] += 1
+        summary["throttled"] += gate.stride > 1
+        summary["max_stride"] = max(summary["max_stride"], gate.stride)
+        summary["max_queue_depth"] = max(summary["max_queue_depth"], gate.max_queue_depth)
+        summary["frames"] += gate.frames
+        summary["sent"] += gate.sent
+        summary["dropped"] += gate.dropped
+    return summary
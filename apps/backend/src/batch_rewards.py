@@ -0,0 +1,123 @@
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from agent import REWARD_AWAY, REWARD_CLOSER, REWARD_DEATH, REWARD_FOOD
+
+
+# Define constants for batched episode statistics
+RECENT_EPISODES = 100  # Episodes in the "recent" mean score
+NO_DISTANCE = -1  # prev_distance of a game with nothing to compare against (None in DQN)
+
+
+class BatchRewards:
+    """
+    DQN.calculate_reward for many games at once.
+
+    The per-game trackers (``prev_distance``, ``prev_length``) are arrays,
+    and a game that ends is reset for its next episode on the spot (what
+    end_episode does by hand for a single agent). For the same inputs the
+    rewards are identical to calling calculate_reward on one agent per
+    game.
+    """
+
+    def __init__(
+        self,
+        games: int,
+        reward_closer: float = REWARD_CLOSER,
+        reward_away: float = REWARD_AWAY,
+        reward_food: float = REWARD_FOOD,
+        reward_death: float = REWARD_DEATH,
+    ) -> None:
+        """Trackers for ``games`` games at the start of an episode."""
+        self.reward_closer = reward_closer
+        self.reward_away = reward_away
+        self.reward_food = reward_food
+        self.reward_death = reward_death
+        self.prev_distance = np.full(games, NO_DISTANCE, dtype=np.int64)
+        self.prev_length = np.ones(games, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.prev_length)
+
+    def __call__(self, heads: np.ndarray, foods: np.ndarray, lengths: np.ndarray, dones: np.ndarray) -> np.ndarray:
+        """
+        Rewards of one step of every game.
+
+        Args:
+            heads: (N, 2) head positions after the step
+            foods: (N, 2) food positions after the step
+            lengths: (N,) snake lengths after the step
+            dones: (N,) whether each game ended on this step
+
+        Returns:
+            (N,) float32 rewards
+        """
+        distance = np.abs(heads - foods).sum(axis=1)
+        known = self.prev_distance != NO_DISTANCE
+        rewards = np.where(known & (distance < self.prev_distance), self.reward_closer, 0.0)
+        rewards += np.where(known & (distance > self.prev_distance), self.reward_away, 0.0)
+
+        ate = lengths > self.prev_length
+        rewards += np.where(ate, self.reward_food, 0.0)
+        rewards += np.where(dones, self.reward_death, 0.0)
+
+        # Nothing to compare the next distance with after a meal or a death;
+        # a game that ended starts its next episode with length 1
+        self.prev_distance = np.where(ate | dones, NO_DISTANCE, distance)
+        self.prev_length = np.where(dones, 1, lengths)
+        return rewards.astype(np.float32)
+
+    def reset(self, games: np.ndarray) -> None:
+        """Start a new episode in the games selected by ``games`` (mask or indices)."""
+        self.prev_distance[games] = NO_DISTANCE
+        self.prev_length[games] = 1
+
+
+class EpisodeStats:
+    """
+    Running episode statistics over many games, updated with whole arrays.
+
+    Tracks episodes, the mean and recent-mean score, the record and
+    episodes per second, without a Python loop per game or per step.
+    """
+
+    def __init__(self, recent: int = RECENT_EPISODES) -> None:
+        """Empty statistics; the episode rate is measured from now."""
+        self.episodes = 0
+        self.total_score = 0
+        self.record = 0
+        self.recent = np.zeros(recent, dtype=np.int64)
+        self.started = time.perf_counter()
+
+    def update(self, scores: np.ndarray, dones: np.ndarray) -> None:
+        """
+        Add the episodes that ended on this step.
+
+        Args:
+            scores: (N,) final score of every game (only read where done)
+            dones: (N,) whether each game ended on this step
+        """
+        finished = scores[dones]
+        count = len(finished)
+        if not count:
+            return
+        # Ring buffer of the last len(recent) scores
+        slots = (self.episodes + np.arange(count)) % len(self.recent)
+        self.recent[slots[-len(self.recent):]] = finished[-len(self.recent):]
+        self.episodes += count
+        self.total_score += int(finished.sum())
+        self.record = max(self.record, int(finished.max()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Episodes, mean scores, record and episodes per second."""
+        seconds = time.perf_counter() - self.started
+        recent = self.recent[:min(self.episodes, len(self.recent))]
+        return {
+            "episodes": self.episodes,
+            "mean_score": self.total_score / self.episodes if self.episodes else 0.0,
+            "recent_mean_score": float(recent.mean()) if len(recent) else 0.0,
+            "record": self.record,
+            "episodes_per_sec": self.episodes / seconds if seconds else 0.0,
+        }
@@ -0,0 +1,90 @@
+import argparse
+import time
+from typing import List, Tuple
+
+import numpy as np
+import torch
+
+from agent import DQN
+from arena import Arena, ArenaTrainer
+
+
+# Arena sizes measured by the benchmark: (snakes, board side)
+CONFIGS: List[Tuple[int, int]] = [(10, 64), (100, 128), (200, 128), (500, 256)]
+GAME_TICK = 0.03  # Default server tick the arena has to keep up with
+
+
+def check_occupancy(arena: Arena) -> None:
+    """The occupancy index must hold exactly the cells of the living snakes."""
+    cells = {cell: snake.id for snake in arena.snakes for cell in snake.body}
+    assert cells == arena.occupancy, "occupancy index out of sync"
+
+
+def check_determinism(snakes: int, side: int, ticks: int) -> None:
+    """Two arenas with the same seed and actions must play out identically."""
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, (ticks, snakes)).tolist()
+    runs = []
+    for _ in range(2):
+        arena = Arena(side, side, snakes, seed=1)
+        for tick_actions in actions:
+            arena.step(tick_actions)
+            check_occupancy(arena)
+        runs.append(arena.to_dict())
+    assert runs[0] == runs[1], "seeded arenas diverged"
+
+
+def main() -> None:
+    """Per-tick cost of arenas with many snakes, against the server tick."""
+    parser = argparse.ArgumentParser(description="Benchmark multi-snake arenas")
+    parser.add_argument("--ticks", type=int, default=300)
+    args = parser.parse_args()
+
+    torch.set_num_threads(1)
+    check_determinism(50, 64, 200)
+    print(f"Determinism and occupancy checks passed. Server tick: {GAME_TICK * 1000:.0f} ms")
+    print(f"{'snakes':>6} {'board':>8} {'step':>9} {'batched act':>12} {'per-snake act':>14} "
+          f"{'train':>9} {'tick total':>11} {'deaths':>7}")
+
+    for snakes, side in CONFIGS:
+        arena = Arena(side, side, snakes, seed=0)
+        trainer = ArenaTrainer(arena, DQN(share_model=False), seed=0)
+        trainer.agent.trainer
+
+        step_time = act_time = single_time = train_time = 0.0
+        deaths = 0
+        for _ in range(args.ticks):
+            states = trainer.states
+
+            start = time.perf_counter()
+            actions = trainer.act(states)
+            act_time += time.perf_counter() - start
+
+            # What one forward pass per snake would cost instead
+            start = time.perf_counter()
+            with torch.no_grad():
+                for state in states[:min(snakes, 50)]:
+                    trainer.agent.model(torch.from_numpy(state))
+            single_time += (time.perf_counter() - start) * snakes / min(snakes, 50)
+
+            start = time.perf_counter()
+            rewards, dones = arena.step(actions.tolist())
+            next_states = arena.states()
+            step_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            trainer.agent.trainer.train_step(states, trainer.one_hot[actions], rewards, next_states, dones)
+            train_time += time.perf_counter() - start
+            trainer.states = next_states
+            deaths += int(dones.sum())
+        check_occupancy(arena)
+
+        ms = 1000 / args.ticks
+        total = (step_time + act_time + train_time) * ms
+        print(f"{snakes:>6} {side:>4}x{side:<3} {step_time * ms:>6.2f} ms {act_time * ms:>9.2f} ms "
+              f"{single_time * ms:>11.2f} ms {train_time * ms:>6.2f} ms {total:>8.2f} ms {deaths:>7}")
+    print("(step = move + collisions + observing every snake; train = one batched short-memory step)")
+
+
+if __name__ == "__main__":
+    main()
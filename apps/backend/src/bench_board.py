@@ -0,0 +1,98 @@
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from agent import DQN
+from board import MINIMAP_EVERY, LargeGame
+from game import Game
+from simulation import play_step
+
+
+# Board sides measured by the benchmark
+SIDES: List[int] = [100, 1000, 10000]
+GAME_TICK = 0.03  # Default server tick a game has to keep up with
+
+
+def check_index(game: LargeGame) -> None:
+    """The occupancy index must hold exactly the snake's cells."""
+    cells = {cell for chunk in game.occupancy.chunks.values() for cell in chunk}
+    assert cells == set(game.snake.body), "occupancy index out of sync"
+    assert game.food.position in game.foods, "target food is not on the board"
+
+
+def bench_spawn(side: int, repeats: int = 20) -> float:
+    """Seconds to respawn the single food of a plain Game of the given side."""
+    game = Game()
+    game.grid_width = game.grid_height = side
+    game.reset()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        game.food.eaten = True
+        game.food.spawn_food()
+    return (time.perf_counter() - start) / repeats
+
+
+def main() -> None:
+    """Per-tick cost and payload of large boards, for growing board sizes."""
+    parser = argparse.ArgumentParser(description="Benchmark large sparse boards")
+    parser.add_argument("--ticks", type=int, default=2000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"Server tick: {GAME_TICK * 1000:.0f} ms; minimap every {MINIMAP_EVERY} ticks")
+    print(f"{'board':>12} {'setup':>8} {'foods':>7} {'play_step':>10} {'to_dict':>9} {'view bytes':>11} "
+          f"{'minimap':>9} {'map bytes':>10} {'food spawn':>11} {'chunks':>7}")
+
+    for side in SIDES:
+        start = time.perf_counter()
+        game = LargeGame(side, side)
+        setup = time.perf_counter() - start
+        agent = DQN(share_model=False)
+
+        step_time = dict_time = map_time = 0.0
+        view_bytes = map_bytes = maps = 0
+        for _ in range(args.ticks):
+            start = time.perf_counter()
+            _, done = play_step(game, agent)
+            step_time += time.perf_counter() - start
+            if done:
+                agent.n_games += 1
+                game.reset()
+
+            start = time.perf_counter()
+            state = game.to_dict()
+            dict_time += time.perf_counter() - start
+            view_bytes += len(json.dumps(state))
+
+            if game.ticks % MINIMAP_EVERY == 0:
+                start = time.perf_counter()
+                overview = game.minimap()
+                map_time += time.perf_counter() - start
+                map_bytes += len(overview["snake"]) + len(overview["foods"]) + 64
+                maps += 1
+        check_index(game)
+
+        # Eating: drop the target, place a replacement, find the new nearest
+        start = time.perf_counter()
+        for _ in range(100):
+            game.food.eaten = True
+            game.food.spawn_food()
+        spawn = (time.perf_counter() - start) / 100
+        check_index(game)
+
+        chunks = len(game.occupancy.chunks) + len(game.foods.chunks)
+        us = 1e6 / args.ticks
+        print(f"{side:>5}x{side:<6} {setup * 1000:>5.0f} ms {len(game.foods):>7} {step_time * us:>7.0f} us "
+              f"{dict_time * us:>6.0f} us {view_bytes // args.ticks:>11} {map_time * 1e6 / maps:>6.0f} us "
+              f"{map_bytes // maps:>10} {spawn * 1e6:>8.0f} us {chunks:>7}")
+
+    print("(play_step = observe + act + step + short-memory training; view = JSON of to_dict(); "
+          "map = the two binary minimap layers)")
+    print(f"Plain Game food spawn: {bench_spawn(100) * 1e6:.0f} us on 100x100, "
+          f"{bench_spawn(1000) * 1e6:.0f} us on 1000x1000")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import torch
+
+from agent import DQN
+from compute_pool import POOL_WORKERS, THREADS_PER_WORKER, ComputePool
+from game import Game
+from simulation import end_episode, play_step
+
+
+# Define constants for the benchmark
+SESSIONS = 64
+STEPS_PER_JOB = 20  # Training steps submitted at a time by each session
+
+
+def train_steps(game: Game, agent: DQN, steps: int) -> int:
+    """One job: ``steps`` observe/act/learn steps, with long-memory training at game over."""
+    for _ in range(steps):
+        _, done = play_step(game, agent)
+        if done:
+            end_episode(game, agent)
+    return steps
+
+
+async def drive(sessions: int, seconds: float, run: Callable[..., Any]) -> Dict[str, Any]:
+    """
+    Every session submits training jobs back to back for ``seconds``;
+    ``run(session, fn, *args)`` decides where they execute.
+    """
+    pairs = [(Game(), DQN(share_model=False)) for _ in range(sessions)]
+    for _, agent in pairs:
+        agent.trainer
+    done = [0] * sessions
+    latencies: List[float] = []
+    deadline = time.perf_counter() + seconds
+
+    async def session_loop(index: int) -> None:
+        game, agent = pairs[index]
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            done[index] += await run(index, train_steps, game, agent, STEPS_PER_JOB)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session_loop(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    return {
+        "steps_per_sec": sum(done) / elapsed,
+        "min_session": min(done) / elapsed,
+        "max_session": max(done) / elapsed,
+        "p95_job_ms": 1000 * float(np.percentile(latencies, 95)),
+    }
+
+
+def main() -> None:
+    """Aggregate training throughput of 64 sessions: free-for-all vs the compute pool."""
+    parser = argparse.ArgumentParser(description="Benchmark the training compute pool")
+    parser.add_argument("--sessions", type=int, default=SESSIONS)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    cores = len(os.sched_getaffinity(0))
+    print(f"{args.sessions} sessions, {cores} cores, jobs of {STEPS_PER_JOB} training steps, {args.seconds:.0f}s each")
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    # Today: a thread per busy session, torch using every core in each of them
+    torch.set_num_threads(cores)
+    threads = ThreadPoolExecutor(max_workers=args.sessions)
+
+    async def free_for_all(session: int, fn: Callable[..., Any], *fn_args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(threads, fn, *fn_args)
+
+    results["free-for-all"] = asyncio.run(drive(args.sessions, args.seconds, free_for_all))
+    threads.shutdown()
+
+    # Compute pool: one pinned worker per core, one torch thread (process-wide)
+    torch.set_num_threads(THREADS_PER_WORKER)
+    pool = ComputePool()
+    pool.start(POOL_WORKERS)
+    results["compute pool"] = asyncio.run(drive(args.sessions, args.seconds, pool.run))
+    stats = pool.stats()
+    pool.close()
+
+    print(f"{'':>14} {'steps/s':>9} {'slowest session':>16} {'fastest session':>16} {'p95 job':>10}")
+    for name, result in results.items():
+        print(f"{name:>14} {result['steps_per_sec']:>9.0f} {result['min_session']:>16.1f} "
+              f"{result['max_session']:>16.1f} {result['p95_job_ms']:>7.1f} ms")
+    print(f"Pool: {stats['jobs']} jobs, mean queue wait {stats['queue_wait_ms']:.1f} ms, "
+          f"utilization {[worker['utilization'] for worker in stats['workers']]}")
+
+
+if __name__ == "__main__":
+    main()
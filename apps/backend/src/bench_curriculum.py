@@ -0,0 +1,49 @@
+import argparse
+from typing import Any, Dict, List
+
+import numpy as np
+
+from curriculum import Curriculum
+from headless import train
+
+
+def main() -> None:
+    """Wall-clock time to a target mean score on the full board, with and without a curriculum."""
+    parser = argparse.ArgumentParser(description="Benchmark curriculum training")
+    parser.add_argument("--target-score", type=float, default=15.0)
+    parser.add_argument("--episodes", type=int, default=400, help="give up after this many games")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--grid-width", type=int, default=None)
+    parser.add_argument("--grid-height", type=int, default=None)
+    args = parser.parse_args()
+
+    results: Dict[str, List[Dict[str, Any]]] = {"full board": [], "curriculum": []}
+    for seed in range(args.seeds):
+        for name, runs in results.items():
+            curriculum = Curriculum(args.grid_width, args.grid_height) if name == "curriculum" else None
+            result = train(
+                episodes=args.episodes,
+                target_score=args.target_score,
+                seed=seed,
+                grid_width=args.grid_width,
+                grid_height=args.grid_height,
+                curriculum=curriculum,
+            )
+            result.pop("agent")
+            runs.append(result)
+            stages = " ".join(f"{s['grid_width']}x{s['grid_height']}@{s['games']}" for s in result["stages"])
+            print(f"[BENCH] seed {seed} {name:>10}: {'reached' if result['reached'] else 'missed'} in "
+                  f"{result['games']} games, {result['steps']} steps, {result['seconds']:.1f}s {stages}")
+
+    print(f"Mean score {args.target_score} over 20 games on the full board (give up after {args.episodes} games)")
+    print(f"{'':>10} {'reached':>8} {'seconds':>8} {'games':>6} {'steps':>7}")
+    for name, runs in results.items():
+        reached = sum(run["reached"] for run in runs)
+        seconds = np.mean([run["seconds"] for run in runs])
+        games = np.mean([run["games"] for run in runs])
+        steps = np.mean([run["steps"] for run in runs])
+        print(f"{name:>10} {reached:>5}/{len(runs)} {seconds:>8.1f} {games:>6.0f} {steps:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
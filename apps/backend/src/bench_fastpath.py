@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+import numpy as np
+import socketio
+from aiohttp import web
+from socketio import packet
+
+from compute_pool import ComputePool
+from fastpath import (
+    CONTROL_CLIENT, FASTPATH_ROUTE, OP_STARTED, OP_STATE, START, STATE, FastGame, decode_states, fastpath_handler,
+)
+from game import Game
+
+
+# Define constants for the benchmark
+PORT = 8799  # Separate from the real server's 8765
+GAMES = 1000  # Games per connection
+
+
+def new_games(count: int) -> List[FastGame]:
+    """Client-controlled games on the default board."""
+    return [FastGame(game_id, Game(), None) for game_id in range(count)]
+
+
+def bench_codecs(games: int, ticks: int) -> None:
+    """Encode and decode cost of one tick of ``games`` games, without a network."""
+    fast_games = new_games(games)
+    step = socketio_one = socketio_batch = binary = 0.0
+    decode_one = decode_batch = decode_binary = 0.0
+    size_one = size_batch = size_binary = 0
+
+    for _ in range(ticks):
+        start = time.perf_counter()
+        records = [fast.step() for fast in fast_games]
+        step += time.perf_counter() - start
+        states = [fast.game.to_dict() for fast in fast_games]
+
+        # Socket.IO today: one game_update event (JSON) per game
+        start = time.perf_counter()
+        encoded = [packet.Packet(packet.EVENT, data=["game_update", state]).encode() for state in states]
+        socketio_one += time.perf_counter() - start
+        size_one += sum(len(e) + 1 for e in encoded)  # + engine.io message type byte
+        start = time.perf_counter()
+        for e in encoded:
+            packet.Packet(encoded_packet=e)
+        decode_one += time.perf_counter() - start
+
+        # Socket.IO with every game of the tick in one event
+        start = time.perf_counter()
+        encoded_batch = packet.Packet(packet.EVENT, data=["game_update", states]).encode()
+        socketio_batch += time.perf_counter() - start
+        size_batch += len(encoded_batch) + 1
+        start = time.perf_counter()
+        packet.Packet(encoded_packet=encoded_batch)
+        decode_batch += time.perf_counter() - start
+
+        # Fast path: one STATE message
+        start = time.perf_counter()
+        message = np.array(records, dtype=STATE).tobytes()
+        binary += time.perf_counter() - start
+        size_binary += len(message) + 9
+        start = time.perf_counter()
+        np.frombuffer(message, dtype=STATE).tolist()
+        decode_binary += time.perf_counter() - start
+
+    ms = 1000 / ticks
+    print(f"One tick of {games} games (stepping them: {step * ms:.2f} ms)")
+    print(f"{'':>28} {'encode':>9} {'decode':>9} {'bytes':>9}")
+    for name, encode, decode, size in (
+        ("Socket.IO, event per game", socketio_one, decode_one, size_one),
+        ("Socket.IO, one event", socketio_batch, decode_batch, size_batch),
+        ("binary fast path", binary, decode_binary, size_binary),
+    ):
+        print(f"{name:>28} {encode * ms:>6.2f} ms {decode * ms:>6.2f} ms {size // ticks:>9}")
+
+
+def serve() -> None:
+    """
+    Benchmark server: the real fast-path handler (stepping on a compute
+    pool, as in the server), plus a Socket.IO event that plays the same
+    games as fast as possible and emits every state.
+    """
+    sio = socketio.AsyncServer(cors_allowed_origins="*")
+    app = web.Application()
+    sio.attach(app)
+    compute = ComputePool()
+    compute.start()
+    app.router.add_get(FASTPATH_ROUTE, fastpath_handler(compute.run))
+
+    @sio.event
+    async def play(sid: str, data: Dict[str, Any]) -> None:
+        fast_games = new_games(data["games"])
+        deadline = time.perf_counter() + data["seconds"]
+        while time.perf_counter() < deadline:
+            records = [fast.step() for fast in fast_games]
+            if data["batch"]:
+                await sio.emit("game_update", [fast.game.to_dict() for fast in fast_games], to=sid)
+            else:
+                for fast in fast_games:
+                    await sio.emit("game_update", fast.game.to_dict(), to=sid)
+            await asyncio.sleep(0)
+        await sio.emit("done", len(records), to=sid)
+
+    web.run_app(app, port=PORT, print=None)
+
+
+async def run_socketio(games: int, seconds: float, batch: bool) -> float:
+    """Game states per second received over Socket.IO."""
+    client = socketio.AsyncClient()
+    received = 0
+    finished = asyncio.Event()
+
+    @client.on("game_update")
+    async def on_update(data: Any) -> None:
+        nonlocal received
+        received += len(data) if batch else 1
+
+    @client.on("done")
+    async def on_done(data: Any) -> None:
+        finished.set()
+
+    await client.connect(f"http://localhost:{PORT}", transports=["websocket"])
+    start = time.perf_counter()
+    await client.emit("play", {"games": games, "seconds": seconds, "batch": batch})
+    await finished.wait()
+    elapsed = time.perf_counter() - start
+    await client.disconnect()
+    return received / elapsed
+
+
+async def run_fastpath(games: int, seconds: float) -> float:
+    """Game states per second received over the binary WebSocket."""
+    received = 0
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(f"http://localhost:{PORT}{FASTPATH_ROUTE}") as ws:
+            for game_id in range(games):
+                await ws.send_bytes(START.pack(1, game_id, 0, 0, 1, CONTROL_CLIENT))
+            start = time.perf_counter()
+            async for message in ws:
+                if message.data[0] == OP_STATE:
+                    received += len(decode_states(message.data)[2])
+                elif message.data[0] != OP_STARTED:
+                    raise RuntimeError(message.data[5:].decode())
+                if time.perf_counter() - start > seconds:
+                    break
+            elapsed = time.perf_counter() - start
+    return received / elapsed
+
+
+def main() -> None:
+    """Socket.IO JSON events vs the binary fast path, at 1k games per connection."""
+    parser = argparse.ArgumentParser(description="Benchmark the binary WebSocket fast path")
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    bench_codecs(args.games, args.ticks)
+
+    server = multiprocessing.Process(target=serve, daemon=True)
+    server.start()
+    time.sleep(3)
+    try:
+        print(f"\nEnd to end, {args.games} games on one connection, ticking flat out for {args.seconds:.0f}s:")
+        results = {
+            "Socket.IO, event per game": asyncio.run(run_socketio(args.games, args.seconds, batch=False)),
+            "Socket.IO, one event": asyncio.run(run_socketio(args.games, args.seconds, batch=True)),
+            "binary fast path": asyncio.run(run_fastpath(args.games, args.seconds)),
+        }
+        for name, rate in results.items():
+            print(f"{name:>28} {rate:>10.0f} game states/s ({rate / args.games:.0f} ticks/s)")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+import torch
+
+from game import Game
+from model import ConvQNet, QTrainer, to_tensor
+from observation import NUM_CHANNELS, GridEncoder
+from simulation import apply_action
+
+
+# Board sizes measured by the benchmark
+GRID_SIZES: List[Tuple[int, int]] = [(29, 19), (64, 64)]
+STEPS = 20_000  # Game steps per encoding measurement
+BATCH_SIZE = 1000  # Same batch size as the agent's long-memory training
+TRAIN_BATCHES = 10
+
+
+def random_states(width: int, height: int, steps: int) -> Tuple[List[np.ndarray], float, float]:
+    """
+    Play random moves, encoding every step incrementally and from scratch.
+
+    Returns:
+        The encoded states, and seconds spent in incremental and full encoding
+    """
+    random.seed(0)
+    game = Game()
+    game.grid_width, game.grid_height = width, height
+    game.reset()
+    incremental = GridEncoder(width, height)
+    full = GridEncoder(width, height)
+    states: List[np.ndarray] = []
+    incremental_time = full_time = 0.0
+
+    for _ in range(steps):
+        action = [0, 0, 0]
+        action[random.randint(0, 2)] = 1
+        apply_action(game, action)
+        game.step()
+        if not game.running:
+            game.reset()
+
+        start = time.perf_counter()
+        image = incremental.encode(game)
+        incremental_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        full.rebuild(game)
+        full_time += time.perf_counter() - start
+
+        assert np.array_equal(image, full.image)
+        if len(states) < BATCH_SIZE * 2:
+            states.append(image.copy())
+    return states, incremental_time, full_time
+
+
+def main() -> None:
+    """Measure grid encoding and conv-network training throughput."""
+    torch.manual_seed(0)
+    print(f"{'grid':>8} {'incremental':>14} {'full rebuild':>14} {'stack batch':>12} {'train':>12}")
+    for width, height in GRID_SIZES:
+        states, incremental_time, full_time = random_states(width, height, STEPS)
+
+        # Batch assembly: one np.stack + one tensor conversion
+        batch = states[:BATCH_SIZE]
+        start = time.perf_counter()
+        for _ in range(TRAIN_BATCHES):
+            to_tensor(batch, torch.float)
+        stack_rate = BATCH_SIZE * TRAIN_BATCHES / (time.perf_counter() - start)
+
+        # Full training steps on batches of board images
+        trainer = QTrainer(ConvQNet(NUM_CHANNELS, 3), lr=0.001, gamma=0.9)
+        actions = [[1, 0, 0]] * BATCH_SIZE
+        rewards = [0.0] * BATCH_SIZE
+        dones = [False] * BATCH_SIZE
+        next_states = states[BATCH_SIZE:BATCH_SIZE * 2]
+        start = time.perf_counter()
+        for _ in range(TRAIN_BATCHES):
+            trainer.train_step(batch, actions, rewards, next_states, dones)
+        train_rate = BATCH_SIZE * TRAIN_BATCHES / (time.perf_counter() - start)
+
+        print(
+            f"{width:>4}x{height:<3} {STEPS / incremental_time:>10.0f}/s "
+            f"{STEPS / full_time:>10.0f}/s {stack_rate:>8.0f}/s {train_rate:>8.0f}/s"
+        )
+    print("(encoding in steps/s; batch stacking and training in samples/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent import DQN
+from game import Game
+from headless import seed_everything
+from recorder import EpisodeRecorder, RecordingReader
+from simulation import end_episode, play_step
+
+
+class TimedRecorder(EpisodeRecorder):
+    """EpisodeRecorder that adds up the time spent recording."""
+
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.seconds = 0.0
+
+    def record(self, *args: Any) -> None:
+        start = time.perf_counter()
+        super().record(*args)
+        self.seconds += time.perf_counter() - start
+
+    def finish(self, *args: Any, **kwargs: Any) -> None:
+        start = time.perf_counter()
+        super().finish(*args, **kwargs)
+        self.seconds += time.perf_counter() - start
+
+
+def run(episodes: int, seed: int, recorder: Optional[EpisodeRecorder], keep: bool) -> Tuple[float, int, List[Any]]:
+    """
+    Train for ``episodes`` games, optionally recording them.
+
+    Returns:
+        Seconds spent, steps taken and (if ``keep``) every frame as
+        (snake, food, score) for checking playback
+    """
+    seed_everything(seed)
+    game = Game()
+    agent = DQN(share_model=False)
+    agent.trainer
+    if recorder is not None:
+        recorder.begin(game)
+    frames: List[Any] = []
+    steps = 0
+    start = time.perf_counter()
+    while agent.n_games < episodes:
+        _, done = play_step(game, agent, recorder)
+        steps += 1
+        if keep:
+            frames.append((list(game.snake.body), game.food.position, game.score))
+        if done:
+            end_episode(game, agent, recorder)
+    return time.perf_counter() - start, steps, frames
+
+
+def json_bytes(episodes: int, seed: int) -> int:
+    """Size of the game_update payloads the same games send as JSON."""
+    seed_everything(seed)
+    game = Game()
+    agent = DQN(share_model=False)
+    total = 0
+    while agent.n_games < episodes:
+        _, done = play_step(game, agent)
+        state: Dict[str, Any] = game.to_dict()
+        state["agent_stats"] = {"games": agent.n_games, "record": agent.record, "epsilon": agent.epsilon}
+        total += len(json.dumps(state))
+        if done:
+            end_episode(game, agent)
+    return total
+
+
+def main() -> None:
+    """Measure recording overhead, file size and seek time."""
+    parser = argparse.ArgumentParser(description="Benchmark episode recording and playback")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seeks", type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    run(5, args.seed, None, keep=False)  # Warm up torch
+    plain_seconds, steps, _ = run(args.episodes, args.seed, None, keep=False)
+    recorder = TimedRecorder("bench", directory)
+    run(args.episodes, args.seed, recorder, keep=False)
+    recorder.close()
+
+    # Same games again, to check playback against the real states
+    check = EpisodeRecorder("check", directory)
+    _, _, frames = run(args.episodes, args.seed, check, keep=True)
+    check.close()
+    reader = RecordingReader("check", directory)
+    replayed = [
+        (frame["snake"], tuple(frame["food"]), frame["score"])
+        for episode in range(len(reader))
+        for frame in reader.frames(episode, 0)
+    ]
+    assert replayed == frames, "playback differs from the recorded games"
+
+    # Random seeks: time to the first frame of an arbitrary (episode, tick)
+    rng = random.Random(args.seed)
+    targets = []
+    for _ in range(args.seeks):
+        episode = rng.randrange(len(reader))
+        targets.append((episode, rng.randrange(reader.episode(episode)["ticks"])))
+    start = time.perf_counter()
+    for episode, tick in targets:
+        next(reader.frames(episode, tick))
+    seek_time = (time.perf_counter() - start) / args.seeks
+    reader.close()
+
+    rec_bytes = sum(os.path.getsize(os.path.join(directory, f"bench{ext}")) for ext in (".rec", ".idx"))
+    payload_bytes = json_bytes(args.episodes, args.seed)
+    overhead = recorder.seconds / plain_seconds
+
+    print(f"{args.episodes} episodes, {steps} ticks (playback verified)")
+    print(f"recording: {recorder.seconds / steps * 1e6:.1f} us/tick on top of a {plain_seconds / steps * 1e6:.0f} us "
+          f"training step ({overhead:.2%})")
+    print(f"size: {rec_bytes / 1024:.1f} KiB recording vs {payload_bytes / 1024:.1f} KiB of game_update JSON "
+          f"({payload_bytes / rec_bytes:.0f}x smaller, {rec_bytes / steps:.2f} bytes/tick)")
+    print(f"seek to a random episode and tick: {seek_time * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import random
+import time
+from typing import List, Tuple
+
+import numpy as np
+
+from agent import DQN
+from batch_rewards import BatchRewards, EpisodeStats
+from game import Game
+from simulation import apply_action
+
+
+def play(games: List[Game], rng: random.Random) -> Tuple[np.ndarray, ...]:
+    """One random step of every game: heads, foods, lengths, scores, dones (before resets)."""
+    count = len(games)
+    heads = np.empty((count, 2), dtype=np.int64)
+    foods = np.empty((count, 2), dtype=np.int64)
+    lengths = np.empty(count, dtype=np.int64)
+    scores = np.empty(count, dtype=np.int64)
+    dones = np.empty(count, dtype=np.bool_)
+    for i, game in enumerate(games):
+        move = [0, 0, 0]
+        # Mostly straight, with enough turns to survive a while and eat
+        move[0 if rng.random() < 0.7 else rng.randint(1, 2)] = 1
+        apply_action(game, move)
+        game.step()
+        heads[i] = game.snake.head
+        foods[i] = game.food.position
+        lengths[i] = len(game.snake.body)
+        scores[i] = game.score
+        dones[i] = not game.running
+    return heads, foods, lengths, scores, dones
+
+
+def main() -> None:
+    """Cost of calculate_reward per game vs BatchRewards (their equality is tested in test_batch_rewards.py)."""
+    parser = argparse.ArgumentParser(description="Benchmark batched rewards")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    random.seed(0)
+    games = [Game() for _ in range(args.games)]
+    agents = [DQN() for _ in range(args.games)]
+    batch = BatchRewards(args.games)
+    stats = EpisodeStats()
+    scalar_time = batch_time = scalar_stats_time = batch_stats_time = 0.0
+    episodes = record = total = 0
+
+    for _ in range(args.steps):
+        heads, foods, lengths, scores, dones = play(games, rng)
+
+        # One agent per game, as update_game does it
+        start = time.perf_counter()
+        for game, agent in zip(games, agents):
+            agent.calculate_reward(game, not game.running)
+        for done, agent in zip(dones, agents):
+            if done:
+                agent.prev_distance = None
+                agent.prev_length = 1
+        scalar_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch(heads, foods, lengths, dones)
+        batch_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for score, done in zip(scores.tolist(), dones.tolist()):
+            if done:
+                episodes += 1
+                total += score
+                record = max(record, score)
+        scalar_stats_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats.update(scores, dones)
+        batch_stats_time += time.perf_counter() - start
+
+        for game, done in zip(games, dones):
+            if done:
+                game.reset()
+
+    summary = stats.stats()
+    print(f"{args.games} games x {args.steps} steps "
+          f"({summary['episodes']} episodes, record {summary['record']}, mean score {summary['mean_score']:.2f})")
+    us = 1e6 / args.steps
+    print(f"{'':>22} {'per step':>10}")
+    print(f"{'calculate_reward loop':>22} {scalar_time * us:>7.0f} us")
+    print(f"{'BatchRewards':>22} {batch_time * us:>7.0f} us")
+    print(f"{'stats loop':>22} {scalar_stats_time * us:>7.0f} us")
+    print(f"{'EpisodeStats':>22} {batch_stats_time * us:>7.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import gc
+import os
+import tracemalloc
+from typing import Any, Dict, List
+
+from agent import DQN
+from backpressure import FrameGate
+from game import Game
+from simulation import play_step
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process (Linux)."""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def idle_session() -> Dict[str, Any]:
+    """What start_game keeps per client before the first training step."""
+    return {
+        "game": Game(),
+        "agent": DQN(),
+        "active": True,
+        "prev_state": None,
+        "prev_action": None,
+        "turbo": False,
+        "flow": FrameGate(),
+    }
+
+
+def measure(count: int, materialize: bool, steps: int = 0) -> Dict[str, float]:
+    """Bytes per session for ``count`` sessions that played ``steps`` ticks (0 = idle)."""
+    gc.collect()
+    tracemalloc.start()
+    rss_before = rss_bytes()
+    py_before = tracemalloc.get_traced_memory()[0]
+
+    sessions: List[Dict[str, Any]] = []
+    for _ in range(count):
+        session = idle_session()
+        if materialize:
+            # What every session used to hold: its own network, Adam
+            # optimizer and replay memory from the start
+            session["agent"].trainer
+            session["agent"].memory
+        for _ in range(steps):
+            # update_game trains on every tick, so the first one already
+            # gives the agent its private model, optimizer and memory
+            play_step(session["game"], session["agent"])
+        sessions.append(session)
+
+    gc.collect()
+    py_bytes = tracemalloc.get_traced_memory()[0] - py_before
+    rss = rss_bytes() - rss_before
+    tracemalloc.stop()
+    del sessions
+    return {"python": py_bytes / count, "rss": rss / count}
+
+
+def main() -> None:
+    """
+    Report the per-session memory budget of connected clients.
+
+    By default the sessions are idle (started, never ticked), the only
+    state in which the shared starting network saves memory: a session's
+    first tick trains its agent and makes it copy the network. Measure
+    clients that are playing with ``--steps``; gradients, Adam state and
+    replay memory make them cost more than ``--materialized`` ones.
+    """
+    parser = argparse.ArgumentParser(description="Memory per game session")
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--materialized", action="store_true",
+                        help="give every agent a private model/optimizer/memory (pre copy-on-write behavior)")
+    parser.add_argument("--steps", type=int, default=0, help="ticks each session plays before measuring (0 = idle)")
+    args = parser.parse_args()
+
+    # Warm up torch and the shared networks so one-time costs aren't counted
+    DQN().trainer
+
+    result = measure(args.sessions, args.materialized, args.steps)
+    label = "private model" if args.materialized else "shared model"
+    state = f"after {args.steps} ticks" if args.steps else "idle"
+    print(f"{args.sessions} sessions, {state} ({label}): "
+          f"{result['rss'] / 1024:.1f} KiB RSS/session, "
+          f"{result['python'] / 1024:.1f} KiB Python heap/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from stats_store import StatsStore, connect
+
+
+def main() -> None:
+    """Game-over cost on the tick path, write throughput and query latency of the stats store."""
+    parser = argparse.ArgumentParser(description="Benchmark the persistent stats store")
+    parser.add_argument("--games", type=int, default=200_000, help="games in the database")
+    parser.add_argument("--models", type=int, default=20)
+    parser.add_argument("--direct", type=int, default=500, help="games inserted one commit at a time")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp()
+
+    def game(i: int) -> tuple:
+        model = f"model-{i % args.models}"
+        return (f"run-{i % 500}", model, i // 500, rng.randint(0, 60), 60, 29, 19)
+
+    # What writing straight from the game loop would cost: one commit per game
+    conn = connect(os.path.join(directory, "direct.db"))
+    start = time.perf_counter()
+    for i in range(args.direct):
+        with conn:
+            conn.execute(
+                "INSERT INTO games (run, model, game, score, record, grid_width, grid_height, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                game(i) + (time.time(),),
+            )
+    direct = (time.perf_counter() - start) / args.direct
+    conn.close()
+
+    # The store: what the game loop pays is add(); the writer batches
+    store = StatsStore(os.path.join(directory, "stats.db"), max_pending=args.games)  # Room for the whole burst
+    store.start()
+    adds = []
+    start = time.perf_counter()
+    for i in range(args.games):
+        t = time.perf_counter()
+        store.add(*game(i))
+        adds.append(time.perf_counter() - t)
+    queued = time.perf_counter() - start
+    store.close()
+    written = time.perf_counter() - start
+    stats = store.stats()
+    assert stats["written"] == args.games, stats
+
+    print(f"Game over on the tick path ({args.games} games):")
+    print(f"  insert + commit per game  {1e6 * direct:>8.1f} us")
+    print(f"  StatsStore.add            {1e6 * np.mean(adds):>8.1f} us (p99 {1e6 * np.percentile(adds, 99):.1f} us)")
+    print(f"  writer: {args.games} games in {stats['flushes']} batches, {args.games / written:,.0f} games/s, "
+          f"{stats['mean_flush_ms']:.1f} ms per batch, {queued:.2f}s to queue them")
+
+    # Queries against the full table, first hit and cached
+    print(f"Queries over {args.games} games ({args.models} models):")
+    queries = {
+        "leaderboard top 10": lambda: store.leaderboard(10),
+        "leaderboard of a model": lambda: store.leaderboard(10, "model-3"),
+        "history of a run": lambda: store.history(run="run-7"),
+        "history of a model": lambda: store.history(model="model-3"),
+        "curve, all models": lambda: store.curve(),
+        "curve of a model": lambda: store.curve("model-3"),
+    }
+    for name, query in queries.items():
+        start = time.perf_counter()
+        query()
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(100):
+            query()
+        cached = (time.perf_counter() - start) / 100
+        print(f"  {name:<24} {1000 * first:>8.2f} ms, cached {1e6 * cached:>6.1f} us")
+
+
+if __name__ == "__main__":
+    main()
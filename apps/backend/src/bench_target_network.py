@@ -0,0 +1,50 @@
+import argparse
+from typing import Any, Dict, List
+
+import numpy as np
+
+from headless import train
+
+
+# Configurations compared by the benchmark
+CONFIGS: Dict[str, Dict[str, Any]] = {
+    "online targets": {},
+    "target sync/500": {"target_update": 500},
+    "polyak 0.005": {"tau": 0.005},
+    "double + sync/500": {"target_update": 500, "double": True},
+}
+
+
+def main() -> None:
+    """Compare time and environment steps to a fixed average score per target setup."""
+    parser = argparse.ArgumentParser(description="Benchmark target-network settings")
+    parser.add_argument("--target-score", type=float, default=5.0)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--episodes", type=int, default=300, help="give up after this many games")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    args = parser.parse_args()
+
+    print(f"Games until the average of {args.window} games reaches {args.target_score} "
+          f"(cap {args.episodes} games, seeds {args.seeds})")
+    print(f"{'config':<20} {'reached':>8} {'games':>8} {'env steps':>10} {'seconds':>8}")
+    for name, config in CONFIGS.items():
+        runs: List[Dict[str, Any]] = []
+        for seed in args.seeds:
+            result = train(
+                episodes=args.episodes,
+                target_score=args.target_score,
+                window=args.window,
+                seed=seed,
+                **config,
+            )
+            runs.append(result)
+
+        reached = sum(run["reached"] for run in runs)
+        games = np.mean([run["games"] for run in runs])
+        steps = np.mean([run["steps"] for run in runs])
+        seconds = np.mean([run["seconds"] for run in runs])
+        print(f"{name:<20} {reached:>5}/{len(runs):<2} {games:>8.0f} {steps:>10.0f} {seconds:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+import random
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from food import Food
+from game import Game
+from snake import Snake
+
+
+# Define constants for large boards
+LARGE_BOARD_CELLS = 128 * 128  # Boards with more cells than this use LargeGame
+CHUNK_SIZE = 32  # Side of one occupancy chunk (cells)
+VIEWPORT_SIZE = 41  # Side of the window around the head sent every tick (odd: head centered)
+MINIMAP_SIZE = 64  # Side of the downsampled whole-board map
+MINIMAP_EVERY = 10  # Ticks between minimap updates
+FOOD_DENSITY = 1 / 2000  # Food items per cell on large boards
+MAX_FOODS = 50_000
+SPAWN_TRIES = 100  # Random picks before giving up on placing a food item
+
+Cell = Tuple[int, int]
+
+
+class ChunkedGrid:
+    """
+    A sparse set of cells, bucketed into CHUNK_SIZE x CHUNK_SIZE chunks.
+
+    Only chunks that contain something exist, so memory follows the number
+    of cells stored, not the board area. Membership is O(1); a rectangle
+    query only visits the chunks it overlaps; the nearest cell is found by
+    searching chunk rings outwards. A MINIMAP_SIZE x MINIMAP_SIZE array of
+    counts is kept up to date on every add/remove, so a whole-board
+    overview never needs a scan.
+    """
+
+    __slots__ = ("chunks", "count", "bins", "bin_width", "bin_height")
+
+    def __init__(self, grid_width: int, grid_height: int) -> None:
+        """An empty set for a board of the given size."""
+        self.chunks: Dict[Cell, Set[Cell]] = {}
+        self.count = 0
+        self.bins = np.zeros((MINIMAP_SIZE, MINIMAP_SIZE), dtype=np.int32)
+        self.bin_width = max(1, -(-grid_width // MINIMAP_SIZE))
+        self.bin_height = max(1, -(-grid_height // MINIMAP_SIZE))
+
+    def __contains__(self, cell: Cell) -> bool:
+        chunk = self.chunks.get((cell[0] // CHUNK_SIZE, cell[1] // CHUNK_SIZE))
+        return chunk is not None and cell in chunk
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, cell: Cell) -> None:
+        """Insert a cell (no-op if present)."""
+        key = (cell[0] // CHUNK_SIZE, cell[1] // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = set()
+        if cell not in chunk:
+            chunk.add(cell)
+            self.count += 1
+            self.bins[cell[1] // self.bin_height, cell[0] // self.bin_width] += 1
+
+    def discard(self, cell: Cell) -> None:
+        """Remove a cell (no-op if absent); empty chunks are dropped."""
+        key = (cell[0] // CHUNK_SIZE, cell[1] // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        if chunk is not None and cell in chunk:
+            chunk.remove(cell)
+            self.count -= 1
+            self.bins[cell[1] // self.bin_height, cell[0] // self.bin_width] -= 1
+            if not chunk:
+                del self.chunks[key]
+
+    def cells_in(self, x0: int, y0: int, x1: int, y1: int) -> List[Cell]:
+        """Cells with x0 <= x < x1 and y0 <= y < y1."""
+        found: List[Cell] = []
+        for cx in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1):
+            for cy in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk:
+                    found.extend(c for c in chunk if x0 <= c[0] < x1 and y0 <= c[1] < y1)
+        return found
+
+    def nearest(self, cell: Cell, max_rings: int) -> Optional[Cell]:
+        """
+        The stored cell closest to ``cell`` (Manhattan distance).
+
+        Chunk rings are searched outwards until no unvisited ring can hold
+        anything closer than the best cell so far.
+        """
+        if not self.count:
+            return None
+        home_x, home_y = cell[0] // CHUNK_SIZE, cell[1] // CHUNK_SIZE
+        best: Optional[Cell] = None
+        best_distance = 0
+        for ring in range(max_rings + 1):
+            if best is not None and (ring - 1) * CHUNK_SIZE + 1 > best_distance:
+                break
+            if ring == 0:
+                keys = [(home_x, home_y)]
+            else:
+                keys = [(home_x + d, home_y - ring) for d in range(-ring, ring + 1)]
+                keys += [(home_x + d, home_y + ring) for d in range(-ring, ring + 1)]
+                keys += [(home_x - ring, home_y + d) for d in range(-ring + 1, ring)]
+                keys += [(home_x + ring, home_y + d) for d in range(-ring + 1, ring)]
+            for key in keys:
+                for other in self.chunks.get(key, ()):
+                    distance = abs(other[0] - cell[0]) + abs(other[1] - cell[1])
+                    if best is None or distance < best_distance:
+                        best, best_distance = other, distance
+        return best
+
+    def minimap(self) -> bytes:
+        """
+        The minimap bins as MINIMAP_SIZE x MINIMAP_SIZE row-major bytes
+        (counts capped at 255), sent as a binary attachment.
+        """
+        return np.minimum(self.bins, 255).astype(np.uint8).tobytes()
+
+
+class LargeFood(Food):
+    """
+    The food the snake of a LargeGame is heading for.
+
+    A large board holds many food items (``game.foods``); ``position`` is
+    the one nearest to the snake, which is all the agent's features need.
+    Running over any food item eats it.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, game: "LargeGame") -> None:
+        """Target the food item nearest to the snake."""
+        self.game = game
+        self.eaten = False
+        self.position = game.snake.head
+        self.retarget()
+
+    def retarget(self) -> None:
+        """Aim at the food item nearest to the head."""
+        game = self.game
+        rings = max(game.grid_width, game.grid_height) // CHUNK_SIZE + 1
+        self.position = game.foods.nearest(game.snake.head, rings) or self.position
+
+    def check_eaten(self) -> None:
+        """Eat whatever food item the head is on, not only the target."""
+        head = self.game.snake.head
+        if head in self.game.foods:
+            self.position = head
+        super().check_eaten()
+
+    def spawn_food(self) -> None:
+        """Replace the eaten item somewhere random and pick a new target."""
+        if self.eaten:
+            self.game.foods.discard(self.position)
+            self.game.scatter_food(1)
+            self.retarget()
+            self.eaten = False
+
+
+class LargeGame(Game):
+    """
+    A Game for boards far bigger than a screen (up to 10,000 x 10,000).
+
+    What differs from Game:
+
+    - Snake cells and food items live in ChunkedGrids, kept in sync with the
+      snake one move at a time, so nothing per tick touches the whole board.
+    - There are many food items (FOOD_DENSITY per cell); the agent steers
+      towards the nearest one (LargeFood).
+    - ``to_dict()`` only describes the VIEWPORT_SIZE window around the head;
+      ``minimap()`` gives a MINIMAP_SIZE overview of the whole board, meant
+      to be sent every MINIMAP_EVERY ticks.
+
+    The rest (Snake, rewards, features, recordings) works unchanged.
+    """
+
+    __slots__ = ("occupancy", "foods", "food_count", "synced_moves", "ticks")
+
+    def __init__(self, grid_width: int, grid_height: int, foods: Optional[int] = None) -> None:
+        """Create a board of the given size with ``foods`` food items."""
+        super().__init__()
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.food_count = foods or max(1, min(MAX_FOODS, int(grid_width * grid_height * FOOD_DENSITY)))
+        self.foods = ChunkedGrid(grid_width, grid_height)
+        self.occupancy = ChunkedGrid(grid_width, grid_height)
+        self.ticks = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """New snake; the food field carries over between episodes."""
+        self.score = 0
+        self.snake = Snake(self)
+        self.occupancy = ChunkedGrid(self.grid_width, self.grid_height)
+        for cell in self.snake.body:
+            self.occupancy.add(cell)
+            self.foods.discard(cell)
+        self.synced_moves = self.snake.moves
+        self.scatter_food(self.food_count - len(self.foods))
+        self.food = LargeFood(self)
+        self.running = True
+        self.last_tick = time.time()
+
+    def scatter_food(self, count: int) -> None:
+        """Add ``count`` food items on random free cells."""
+        for _ in range(count):
+            for _ in range(SPAWN_TRIES):
+                cell = (random.randrange(self.grid_width), random.randrange(self.grid_height))
+                if cell not in self.occupancy and cell not in self.foods:
+                    self.foods.add(cell)
+                    break
+
+    def step(self) -> None:
+        """Advance one frame, then apply the snake's move to the occupancy index."""
+        super().step()
+        snake = self.snake
+        if snake.moves != self.synced_moves:
+            self.occupancy.add(snake.head)
+            if snake.last_tail is not None:
+                self.occupancy.discard(snake.last_tail)
+            self.synced_moves = snake.moves
+        self.ticks += 1
+
+    def viewport(self) -> Tuple[int, int, int, int]:
+        """The (x, y, width, height) window around the head, kept on the board."""
+        width = min(VIEWPORT_SIZE, self.grid_width)
+        height = min(VIEWPORT_SIZE, self.grid_height)
+        x = min(max(self.snake.head[0] - width // 2, 0), self.grid_width - width)
+        y = min(max(self.snake.head[1] - height // 2, 0), self.grid_height - height)
+        return x, y, width, height
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        The part of the game around the head.
+
+        Same keys as Game.to_dict (in board coordinates) plus ``viewport``
+        and the other visible food items. ``snake`` holds the visible
+        segments in body order, head first, as the frontend and spectator
+        feeds expect; segments outside the viewport are left out.
+        """
+        x, y, width, height = self.viewport()
+        # Walking the body (not the occupancy index) keeps head-to-tail order
+        body = [
+            cell for cell in self.snake.body
+            if x <= cell[0] < x + width and y <= cell[1] < y + height
+        ]
+        return {
+            "grid_width": self.grid_width,
+            "grid_height": self.grid_height,
+            "game_tick": self.game_tick,
+            "viewport": {"x": x, "y": y, "width": width, "height": height},
+            "snake": body,
+            "food": self.food.position,
+            "foods": self.foods.cells_in(x, y, x + width, y + height),
+            "score": self.score,
+            "length": len(self.snake.body),
+        }
+
+    def minimap(self) -> Dict[str, Any]:
+        """Downsampled whole-board overview: snake and food counts per bin (see ChunkedGrid.minimap)."""
+        return {
+            "size": MINIMAP_SIZE,
+            "bin_width": self.occupancy.bin_width,
+            "bin_height": self.occupancy.bin_height,
+            "head": self.snake.head,
+            "snake": self.occupancy.minimap(),
+            "foods": self.foods.minimap(),
+        }
+
+
+def make_game(grid_width: Optional[int] = None, grid_height: Optional[int] = None) -> Game:
+    """
+    A Game, or a LargeGame if the board has more than LARGE_BOARD_CELLS cells.
+
+    Missing sizes keep the Game defaults.
+    """
+    game = Game()
+    width = grid_width or game.grid_width
+    height = grid_height or game.grid_height
+    if width * height > LARGE_BOARD_CELLS:
+        return LargeGame(width, height)
+    game.grid_width = width
+    game.grid_height = height
+    game.reset()
+    return game
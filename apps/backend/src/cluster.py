@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import struct
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+
+# Environment variable that tells a worker where the message queue lives
+MQ_SOCKET_ENV = "SNAKE_MQ_SOCKET"
+
+# Queue frame header: payload size, route size (big-endian); then the
+# route (UTF-8) and the JSON payload
+FRAME_HEADER = struct.Struct("!IH")
+
+# Routes: which workers the broker hands a frame to. The broker reads only
+# the route, never the payload.
+ROUTE_ALL = ""  # Every other worker
+SUBSCRIBE = "+"  # "+<key>": send me frames routed to <key> (not relayed)
+UNSUBSCRIBE = "-"  # "-<key>": stop sending me frames routed to <key>
+
+
+def room_route(namespace: str, room: str) -> str:
+    """Route of a Socket.IO room; every sid is a room of its own, too."""
+    return f"room:{namespace}:{room}"
+
+
+def host_route(host_id: str) -> str:
+    """Route of one worker (replies to its emit callbacks)."""
+    return f"host:{host_id}"
+
+
+def encode_frame(message: Optional[Dict[str, Any]], route: str = ROUTE_ALL) -> bytes:
+    """Serialize one queue message as a routed, length-prefixed JSON frame."""
+    payload = json.dumps(message).encode() if message is not None else b""
+    route_bytes = route.encode()
+    return FRAME_HEADER.pack(len(payload), len(route_bytes)) + route_bytes + payload
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[str, bytes]:
+    """Read one frame from a queue connection: (route, raw frame with header)."""
+    header = await reader.readexactly(FRAME_HEADER.size)
+    size, route_size = FRAME_HEADER.unpack(header)
+    body = await reader.readexactly(route_size + size)
+    return body[:route_size].decode(), header + body
+
+
+def frame_message(frame: bytes) -> Dict[str, Any]:
+    """The JSON payload of a raw frame."""
+    _, route_size = FRAME_HEADER.unpack_from(frame)
+    return json.loads(frame[FRAME_HEADER.size + route_size:])
+
+
+class LocalQueueManager(AsyncPubSubManager):
+    """
+    Socket.IO client manager backed by a local message queue.
+
+    This plays the role Redis plays in a multi-host deployment: workers
+    publish emits, room changes and disconnects to the broker, which hands
+    them to the workers that own their target. That's what lets a worker
+    emit to a sid or a room whose connections live in another process.
+
+    Unlike a plain pub/sub channel, traffic is routed so it doesn't grow
+    with workers x emits:
+
+    - An emit to a sid connected to this worker (every game_update) is
+      delivered locally and never published.
+    - Every other message carries a route: the room or sid it is about, or
+      the worker waiting for a callback. Each worker subscribes to the
+      rooms (sid rooms included) it has members in, so the broker only
+      hands a frame to workers that can deliver it. Emits to a whole
+      namespace go to everyone.
+
+    Besides the standard Socket.IO messages, workers can register handlers
+    for their own message types with ``on()`` and send them to every other
+    worker with ``forward()``.
+    """
+
+    name = "localqueue"
+
+    def __init__(self, path: str, channel: str = "socketio", write_only: bool = False) -> None:
+        """Connect lazily to the broker listening on the Unix socket ``path``."""
+        super().__init__(channel=channel, write_only=write_only)
+        self.path = path
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.connect_lock: Optional[asyncio.Lock] = None
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]] = {}
+        self.subscriptions: Set[str] = set()  # Routes this worker has members for
+
+    def on(self, method: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Register a coroutine for custom queue messages of type ``method``."""
+        self.handlers[method] = handler
+
+    async def forward(self, method: str, **payload: Any) -> None:
+        """Send a custom message to every other worker."""
+        await self._publish(dict(payload, method=method, host_id=self.host_id))
+
+    async def emit(self, event: str, data: Any, namespace: Optional[str] = None, room: Any = None,
+                   skip_sid: Any = None, callback: Any = None, to: Any = None, **kwargs: Any) -> Any:
+        """Emit; a client of this worker gets it directly, without the queue."""
+        room = to or room
+        if isinstance(room, str) and self.is_connected(room, namespace or "/"):
+            kwargs["ignore_queue"] = True
+        return await super().emit(event, data, namespace=namespace, room=room,
+                                  skip_sid=skip_sid, callback=callback, **kwargs)
+
+    def basic_enter_room(self, sid: str, namespace: str, room: Any, eio_sid: Any = None) -> None:
+        """Join a room, subscribing to its route when it's the first local member."""
+        super().basic_enter_room(sid, namespace, room, eio_sid=eio_sid)
+        if room is not None:
+            self.subscribe(room_route(namespace, room))
+
+    def basic_leave_room(self, sid: str, namespace: str, room: Any) -> None:
+        """Leave a room, unsubscribing once no local member is left."""
+        super().basic_leave_room(sid, namespace, room)
+        if room is not None and room not in self.rooms.get(namespace, {}):
+            self.unsubscribe(room_route(namespace, room))
+
+    def subscribe(self, route: str) -> None:
+        """Ask the broker for frames routed to ``route``."""
+        if route not in self.subscriptions:
+            self.subscriptions.add(route)
+            if self.writer is not None:
+                self.writer.write(encode_frame(None, SUBSCRIBE + route))
+
+    def unsubscribe(self, route: str) -> None:
+        """Stop receiving frames routed to ``route``."""
+        if route in self.subscriptions:
+            self.subscriptions.discard(route)
+            if self.writer is not None:
+                self.writer.write(encode_frame(None, UNSUBSCRIBE + route))
+
+    def route(self, data: Dict[str, Any]) -> str:
+        """Which workers need a message: the route of its room, sid or callback."""
+        method = data.get("method")
+        namespace = data.get("namespace") or "/"
+        if method == "callback":
+            return host_route(data["host_id"])
+        if method == "emit":
+            room = data.get("room")
+            return room_route(namespace, room) if isinstance(room, str) else ROUTE_ALL
+        if method in ("disconnect", "enter_room", "leave_room"):
+            return room_route(namespace, data["sid"])
+        if method == "close_room":
+            return room_route(namespace, data["room"])
+        return ROUTE_ALL  # forward() messages
+
+    async def _connect(self) -> None:
+        """Open the broker connection once, shared by publisher and listener."""
+        if self.connect_lock is None:
+            self.connect_lock = asyncio.Lock()
+        async with self.connect_lock:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+                # Rooms joined before the connection existed, and our callbacks
+                for route in {host_route(self.host_id)} | self.subscriptions:
+                    self.writer.write(encode_frame(None, SUBSCRIBE + route))
+
+    async def _publish(self, data: Dict[str, Any]) -> None:
+        """Hand a message to the broker."""
+        await self._connect()
+        self.writer.write(encode_frame(data, self.route(data)))
+        await self.writer.drain()
+
+    async def _listen(self) -> Any:
+        """Yield Socket.IO messages from the broker, dispatching custom ones."""
+        await self._connect()
+        while True:
+            _, frame = await read_frame(self.reader)
+            message = frame_message(frame)
+            handler = self.handlers.get(message.get("method"))
+            if handler is None:
+                yield message
+                continue
+            try:
+                await handler(message)
+            except Exception as e:
+                print(f"[ERROR][cluster] {message.get('method')} -> {e}")
+
+
+def server_options() -> Dict[str, Any]:
+    """
+    Extra ``socketio.AsyncServer`` arguments for the current process.
+
+    Outside cluster mode this is empty. Inside a worker, emits go through the
+    local queue and only the WebSocket transport is accepted: a WebSocket is
+    a single TCP connection, so once SO_REUSEPORT hands it to a worker every
+    packet for that sid stays there (sticky routing without a proxy).
+    Long-polling would spread one sid's requests across workers.
+    """
+    path = os.environ.get(MQ_SOCKET_ENV)
+    if not path:
+        return {}
+    return {"client_manager": LocalQueueManager(path), "transports": ["websocket"]}
+
+
+def is_clustered(sio: socketio.AsyncServer) -> bool:
+    """Whether this server is one worker of a cluster."""
+    return isinstance(sio.manager, LocalQueueManager)
+
+
+class Broker:
+    """
+    Minimal in-host message queue: relays each frame to the workers that
+    subscribed to its route (or to all others for ROUTE_ALL).
+
+    Payloads are opaque here; the broker only reads the route, so its cost
+    per message is a couple of buffer copies. A worker that can't keep up
+    slows down the workers sending to it (the relay waits for its socket
+    to drain) rather than growing the broker's buffers without limit.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Prepare a broker that will listen on the Unix socket ``path``."""
+        self.path = path
+        self.clients: Set[asyncio.StreamWriter] = set()
+        self.subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}  # route -> workers
+
+    async def start(self) -> None:
+        """Start accepting worker connections."""
+        self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Relay frames from one worker to the workers subscribed to their route."""
+        self.clients.add(writer)
+        routes: Set[str] = set()
+        try:
+            while True:
+                route, frame = await read_frame(reader)
+                if route.startswith(SUBSCRIBE):
+                    routes.add(route[1:])
+                    self.subscribers.setdefault(route[1:], set()).add(writer)
+                    continue
+                if route.startswith(UNSUBSCRIBE):
+                    routes.discard(route[1:])
+                    self.unsubscribe(route[1:], writer)
+                    continue
+                targets = self.clients if route == ROUTE_ALL else self.subscribers.get(route, ())
+                for client in list(targets):
+                    if client is not writer:
+                        await self.relay(client, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            for route in routes:
+                self.unsubscribe(route, writer)
+            writer.close()
+
+    def unsubscribe(self, route: str, writer: asyncio.StreamWriter) -> None:
+        """Stop relaying ``route`` to ``writer``."""
+        subscribers = self.subscribers.get(route)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.subscribers[route]
+
+    @staticmethod
+    async def relay(client: asyncio.StreamWriter, frame: bytes) -> None:
+        """Send a frame to one worker, waiting while its socket is backed up."""
+        try:
+            client.write(frame)
+            await client.drain()
+        except ConnectionError:
+            pass  # That worker is gone; its own _serve cleans up
+
+
+def run_worker(index: int, port: int, threads: int) -> None:
+    """Entry point of one pre-forked server process."""
+    # Imported here so the queue settings in the environment are picked up
+    import app
+
+    # This worker's share of the cores: ``threads`` training threads pinned
+    # to its own slice, so workers don't pile onto the same cores
+    cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    share = [cpus[(index * threads + i) % len(cpus)] for i in range(threads)] if cpus else None
+
+    print(f"[WORKER {index}] pid={os.getpid()} compute_threads={threads} cpus={share}")
+    asyncio.run(app.main(port=port, reuse_port=True, compute_workers=threads, compute_cpus=share))
+
+
+async def serve_cluster(workers: int, port: int) -> None:
+    """Start the broker and ``workers`` server processes sharing ``port``."""
+    path = os.path.join(tempfile.mkdtemp(prefix="snake-mq-"), "queue.sock")
+    broker = Broker(path)
+    await broker.start()
+
+    # Workers find the broker through the environment they inherit
+    os.environ[MQ_SOCKET_ENV] = path
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(index, port, threads), daemon=True)
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    print(f"[CLUSTER] {workers} workers on port {port}, queue at {path}")
+    try:
+        while all(process.is_alive() for process in processes):
+            await asyncio.sleep(1)
+        print("[CLUSTER] A worker exited, shutting down")
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the game server on several processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    asyncio.run(serve_cluster(args.workers, args.port))
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+import torch
+
+
+# Define constants for the training compute pool
+POOL_WORKERS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+THREADS_PER_WORKER = 1  # torch intra-op threads (process-wide, set once by app.main)
+
+Job = Tuple[Future, Callable[..., Any], Tuple[Any, ...], float]
+
+
+class ComputePool:
+    """
+    A fixed set of worker threads that run every session's training work.
+
+    Instead of each session training on the event loop or in the default
+    executor (so that N sessions fight over torch's thread pool and the
+    cores), work is queued per session and picked up by POOL_WORKERS
+    threads, each pinned to its own core. Total compute threads never
+    exceed the cores, however many sessions there are.
+
+    torch's intra-op thread count is a process-wide setting, not a
+    per-worker one, so the pool leaves it alone: the process sets it once
+    at startup (app.main sets THREADS_PER_WORKER, so workers x threads
+    stays within the cores). Creating a pool has no side effects either;
+    the threads only exist after ``start``, which the server calls from
+    its startup code.
+
+    Scheduling is fair: sessions with queued work are served round-robin,
+    one job at a time, and a session never has two jobs running at once
+    (its game and agent are not thread-safe).
+    """
+
+    def __init__(self) -> None:
+        """An idle pool; ``start`` creates the worker threads."""
+        # Per-session FIFO queues and the round-robin order of sessions
+        # that have work and nothing running
+        self.queues: Dict[Hashable, Deque[Job]] = {}
+        self.ready: Deque[Hashable] = deque()
+        self.running: Set[Hashable] = set()
+        self.condition = threading.Condition()
+        self.closed = False
+
+        # Statistics
+        self.started = time.perf_counter()
+        self.cpus: List[Optional[int]] = []
+        self.busy: List[float] = []
+        self.jobs: List[int] = []
+        self.waited = 0.0
+        self.max_wait = 0.0
+        self.completed = 0
+
+        self.threads: List[threading.Thread] = []
+
+    def start(self, workers: int = POOL_WORKERS, cpus: Optional[List[int]] = None, pin: bool = True) -> None:
+        """
+        Start ``workers`` worker threads.
+
+        Args:
+            workers: Number of worker threads
+            cpus: Cores to pin the workers to, round-robin (default: every
+                core this process may run on)
+            pin: Leave the workers unpinned if False
+        """
+        if self.threads:
+            raise RuntimeError("Compute pool is already started")
+        if cpus is None:
+            cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        self.started = time.perf_counter()
+        for index in range(workers):
+            cpu = cpus[index % len(cpus)] if pin and cpus else None
+            self.cpus.append(cpu)
+            self.busy.append(0.0)
+            self.jobs.append(0)
+            thread = threading.Thread(target=self.work, args=(index,), name=f"compute-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, session: Hashable, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        """Queue ``fn(*args)`` for ``session``; returns a concurrent Future."""
+        future: "Future[Any]" = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("Compute pool is closed")
+            if not self.threads:
+                raise RuntimeError("Compute pool is not started")
+            queue = self.queues.get(session)
+            if queue is None:
+                queue = self.queues[session] = deque()
+                if session not in self.running:
+                    self.ready.append(session)
+            queue.append((future, fn, args, time.perf_counter()))
+            self.condition.notify()
+        return future
+
+    async def run(self, session: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool on behalf of ``session`` and await the result."""
+        return await asyncio.wrap_future(self.submit(session, fn, *args))
+
+    def next_job(self) -> Optional[Tuple[Hashable, Job]]:
+        """Worker side: wait for the next session's next job (None once closed)."""
+        with self.condition:
+            while not self.ready and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                return None
+            session = self.ready.popleft()
+            queue = self.queues[session]
+            job = queue.popleft()
+            if not queue:
+                del self.queues[session]
+            self.running.add(session)
+            return session, job
+
+    def done(self, session: Hashable, index: int, wait: float, busy: float) -> None:
+        """Worker side: the session's job finished; queue it again if it has more."""
+        with self.condition:
+            self.waited += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.busy[index] += busy
+            self.jobs[index] += 1
+            self.completed += 1
+            self.running.discard(session)
+            if session in self.queues:
+                self.ready.append(session)
+                self.condition.notify()
+
+    def work(self, index: int) -> None:
+        """Worker thread: pin to a core, then run jobs until the pool closes."""
+        if self.cpus[index] is not None:
+            os.sched_setaffinity(threading.get_native_id(), {self.cpus[index]})
+        while True:
+            item = self.next_job()
+            if item is None:
+                return
+            session, (future, fn, args, queued) = item
+            start = time.perf_counter()
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args))
+                except BaseException as e:
+                    future.set_exception(e)
+            self.done(session, index, start - queued, time.perf_counter() - start)
+
+    def close(self) -> None:
+        """Stop the workers (queued jobs are dropped)."""
+        with self.condition:
+            self.closed = True
+            for queue in self.queues.values():
+                for future, _, _, _ in queue:
+                    future.cancel()
+            self.queues.clear()
+            self.condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-worker utilization, queue wait and backlog."""
+        uptime = time.perf_counter() - self.started
+        with self.condition:
+            pending = sum(len(queue) for queue in self.queues.values())
+            sessions = len(self.queues)
+        return {
+            "workers": [
+                {"cpu": cpu, "jobs": jobs, "utilization": round(busy / uptime, 3)}
+                for cpu, jobs, busy in zip(self.cpus, self.jobs, self.busy)
+            ],
+            "torch_threads": torch.get_num_threads(),
+            "jobs": self.completed,
+            "pending": pending,
+            "sessions_waiting": sessions,
+            "queue_wait_ms": round(1000 * self.waited / self.completed, 3) if self.completed else 0.0,
+            "max_queue_wait_ms": round(1000 * self.max_wait, 3),
+        }
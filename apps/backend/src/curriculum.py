@@ -0,0 +1,106 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agent import DQN
+from board import make_game
+from game import Game
+
+
+# Define constants for curriculum training
+# Stages: (fraction of the final board side, mean score that moves on, epsilon start)
+CURRICULUM_STAGES: List[Tuple[float, Optional[float], float]] = [
+    (0.4, 3.0, 80),
+    (0.6, 4.0, 40),
+    (0.8, 5.0, 20),
+    (1.0, None, 10),  # The full board: train until the caller stops
+]
+MIN_STAGE_SIDE = 12  # Smallest side a Snake() always spawns inside (center +- 5)
+STAGE_EPSILON_GAMES = 40  # Games it takes a stage's epsilon to decay to the minimum
+STAGE_WINDOW = 20  # Games in the mean score that decides promotion
+
+
+class Curriculum:
+    """
+    Trains on small boards first and grows the board as the agent improves.
+
+    Early games on the full board die within a few steps yet cost as much
+    per step as any other. On a small board the same agent meets food and
+    walls far more often. The features (danger, direction, food direction,
+    distances normalized by the board size) mean the same thing on every
+    board size, so what is learned carries over. The agent keeps its
+    network and replay memory between stages (grid observations excepted:
+    the conv network adapts to any board, but images of two sizes can't
+    share a minibatch, so their memory restarts).
+
+    Each stage moves on once the mean score of its last STAGE_WINDOW games
+    reaches the stage threshold. Exploration restarts per stage, from a
+    lower epsilon each time, and decays over STAGE_EPSILON_GAMES games of
+    that stage rather than over the agent's lifetime.
+    """
+
+    def __init__(
+        self,
+        grid_width: Optional[int] = None,
+        grid_height: Optional[int] = None,
+        stages: List[Tuple[float, Optional[float], float]] = CURRICULUM_STAGES,
+        window: int = STAGE_WINDOW,
+        epsilon_games: int = STAGE_EPSILON_GAMES,
+    ) -> None:
+        """A curriculum ending on a ``grid_width`` x ``grid_height`` board (default: the Game default)."""
+        default = Game()
+        width = grid_width or default.grid_width
+        height = grid_height or default.grid_height
+        self.stages: List[Dict[str, Any]] = [
+            {
+                "grid_width": max(MIN_STAGE_SIDE, round(width * fraction)),
+                "grid_height": max(MIN_STAGE_SIDE, round(height * fraction)),
+                "threshold": threshold,
+                "epsilon_start": epsilon_start,
+            }
+            for fraction, threshold, epsilon_start in stages
+        ]
+        self.stages[-1].update(grid_width=width, grid_height=height)
+        self.window = window
+        self.epsilon_games = epsilon_games
+        self.stage = 0
+        self.scores: Deque[int] = deque(maxlen=window)
+        self.history: List[Dict[str, Any]] = []  # Games and steps at which each stage started
+
+    @property
+    def final(self) -> bool:
+        """Whether training has reached the full-size board."""
+        return self.stage == len(self.stages) - 1
+
+    def start(self, agent: DQN, steps: int = 0) -> Game:
+        """Set up the current stage for ``agent`` and return its board."""
+        stage = self.stages[self.stage]
+        agent.epsilon_start = stage["epsilon_start"]
+        agent.epsilon_decay = self.epsilon_games
+        agent.epsilon_origin = agent.n_games
+        if agent.observation == "grid" and self.history:
+            # Board images of the last stage can't be batched with this one's
+            agent.memory.clear()
+        self.scores.clear()
+        self.history.append(dict(stage, stage=self.stage, games=agent.n_games, steps=steps))
+        return make_game(stage["grid_width"], stage["grid_height"])
+
+    def on_game(self, agent: DQN, score: int, steps: int = 0) -> Optional[Game]:
+        """
+        Record a finished game.
+
+        Returns:
+            The next stage's board if the agent was promoted, else None
+        """
+        self.scores.append(score)
+        threshold = self.stages[self.stage]["threshold"]
+        if (
+            self.final
+            or threshold is None
+            or len(self.scores) < self.window
+            or np.mean(self.scores) < threshold
+        ):
+            return None
+        self.stage += 1
+        return self.start(agent, steps)
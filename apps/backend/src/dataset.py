@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from agent import DQN
+from game import Game
+from observation import GridEncoder
+from recorder import RECORDINGS_DIR, RecordingReader
+from simulation import LEFT_TURNS, RIGHT_TURNS
+
+
+# Define constants for offline datasets
+DATASETS_DIR = "./datasets"  # One sub-directory of shards per dataset
+SHARD_BYTES = 64 * 1024 * 1024  # Target size of one shard file
+PREFETCH_SHARDS = 2  # Shards the loader thread reads ahead of training
+SHUFFLE_SHARDS = 2  # Shards mixed together before cutting batches
+
+# Columns of a shard: name -> dtype (states depend on the observation)
+SHARD_COLUMNS = ("states", "actions", "rewards", "next_states", "dones")
+
+
+class ShardWriter:
+    """
+    Collects transitions and writes them as fixed-size ``.npz`` shards.
+
+    Only one shard is held in memory at a time, whatever the size of the
+    dataset.
+    """
+
+    def __init__(self, directory: str, state_shape: Tuple[int, ...], state_type: Any) -> None:
+        """Start an empty dataset in ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.state_shape = state_shape
+        self.state_type = np.dtype(state_type)
+        row_bytes = 2 * self.state_type.itemsize * int(np.prod(state_shape)) + 6
+        self.shard_size = max(1, SHARD_BYTES // row_bytes)
+        self.shards: List[str] = []
+        self.transitions = 0
+        self.new_shard()
+
+    def new_shard(self) -> None:
+        """Allocate the arrays of the next shard."""
+        size = self.shard_size
+        self.buffer = {
+            "states": np.empty((size,) + self.state_shape, dtype=self.state_type),
+            "actions": np.empty(size, dtype=np.uint8),
+            "rewards": np.empty(size, dtype=np.float32),
+            "next_states": np.empty((size,) + self.state_shape, dtype=self.state_type),
+            "dones": np.empty(size, dtype=np.bool_),
+        }
+        self.filled = 0
+
+    def add(self, state: Any, action: int, reward: float, next_state: Any, done: bool) -> None:
+        """Append one transition, writing the shard out when it is full."""
+        row = self.filled
+        self.buffer["states"][row] = state
+        self.buffer["actions"][row] = action
+        self.buffer["rewards"][row] = reward
+        self.buffer["next_states"][row] = next_state
+        self.buffer["dones"][row] = done
+        self.filled += 1
+        self.transitions += 1
+        if self.filled == self.shard_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the current (possibly partial) shard."""
+        if not self.filled:
+            return
+        name = f"shard_{len(self.shards):05d}.npz"
+        np.savez(os.path.join(self.directory, name), **{k: v[:self.filled] for k, v in self.buffer.items()})
+        self.shards.append(name)
+        self.new_shard()
+
+
+def episode_transitions(
+    reader: RecordingReader, episode: int, agent: DQN, encoder: Optional[GridEncoder]
+) -> Iterator[Tuple[Any, int, float, Any, bool]]:
+    """
+    Rebuild the (state, action, reward, next_state, done) transitions of a
+    recorded episode.
+
+    Recordings keep positions, not observations, so each frame is put back
+    on a Game and observed exactly as the live agent did. The snake's
+    direction is not stored: it starts as in Snake() and follows the
+    recorded turns.
+    """
+    info = reader.episode(episode)
+    game = Game()
+    game.grid_width, game.grid_height = info["grid_width"], info["grid_height"]
+    snake = game.snake
+    snake.direction = (0, 1)  # Every snake starts moving down
+
+    def observe(frame: Dict[str, Any]) -> Any:
+        snake.body = list(frame["snake"])
+        snake.head = snake.body[0]
+        game.food.position = tuple(frame["food"])
+        game.score = frame["score"]
+        if encoder is not None:
+            encoder.rebuild(game)
+            return encoder.image.copy()
+        return agent.get_state(game)
+
+    frames = reader.frames(episode, -1)
+    state = observe(next(frames))
+    for frame in frames:
+        if frame["action"] == 1:
+            snake.change_direction(RIGHT_TURNS[snake.direction])
+        elif frame["action"] == 2:
+            snake.change_direction(LEFT_TURNS[snake.direction])
+        next_state = observe(frame)
+        yield state, frame["action"], frame["reward"], next_state, not frame["running"]
+        state = next_state
+
+
+def build_dataset(
+    name: str,
+    recording_ids: Optional[List[str]] = None,
+    observation: str = "features",
+    recordings_dir: str = RECORDINGS_DIR,
+    datasets_dir: str = DATASETS_DIR,
+) -> Dict[str, Any]:
+    """
+    Turn recorded episodes into a sharded transition dataset.
+
+    Args:
+        name: Dataset name (sub-directory of ``datasets_dir``)
+        recording_ids: Recordings to include (default: all of them)
+        observation: "features" or "grid", as in DQN()
+        recordings_dir: Where the recordings are
+        datasets_dir: Where datasets are written
+
+    Returns:
+        The dataset manifest (also saved as manifest.json)
+    """
+    if recording_ids is None:
+        recording_ids = sorted(
+            os.path.splitext(f)[0] for f in os.listdir(recordings_dir) if f.endswith(".idx")
+        )
+    agent = DQN(observation=observation)
+    directory = os.path.join(datasets_dir, name)
+    writer: Optional[ShardWriter] = None
+    encoder: Optional[GridEncoder] = None
+    grid: Optional[Tuple[int, int]] = None
+    episodes = skipped = 0
+    start = time.perf_counter()
+
+    for recording_id in recording_ids:
+        reader = RecordingReader(recording_id, recordings_dir)
+        for episode in range(len(reader)):
+            info = reader.episode(episode)
+            size = (info["grid_width"], info["grid_height"])
+            if writer is None:
+                grid = size
+                if observation == "grid":
+                    encoder = GridEncoder(*size)
+                    writer = ShardWriter(directory, encoder.image.shape, np.uint8)
+                else:
+                    writer = ShardWriter(directory, (13,), np.float32)
+            elif observation == "grid" and size != grid:
+                # Board images of different sizes can't share a network
+                skipped += 1
+                continue
+            for transition in episode_transitions(reader, episode, agent, encoder):
+                writer.add(*transition)
+            episodes += 1
+        reader.close()
+
+    if writer is None:
+        raise ValueError("No recorded episodes to build a dataset from")
+    writer.flush()
+    seconds = time.perf_counter() - start
+    manifest = {
+        "observation": observation,
+        "grid_width": grid[0],
+        "grid_height": grid[1],
+        "recordings": recording_ids,
+        "episodes": episodes,
+        "transitions": writer.transitions,
+        "shards": writer.shards,
+    }
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[DATASET] {name}: {episodes} episodes, {writer.transitions} transitions in {len(writer.shards)} shards "
+          f"({writer.transitions / seconds:.0f} transitions/s, {skipped} episodes skipped)")
+    return manifest
+
+
+def load_manifest(name: str, datasets_dir: str = DATASETS_DIR) -> Dict[str, Any]:
+    """Read the manifest of a dataset built by build_dataset()."""
+    with open(os.path.join(datasets_dir, name, "manifest.json")) as f:
+        return json.load(f)
+
+
+class BatchStream:
+    """
+    Shuffled training batches streamed from a dataset's shards.
+
+    A loader thread reads shards (in a new random order each epoch) into a
+    queue of PREFETCH_SHARDS, so disk reads and decompression overlap with
+    training. The consumer mixes ``shuffle_shards`` shards at a time and
+    cuts them into batches in random order. At most
+    ``prefetch + shuffle_shards + 1`` shards are in memory at once.
+
+    ``io_wait`` is the time the consumer spent waiting for the loader; if
+    it is close to zero, training (not disk) is the bottleneck.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_size: int,
+        epochs: int = 1,
+        seed: int = 0,
+        prefetch: int = PREFETCH_SHARDS,
+        shuffle_shards: int = SHUFFLE_SHARDS,
+        datasets_dir: str = DATASETS_DIR,
+    ) -> None:
+        """Prepare to stream ``epochs`` passes over dataset ``name``."""
+        self.directory = os.path.join(datasets_dir, name)
+        self.manifest = load_manifest(name, datasets_dir)
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.shuffle_shards = shuffle_shards
+        self.rng = np.random.default_rng(seed)
+        self.shards: "queue.Queue[Optional[Dict[str, np.ndarray]]]" = queue.Queue(maxsize=prefetch)
+        self.io_wait = 0.0
+        self.one_hot = np.eye(3, dtype=np.int64)
+
+    def load(self) -> None:
+        """Loader thread: every shard of every epoch, then None."""
+        order_rng = np.random.default_rng(self.rng.integers(1 << 32))
+        for _ in range(self.epochs):
+            for index in order_rng.permutation(len(self.manifest["shards"])):
+                with np.load(os.path.join(self.directory, self.manifest["shards"][index])) as shard:
+                    self.shards.put({column: shard[column] for column in SHARD_COLUMNS})
+        self.shards.put(None)
+
+    def next_shard(self) -> Optional[Dict[str, np.ndarray]]:
+        """Take a loaded shard, timing how long we had to wait for it."""
+        start = time.perf_counter()
+        shard = self.shards.get()
+        self.io_wait += time.perf_counter() - start
+        return shard
+
+    def __iter__(self) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """Yield (states, one-hot actions, rewards, next_states, dones) batches."""
+        threading.Thread(target=self.load, daemon=True).start()
+        leftover: Optional[Dict[str, np.ndarray]] = None
+        finished = False
+        while not finished:
+            # Mix a few shards (plus the rows left from the last group)
+            group = [leftover] if leftover is not None else []
+            while len(group) < self.shuffle_shards + (leftover is not None):
+                shard = self.next_shard()
+                if shard is None:
+                    finished = True
+                    break
+                group.append(shard)
+            if not group:
+                return
+            pool = {column: np.concatenate([part[column] for part in group]) for column in SHARD_COLUMNS}
+            order = self.rng.permutation(len(pool["actions"]))
+
+            # Full batches now; the remainder waits for the next group
+            # (or is yielded as a last, smaller batch at the very end)
+            usable = len(order) if finished else len(order) - len(order) % self.batch_size
+            for start in range(0, usable, self.batch_size):
+                rows = order[start:start + self.batch_size]
+                yield (
+                    pool["states"][rows], self.one_hot[pool["actions"][rows]], pool["rewards"][rows],
+                    pool["next_states"][rows], pool["dones"][rows],
+                )
+            rest = order[usable:]
+            leftover = {column: pool[column][rest] for column in SHARD_COLUMNS} if len(rest) else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an offline transition dataset from recorded episodes")
+    parser.add_argument("name", help="dataset name (written to ./datasets/<name>)")
+    parser.add_argument("--recordings", nargs="*", default=None, help="recording ids (default: all)")
+    parser.add_argument("--observation", choices=["features", "grid"], default="features")
+    args = parser.parse_args()
+    build_dataset(args.name, args.recordings, args.observation)
@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import os
+import re
+import secrets
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+import torch
+
+from agent import DQN
+from board import make_game
+from game import Game
+
+
+# Define constants for parking and suspending abandoned sessions
+SESSIONS_DIR = "./sessions"  # Where suspended sessions are written
+MEMORY_LIMIT = 512 * 1024 * 1024  # Bytes of parked sessions kept in RAM before LRU eviction
+PARK_SECONDS = 60  # Parked this long without a reconnect -> suspended to disk
+SNAPSHOT_TTL = 24 * 3600  # Suspended sessions nobody resumed are deleted after this
+SWEEP_SECONDS = 10  # How often idle sessions and old snapshots are checked
+PARK_WAIT = 1.0  # Seconds a disconnect waits for the game loop to stop before parking
+WRITE_WAIT = 5.0  # Seconds a resume waits for a snapshot another process is still writing
+SNAPSHOT_VERSION = 1
+
+# Resume tokens are also file names, so only accept what new_token() makes
+TOKEN_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def new_token() -> str:
+    """A fresh resume token for a new game."""
+    return secrets.token_hex(16)
+
+
+def public_run_id(token: str) -> str:
+    """
+    The id a game's stats are published under.
+
+    A resume token is the only credential for taking over a parked game,
+    so it never leaves the server except to its own client. This one-way
+    hash stays the same across resumes without revealing the token.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
+def agent_config(agent: DQN) -> Dict[str, Any]:
+    """The DQN() arguments that recreate ``agent`` (without its weights)."""
+    return dict(
+        agent.trainer_options,
+        observation=agent.observation,
+        max_memory=agent.max_memory,
+        batch_size=agent.batch_size,
+        epsilon_start=agent.epsilon_start,
+        epsilon_min=agent.epsilon_min,
+        epsilon_decay=agent.epsilon_decay,
+        reward_closer=agent.reward_closer,
+        reward_away=agent.reward_away,
+        reward_food=agent.reward_food,
+        reward_death=agent.reward_death,
+    )
+
+
+def tensor_bytes(tensors: Any) -> int:
+    """Total size of the tensors in a state dict (nested dicts/lists allowed)."""
+    if isinstance(tensors, torch.Tensor):
+        return tensors.numel() * tensors.element_size()
+    if isinstance(tensors, dict):
+        return sum(tensor_bytes(value) for value in tensors.values())
+    if isinstance(tensors, (list, tuple)):
+        return sum(tensor_bytes(value) for value in tensors)
+    return 0
+
+
+def session_bytes(agent: DQN) -> int:
+    """
+    Approximate RAM held by an agent: network, optimizer, target network and
+    replay memory. The memory is estimated from its newest experience, since
+    every entry has the same shape.
+    """
+    total = 0
+    if agent.owns_model:
+        total += tensor_bytes(agent.model.state_dict())
+    if agent._trainer is not None:
+        total += tensor_bytes(agent.trainer.optimizer.state_dict()["state"])
+        if agent.trainer.target_model is not None:
+            total += tensor_bytes(agent.trainer.target_model.state_dict())
+    memory = agent._memory
+    if memory:
+        state, action, reward, next_state, done = memory[-1]
+        entry = sys.getsizeof(memory[-1]) + sys.getsizeof(action) + sys.getsizeof(reward)
+        # Board images are shared by neighbouring experiences (DQN.get_grid_state)
+        observations = (state,) if isinstance(state, np.ndarray) else (state, next_state)
+        for observation in observations:
+            entry += observation.nbytes if isinstance(observation, np.ndarray) else sys.getsizeof(observation) + 8 * len(observation)
+        total += entry * len(memory)
+    return total
+
+
+def pack_memory(agent: DQN) -> Optional[Dict[str, torch.Tensor]]:
+    """
+    Replay memory as a few contiguous tensors instead of Python tuples.
+
+    Feature states become float32 rows, board images stay uint8, and the
+    one-hot actions are stored as a single action index.
+    """
+    memory = agent._memory
+    if not memory:
+        return None
+    states, actions, rewards, next_states, dones = zip(*memory)
+    state_type = np.uint8 if agent.observation == "grid" else np.float32
+    return {
+        "states": torch.from_numpy(np.asarray(states, dtype=state_type)),
+        "actions": torch.from_numpy(np.argmax(np.asarray(actions), axis=1).astype(np.uint8)),
+        "rewards": torch.tensor(rewards, dtype=torch.float32),
+        "next_states": torch.from_numpy(np.asarray(next_states, dtype=state_type)),
+        "dones": torch.tensor(dones, dtype=torch.bool),
+    }
+
+
+def unpack_memory(agent: DQN, packed: Dict[str, torch.Tensor]) -> None:
+    """Refill the agent's replay memory from pack_memory() output."""
+    states = packed["states"].numpy()
+    next_states = packed["next_states"].numpy()
+    if agent.observation == "features":
+        # Same list-of-floats states that get_state() produces
+        states, next_states = states.tolist(), next_states.tolist()
+    actions = np.eye(3, dtype=np.int64)[packed["actions"].numpy()].tolist()
+    memory = agent.memory
+    memory.extend(zip(states, actions, packed["rewards"].tolist(), next_states, packed["dones"].tolist()))
+
+
+def snapshot(game: Game, agent: DQN, turbo: bool, keep_memory: bool) -> Dict[str, Any]:
+    """Everything needed to continue training later, as tensors and plain values."""
+    trainer = agent._trainer
+    return {
+        "version": SNAPSHOT_VERSION,
+        "game": {"grid_width": game.grid_width, "grid_height": game.grid_height, "game_tick": game.game_tick},
+        "turbo": turbo,
+        "config": agent_config(agent),
+        "stats": {"n_games": agent.n_games, "total_score": agent.total_score, "record": agent.record},
+        # Untrained agents still use the shared starting network: nothing to save
+        "model": agent.model.state_dict() if agent.owns_model else None,
+        "optimizer": trainer.optimizer.state_dict() if trainer else None,
+        "target_model": trainer.target_model.state_dict() if trainer and trainer.target_model else None,
+        "trainer_steps": trainer.steps if trainer else 0,
+        "memory": pack_memory(agent) if keep_memory else None,
+    }
+
+
+def restore(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild the game and agent of a snapshot()."""
+    # The interrupted episode is not resumed, the training is
+    game = make_game(data["game"]["grid_width"], data["game"]["grid_height"])
+    game.game_tick = data["game"]["game_tick"]
+
+    agent = DQN(share_model=data["model"] is None, **data["config"])
+    agent.n_games = data["stats"]["n_games"]
+    agent.total_score = data["stats"]["total_score"]
+    agent.record = data["stats"]["record"]
+    if data["model"] is not None:
+        agent.model.load_state_dict(data["model"])
+    if data["optimizer"] is not None:
+        trainer = agent.trainer
+        trainer.optimizer.load_state_dict(data["optimizer"])
+        trainer.steps = data["trainer_steps"]
+        if trainer.target_model is not None and data["target_model"] is not None:
+            trainer.target_model.load_state_dict(data["target_model"])
+    if data["memory"] is not None:
+        unpack_memory(agent, data["memory"])
+    return {"game": game, "agent": agent, "turbo": data["turbo"]}
+
+
+class EvictionManager:
+    """
+    Keeps the training progress of disconnected clients, within a budget.
+
+    When a client disconnects its game and agent are *parked* in RAM under
+    the client's resume token. Reconnecting with the token within
+    ``park_seconds`` picks them up again at no cost. After that, or as soon
+    as parked sessions exceed ``memory_limit`` bytes (least recently parked
+    first), the session is *suspended*: written to ``<directory>/<token>.pt``
+    and dropped from memory. Resuming a suspended session reloads weights,
+    optimizer state, statistics and (if ``keep_memory``) the replay memory.
+
+    Writing and reading snapshots happens in a worker thread so the event
+    loop keeps serving the other clients. A session resumed while its
+    snapshot is being written is handed back only once the write is done,
+    so training never changes an agent the writer is still reading.
+
+    With ``park_seconds`` at 0 sessions are suspended as soon as they are
+    parked. cluster.py workers run that way: a reconnect may reach any
+    worker, and the snapshot directory is what they share.
+    """
+
+    def __init__(
+        self,
+        directory: str = SESSIONS_DIR,
+        memory_limit: int = MEMORY_LIMIT,
+        park_seconds: float = PARK_SECONDS,
+        snapshot_ttl: float = SNAPSHOT_TTL,
+        keep_memory: bool = True,
+    ) -> None:
+        """Create a manager storing snapshots in ``directory``."""
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.park_seconds = park_seconds
+        self.snapshot_ttl = snapshot_ttl
+        self.keep_memory = keep_memory
+
+        # token -> {"game", "agent", "turbo", "bytes", "parked_at"}, oldest first
+        self.parked: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.parked_bytes = 0
+
+        # Sessions whose snapshot is being written right now
+        self.writing: Dict[str, Dict[str, Any]] = {}
+
+        # Counters for the /parked endpoint
+        self.suspended = 0
+        self.resumed = 0
+
+    def path_for(self, token: str) -> str:
+        """Snapshot file of a token."""
+        return os.path.join(self.directory, f"{token}.pt")
+
+    async def park(self, token: str, game: Game, agent: DQN, turbo: bool) -> None:
+        """Keep a disconnected client's session, evicting others if over budget."""
+        size = session_bytes(agent)
+        self.parked[token] = {
+            "game": game, "agent": agent, "turbo": turbo,
+            "bytes": size, "parked_at": time.monotonic(),
+        }
+        self.parked_bytes += size
+        print(f"[EVICT] Parked session {token[:8]} ({size / 1024:.0f} KiB, {len(self.parked)} parked)")
+
+        if self.park_seconds <= 0:
+            await self.suspend(token)
+
+        # Global ceiling: suspend the least recently parked sessions
+        while self.parked_bytes > self.memory_limit and self.parked:
+            await self.suspend(next(iter(self.parked)))
+
+    async def suspend(self, token: str) -> None:
+        """Write a parked session to disk and free its memory."""
+        entry = self.parked.pop(token, None)
+        if entry is None:
+            return  # Resumed while an earlier suspend of the same sweep was writing
+        self.parked_bytes -= entry["bytes"]
+
+        # Still resumable from memory while the file is being written
+        # (resume waits for "written" before handing the agent back)
+        loop = asyncio.get_running_loop()
+        entry["written"] = loop.run_in_executor(None, self.write, token, entry)
+        self.writing[token] = entry
+        try:
+            await entry["written"]
+        except Exception as e:
+            # No file and no room in memory: the session is lost (unless resumed meanwhile)
+            print(f"[ERROR][eviction] Could not suspend session {token[:8]} -> {e}")
+            self.writing.pop(token, None)
+            return
+        if self.writing.pop(token, None) is None:
+            # Resumed during the write: the snapshot must not be used again
+            os.remove(self.path_for(token))
+            return
+        self.suspended += 1
+        print(f"[EVICT] Suspended session {token[:8]} to {self.path_for(token)}")
+
+    def write(self, token: str, entry: Dict[str, Any]) -> None:
+        """Save a snapshot atomically (a crash never leaves half a file)."""
+        data = snapshot(entry["game"], entry["agent"], entry["turbo"], self.keep_memory)
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path_for(token)
+        torch.save(data, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def read(self, token: str) -> Optional[Dict[str, Any]]:
+        """Load and delete a snapshot (a token resumes at most once)."""
+        path = self.path_for(token)
+
+        # Another process may be writing it right now (see park_seconds)
+        deadline = time.monotonic() + WRITE_WAIT
+        while not os.path.exists(path) and os.path.exists(path + ".tmp") and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # Claim the file first, so two processes can't both resume it
+        claimed = f"{path}.{os.getpid()}"
+        try:
+            os.rename(path, claimed)
+        except FileNotFoundError:
+            return None
+        try:
+            data = torch.load(claimed, weights_only=True)
+        finally:
+            os.remove(claimed)
+        if data.get("version") != SNAPSHOT_VERSION:
+            return None
+        return restore(data)
+
+    async def resume(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Take back a parked or suspended session.
+
+        Returns:
+            {"game", "agent", "turbo"}, or None for an unknown or expired token
+        """
+        if not isinstance(token, str) or not TOKEN_PATTERN.match(token):
+            return None
+        entry = self.parked.pop(token, None)
+        if entry is not None:
+            self.parked_bytes -= entry["bytes"]
+        else:
+            entry = self.writing.pop(token, None)
+            if entry is not None:
+                # The writer may still be reading the agent
+                await asyncio.gather(entry["written"], return_exceptions=True)
+        if entry is None:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(None, self.read, token)
+            if entry is None:
+                return None
+        self.resumed += 1
+        return {"game": entry["game"], "agent": entry["agent"], "turbo": entry["turbo"]}
+
+    async def sweep(self) -> None:
+        """Suspend sessions parked too long and delete expired snapshots."""
+        now = time.monotonic()
+        for token in [t for t, entry in self.parked.items() if now - entry["parked_at"] > self.park_seconds]:
+            await self.suspend(token)
+
+        if os.path.isdir(self.directory):
+            cutoff = time.time() - self.snapshot_ttl
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+
+    async def run(self) -> None:
+        """Background task: sweep every SWEEP_SECONDS."""
+        while True:
+            await asyncio.sleep(SWEEP_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"[ERROR][eviction] {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Parked sessions and their memory, plus suspend/resume counters."""
+        return {
+            "parked": len(self.parked),
+            "parked_bytes": self.parked_bytes,
+            "memory_limit": self.memory_limit,
+            "suspended": self.suspended,
+            "resumed": self.resumed,
+        }
@@ -0,0 +1,318 @@
+import asyncio
+import struct
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+from agent import DQN
+from board import make_game
+from game import Game
+from simulation import LEFT_TURNS, RIGHT_TURNS, end_episode, play_step
+
+
+# Define constants for the binary WebSocket fast path
+FASTPATH_ROUTE = "/ws/bin"  # Next to Socket.IO's /socket.io/ on the same app
+MAX_GAMES_PER_CONNECTION = 4096
+MAX_MESSAGE_BYTES = 1024 * 1024
+MIN_TICK_MS = 1
+
+# Message types (first byte of every message)
+OP_START = 1  # client -> server: start (or restart) a game
+OP_ACTIONS = 2  # client -> server: actions for the next tick of some games
+OP_STOP = 3  # client -> server: stop a game
+OP_STARTED = 101  # server -> client: a game was started
+OP_STATE = 102  # server -> client: one tick of every game sharing a tick rate
+OP_ERROR = 103  # server -> client: a request failed
+
+# Fixed layouts, all little-endian.
+# The game id is chosen by the client and names the game in every message.
+START = struct.Struct("<BIHHHB")  # op, game id, grid width, grid height, tick (ms), control
+STOP = struct.Struct("<BI")  # op, game id
+ACTIONS_HEADER = struct.Struct("<BH")  # op, count; then count ACTION records
+ACTION = np.dtype([("game", "<u4"), ("action", "u1")])  # 5 bytes
+STARTED = struct.Struct("<BHH")  # op, grid width, grid height; then one STATE record
+STATE_HEADER = struct.Struct("<BHHI")  # op, tick (ms), count, tick number; then count STATE records
+STATE = np.dtype([
+    ("game", "<u4"),
+    ("head_x", "<u2"),
+    ("head_y", "<u2"),
+    ("food_x", "<u2"),
+    ("food_y", "<u2"),
+    ("length", "<u2"),
+    ("score", "<u2"),
+    ("flags", "u1"),
+])  # 17 bytes
+ERROR = struct.Struct("<BI")  # op, game id (0 if none); then a UTF-8 message
+
+# Who moves the snake (START control byte)
+CONTROL_AGENT = 0  # the server's DQN plays and learns, as in update_game
+CONTROL_CLIENT = 1  # actions come from the client (human or external bot)
+
+# Actions: turns relative to the heading (as the agent's), or absolute
+# directions for human play. A game without an action goes straight.
+ACTION_STRAIGHT = 0
+ACTION_RIGHT = 1
+ACTION_LEFT = 2
+ABSOLUTE_ACTIONS = {3: "UP", 4: "DOWN", 5: "LEFT", 6: "RIGHT"}
+OPPOSITES = {"UP": (0, 1), "DOWN": (0, -1), "LEFT": (1, 0), "RIGHT": (-1, 0)}
+
+# Runs a blocking function off the event loop on behalf of a session
+# (ComputePool.run in the server)
+Runner = Callable[..., Awaitable[Any]]
+
+# STATE flags
+FLAG_RUNNING = 1
+FLAG_ATE = 2
+FLAG_RESET = 4  # The game ended and restarted: score is the final one, the body is just the new head
+
+
+class FastGame:
+    """
+    One game of a fast-path connection.
+
+    The client never gets the body: a STATE record carries the head and
+    the length, and the body always moves head-first, so the client keeps
+    the last ``length`` heads (and starts over on FLAG_RESET).
+    """
+
+    __slots__ = ("game_id", "game", "agent", "action")
+
+    def __init__(self, game_id: int, game: Game, agent: Optional[DQN]) -> None:
+        """A game played by ``agent``, or by the client if agent is None."""
+        self.game_id = game_id
+        self.game = game
+        self.agent = agent
+        self.action = ACTION_STRAIGHT
+
+    def step(self) -> Tuple[int, ...]:
+        """Advance one tick and return the STATE record."""
+        game = self.game
+        if self.agent is not None:
+            _, done = play_step(game, self.agent)
+        else:
+            self.turn()
+            game.step()
+            done = not game.running
+        flags = FLAG_ATE if game.snake.grow else 0  # Set by this tick's meal, grows on the next move
+        score = game.score
+        if done:
+            if self.agent is not None:
+                end_episode(game, self.agent)
+            else:
+                game.reset()
+            flags |= FLAG_RESET
+        return self.record(flags | FLAG_RUNNING, score)
+
+    def turn(self) -> None:
+        """Apply (and consume) the client's action for this tick."""
+        action, self.action = self.action, ACTION_STRAIGHT
+        snake = self.game.snake
+        if action == ACTION_RIGHT:
+            self.game.queue_change(RIGHT_TURNS[snake.direction])
+        elif action == ACTION_LEFT:
+            self.game.queue_change(LEFT_TURNS[snake.direction])
+        elif action in ABSOLUTE_ACTIONS:
+            direction = ABSOLUTE_ACTIONS[action]
+            # Reversing into the neck is ignored rather than fatal
+            if snake.direction != OPPOSITES[direction] or len(snake.body) == 1:
+                self.game.queue_change(direction)
+
+    def record(self, flags: int, score: Optional[int] = None) -> Tuple[int, ...]:
+        """The STATE record of the current position."""
+        game = self.game
+        head = game.snake.head
+        food = game.food.position
+        return (
+            self.game_id, head[0], head[1], food[0], food[1],
+            len(game.snake.body), game.score if score is None else score, flags,
+        )
+
+
+class FastPathConnection:
+    """
+    Every game of one fast-path WebSocket.
+
+    Games are grouped by tick rate; each group is stepped by one task and
+    produces one STATE message per tick, however many games it holds.
+    The stepping itself (and the agents' learning) runs through ``run``,
+    off the event loop, with each group as its own session of the pool.
+    """
+
+    def __init__(self, ws: web.WebSocketResponse, run: Runner) -> None:
+        """Serve the games of ``ws``, stepping them with ``run(session, fn, *args)``."""
+        self.ws = ws
+        self.run = run
+        self.games: Dict[int, FastGame] = {}
+        self.groups: Dict[int, Dict[int, FastGame]] = {}  # tick (ms) -> games
+        self.ticks: Dict[int, int] = {}  # game id -> tick (ms)
+        self.tasks: Dict[int, "asyncio.Task[None]"] = {}
+
+    async def receive(self, data: bytes) -> None:
+        """Handle one client message."""
+        op = data[0] if data else 0
+        if op == OP_START:
+            await self.start(*START.unpack_from(data)[1:])
+        elif op == OP_ACTIONS:
+            _, count = ACTIONS_HEADER.unpack_from(data)
+            actions = np.frombuffer(data, dtype=ACTION, count=count, offset=ACTIONS_HEADER.size)
+            for game_id, action in actions.tolist():
+                fast = self.games.get(game_id)
+                if fast is not None:
+                    fast.action = action
+        elif op == OP_STOP:
+            self.stop(STOP.unpack_from(data)[1])
+        else:
+            raise ValueError(f"Unknown message type {op}")
+
+    async def start(self, game_id: int, grid_width: int, grid_height: int, tick_ms: int, control: int) -> None:
+        """Start game ``game_id`` (replacing any game with that id)."""
+        if game_id not in self.games and len(self.games) >= MAX_GAMES_PER_CONNECTION:
+            raise ValueError(f"At most {MAX_GAMES_PER_CONNECTION} games per connection")
+        self.stop(game_id)
+        game = make_game(grid_width or None, grid_height or None)
+        agent = DQN() if control == CONTROL_AGENT else None
+        fast = FastGame(game_id, game, agent)
+        tick_ms = max(MIN_TICK_MS, tick_ms or round(game.game_tick * 1000))
+        self.games[game_id] = fast
+        self.ticks[game_id] = tick_ms
+        self.groups.setdefault(tick_ms, {})[game_id] = fast
+        if tick_ms not in self.tasks:
+            self.tasks[tick_ms] = asyncio.create_task(self.run_group(tick_ms))
+        record = np.array([fast.record(FLAG_RUNNING | FLAG_RESET)], dtype=STATE)
+        await self.ws.send_bytes(STARTED.pack(OP_STARTED, game.grid_width, game.grid_height) + record.tobytes())
+
+    def stop(self, game_id: int) -> None:
+        """Forget a game (its group's task ends with its last game)."""
+        if self.games.pop(game_id, None) is not None:
+            self.groups[self.ticks.pop(game_id)].pop(game_id)
+
+    @staticmethod
+    def step_games(games: List[FastGame]) -> Tuple[List[Tuple[FastGame, Tuple[int, ...]]], List[Tuple[FastGame, str]]]:
+        """
+        One tick of ``games`` (runs on the compute pool).
+
+        Returns:
+            (game, STATE record) of every game that stepped, and
+            (game, error) of every game whose step raised
+        """
+        stepped = []
+        failed = []
+        for fast in games:
+            try:
+                stepped.append((fast, fast.step()))
+            except Exception as e:
+                failed.append((fast, str(e)))
+        return stepped, failed
+
+    async def send_error(self, game_id: int, message: str) -> None:
+        """Tell the client a request or a game failed."""
+        if not self.ws.closed:
+            await self.ws.send_bytes(ERROR.pack(OP_ERROR, game_id) + message.encode())
+
+    async def run_group(self, tick_ms: int) -> None:
+        """Step every game with this tick rate once per tick and send their states."""
+        loop = asyncio.get_running_loop()
+        games = self.groups[tick_ms]
+        session: Hashable = ("fastpath", id(self), tick_ms)
+        tick = 0
+        next_time = loop.time()
+        try:
+            while games and not self.ws.closed:
+                stepped, failed = await self.run(session, self.step_games, list(games.values()))
+
+                # A game that raised is stopped on its own; the rest play on
+                for fast, message in failed:
+                    print(f"[ERROR][fastpath] game {fast.game_id} -> {message}")
+                    if self.games.get(fast.game_id) is fast:
+                        self.stop(fast.game_id)
+                        await self.send_error(fast.game_id, message)
+
+                # Games stopped or restarted while the tick ran don't report it
+                records = np.array(
+                    [record for fast, record in stepped if self.games.get(fast.game_id) is fast],
+                    dtype=STATE,
+                )
+                tick += 1
+                await self.ws.send_bytes(STATE_HEADER.pack(OP_STATE, tick_ms, len(records), tick) + records.tobytes())
+
+                # Keep the rate, but never try to catch up after a slow tick
+                next_time = max(next_time + tick_ms / 1000, loop.time())
+                await asyncio.sleep(next_time - loop.time())
+        except Exception as e:
+            # The group can't go on: stop its games rather than leave them
+            # registered and never stepped, and tell the client
+            print(f"[ERROR][fastpath] tick {tick_ms} ms -> {e}")
+            for game_id in list(games):
+                self.stop(game_id)
+                try:
+                    await self.send_error(game_id, str(e))
+                except Exception:
+                    break  # The socket itself failed
+        finally:
+            del self.tasks[tick_ms]
+            if not games:
+                del self.groups[tick_ms]
+
+    def close(self) -> None:
+        """The socket closed: stop every game."""
+        for task in list(self.tasks.values()):
+            task.cancel()
+        self.games.clear()
+
+
+def request_game_id(data: bytes) -> int:
+    """The game a failed START or STOP was about (0 if none or too short to tell)."""
+    if len(data) >= STOP.size and data[0] in (OP_START, OP_STOP):
+        return STOP.unpack_from(data)[1]
+    return 0
+
+
+def fastpath_handler(run: Runner) -> Callable[[Any], Awaitable[Any]]:
+    """The route handler, stepping games with ``run`` (the server passes compute.run)."""
+
+    async def handle_fastpath(request: Any) -> Any:
+        """
+        Binary WebSocket for bots and external clients driving many games.
+
+        A lighter alternative to the Socket.IO events: fixed little-endian
+        records instead of JSON, one STATE message per tick for all games of
+        a connection, and client actions for CONTROL_CLIENT games (see the
+        layouts above).
+        """
+        ws = web.WebSocketResponse(max_msg_size=MAX_MESSAGE_BYTES)
+        await ws.prepare(request)
+        connection = FastPathConnection(ws, run)
+        print(f"[FASTPATH] Connection opened from {request.remote}")
+
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.BINARY:
+                    try:
+                        await connection.receive(message.data)
+                    except Exception as e:
+                        print(f"[ERROR][fastpath] {e}")
+                        await connection.send_error(request_game_id(message.data), str(e))
+                elif message.type == WSMsgType.ERROR:
+                    break
+        finally:
+            print(f"[FASTPATH] Connection closed after {len(connection.games)} games")
+            connection.close()
+        return ws
+
+    return handle_fastpath
+
+
+def decode_states(data: bytes) -> Tuple[int, int, np.ndarray]:
+    """
+    Client side: split a STATE message into (tick ms, tick number, records).
+
+    The records are a numpy structured array with the STATE fields.
+    """
+    _, tick_ms, count, tick = STATE_HEADER.unpack_from(data)
+    return tick_ms, tick, np.frombuffer(data, dtype=STATE, count=count, offset=STATE_HEADER.size)
+
+
+def encode_actions(actions: List[Tuple[int, int]]) -> bytes:
+    """Client side: an ACTIONS message from (game id, action) pairs."""
+    return ACTIONS_HEADER.pack(OP_ACTIONS, len(actions)) + np.array(actions, dtype=ACTION).tobytes()
@@ -2,6 +2,10 @@ import random
 from typing import Tuple, Any
 
 
+# Random picks before food placement falls back to listing every free cell
+SPAWN_TRIES = 32
+
+
 class Food:
     """
     Food class representing the collectible items in the Snake game.
@@ -10,6 +14,9 @@ class Food:
     when eaten by the snake. It ensures it never spawns on the snake's body.
     """
 
+    # Fixed attribute layout (no per-instance __dict__)
+    __slots__ = ("game", "position", "eaten")
+
     def __init__(self, game: Any) -> None:
         """Initialize food at a random position on the grid."""
         self.game = game
@@ -32,9 +39,23 @@ class Food:
         or in the same location as the previous food.
         """
         if self.eaten:
-            # Create a list of all positions that are NOT valid for food
-            # (snake body + current food position)
-            invalid_positions = self.game.snake.body + [self.position]
+            # Try random cells first: on any board that isn't nearly full
+            # one of the first few picks is free, whatever the board size
+            body = self.game.snake.body
+            for _ in range(SPAWN_TRIES):
+                position = (
+                    random.randint(0, self.game.grid_width - 1),
+                    random.randint(0, self.game.grid_height - 1),
+                )
+                if position != self.position and position not in body:
+                    self.position = position
+                    self.eaten = False
+                    return
+
+            # Nearly full board: list the free cells instead.
+            # Positions that are NOT valid for food: snake body + current food position
+            invalid_positions = set(body)
+            invalid_positions.add(self.position)
 
             # Generate all possible valid positions on the grid
             valid_positions = [
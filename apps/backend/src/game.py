@@ -12,6 +12,13 @@ class Game:
     It serves as the central controller for the entire game.
     """
 
+    # Fixed attribute layout: no per-instance __dict__, which keeps idle
+    # sessions small when thousands of games are alive at once
+    __slots__ = (
+        "grid_width", "grid_height", "score", "running", "snake", "food",
+        "game_tick", "last_tick", "change_queue",
+    )
+
     def __init__(self) -> None:
         """Initialize a new game with default settings."""
         # Grid dimensions (in cells, not pixels)
@@ -0,0 +1,161 @@
+import argparse
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+import numpy as np
+import torch
+
+from agent import DQN
+from board import make_game
+from curriculum import Curriculum
+from simulation import end_episode, play_step
+
+
+def seed_everything(seed: int) -> None:
+    """Make a training run repeatable (game layout, exploration and weights)."""
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def train(
+    episodes: int = 200,
+    target_score: Optional[float] = None,
+    window: int = 20,
+    seed: Optional[int] = None,
+    grid_width: Optional[int] = None,
+    grid_height: Optional[int] = None,
+    agent: Optional[DQN] = None,
+    verbose: bool = False,
+    on_game: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    curriculum: Optional[Curriculum] = None,
+    **agent_kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Train an agent without a server, a client or any tick delays.
+
+    Args:
+        episodes: Maximum number of games to play
+        target_score: Stop as soon as the average score over the last
+            ``window`` games reaches this value (on the full board only,
+            when training with a curriculum)
+        window: Number of recent games in the average score
+        seed: Random seed for a reproducible run
+        grid_width: Board width (default: the Game default)
+        grid_height: Board height (default: the Game default)
+        agent: Continue training this agent instead of creating a new one
+        verbose: Print a line per finished game
+        on_game: Called after every game with its statistics plus the
+            running ``mean_score`` and ``steps``; returning True stops training
+        curriculum: Start on the curriculum's small boards and move up to
+            the ``grid_width`` x ``grid_height`` board as the agent improves
+        **agent_kwargs: Passed to ``DQN()`` (e.g. target_update, tau, double)
+
+    Returns:
+        Summary of the run: games, environment steps, seconds, average score,
+        record, whether the target score was reached, and the curriculum
+        stages with the game and step each one started at
+    """
+    if seed is not None:
+        seed_everything(seed)
+
+    if agent is None:
+        # Fresh weights, so the seed decides the starting network too
+        agent = DQN(share_model=False, **agent_kwargs)
+    agent.trainer  # Build the optimizer now, so setup isn't timed as training
+    if curriculum is not None:
+        game = curriculum.start(agent)
+    else:
+        game = make_game(grid_width, grid_height)  # Sparse LargeGame on very large boards
+
+    scores: Deque[int] = deque(maxlen=window)
+    steps = 0
+    reached = False
+    start = time.perf_counter()
+
+    while agent.n_games < episodes:
+        _, done = play_step(game, agent)
+        steps += 1
+        if not done:
+            continue
+
+        stats = end_episode(game, agent)
+        scores.append(stats["score"])
+        if verbose:
+            print(f"[TRAIN] Game {stats['games']} - Score: {stats['score']} - Record: {stats['record']}")
+
+        promoted = curriculum.on_game(agent, stats["score"], steps) if curriculum is not None else None
+
+        # Let the caller follow the score curve (and stop early); every
+        # game is reported, including one that earns a promotion
+        if on_game is not None and on_game(dict(stats, mean_score=float(np.mean(scores)), steps=steps)):
+            break
+
+        # Move to a bigger board once this one is mastered; the target
+        # score is only judged on the full board
+        if promoted is not None:
+            game = promoted
+            scores.clear()
+            if verbose:
+                print(f"[TRAIN] Curriculum stage {curriculum.stage}: "
+                      f"{game.grid_width}x{game.grid_height} board")
+            continue
+
+        # Stop once the moving average is good enough
+        if (
+            target_score is not None
+            and (curriculum is None or curriculum.final)
+            and len(scores) == window
+            and np.mean(scores) >= target_score
+        ):
+            reached = True
+            break
+
+    return {
+        "games": agent.n_games,
+        "steps": steps,
+        "seconds": time.perf_counter() - start,
+        "mean_score": float(np.mean(scores)) if scores else 0.0,
+        "record": agent.record,
+        "reached": reached,
+        "stages": curriculum.history if curriculum is not None else [],
+        "agent": agent,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the Snake agent without the web server")
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--target-score", type=float, default=None)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--grid-width", type=int, default=None)
+    parser.add_argument("--grid-height", type=int, default=None)
+    parser.add_argument("--target-update", type=int, default=0, help="steps between target-network syncs")
+    parser.add_argument("--tau", type=float, default=None, help="Polyak averaging rate for the target network")
+    parser.add_argument("--double", action="store_true", help="use Double DQN targets")
+    parser.add_argument("--observation", choices=["features", "grid"], default="features")
+    parser.add_argument("--curriculum", action="store_true", help="start on small boards and grow to the full one")
+    parser.add_argument("--save", action="store_true", help="save the trained model to ./models")
+    args = parser.parse_args()
+
+    result = train(
+        episodes=args.episodes,
+        target_score=args.target_score,
+        window=args.window,
+        seed=args.seed,
+        grid_width=args.grid_width,
+        grid_height=args.grid_height,
+        verbose=True,
+        target_update=args.target_update,
+        tau=args.tau,
+        double=args.double,
+        observation=args.observation,
+        curriculum=Curriculum(args.grid_width, args.grid_height) if args.curriculum else None,
+    )
+    agent = result.pop("agent")
+    print(f"[TRAIN] {result}")
+    if args.save:
+        agent.model.save()
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import multiprocessing
+import time
+from typing import List
+
+import socketio
+
+
+async def run_clients(url: str, sessions: int, duration: float, tick: float) -> int:
+    """Open ``sessions`` games on one event loop and count the frames received."""
+    frames = 0
+
+    def on_update(data: dict) -> None:
+        nonlocal frames
+        frames += 1
+
+    clients: List[socketio.AsyncClient] = []
+    for _ in range(sessions):
+        client = socketio.AsyncClient()
+        client.on("game_update", on_update)
+        # WebSocket only, so the connection is sticky to one worker in cluster mode
+        await client.connect(url, transports=["websocket"])
+        clients.append(client)
+
+    for client in clients:
+        await client.emit("start_game", {"game_tick": tick})
+
+    # Let every loop warm up, then measure a clean window
+    await asyncio.sleep(1.0)
+    start_frames = frames
+    await asyncio.sleep(duration)
+    measured = frames - start_frames
+
+    for client in clients:
+        await client.disconnect()
+    return measured
+
+
+def client_process(url: str, sessions: int, duration: float, tick: float, results: "multiprocessing.Queue") -> None:
+    """One load-generating process (keeps the client side from being the bottleneck)."""
+    results.put(asyncio.run(run_clients(url, sessions, duration, tick)))
+
+
+def main() -> None:
+    """Drive N concurrent games against a server and report sustained frame rates."""
+    parser = argparse.ArgumentParser(description="Load-test the Snake game server")
+    parser.add_argument("--url", default="http://localhost:8765")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[8, 16, 32, 64])
+    parser.add_argument("--procs", type=int, default=2, help="client processes")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--tick", type=float, default=0.03)
+    args = parser.parse_args()
+
+    nominal = 1.0 / args.tick
+    print(f"{'sessions':>8} {'frames/s':>10} {'fps/session':>12} {'of nominal':>10}")
+    for sessions in args.sessions:
+        results: "multiprocessing.Queue" = multiprocessing.Queue()
+        shares = [sessions // args.procs + (i < sessions % args.procs) for i in range(args.procs)]
+        procs = [
+            multiprocessing.Process(target=client_process, args=(args.url, share, args.duration, args.tick, results))
+            for share in shares if share
+        ]
+        for proc in procs:
+            proc.start()
+        total = sum(results.get() for _ in procs)
+        for proc in procs:
+            proc.join()
+
+        rate = total / args.duration
+        per_session = rate / sessions
+        print(f"{sessions:>8} {rate:>10.0f} {per_session:>12.1f} {per_session / nominal:>10.0%}")
+        time.sleep(1.0)
+
+
+if __name__ == "__main__":
+    main()
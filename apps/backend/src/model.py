@@ -1,13 +1,77 @@
+import numpy as np
 import torch
 import torch.optim as optim
 import torch.nn as nn
 import torch.nn.functional as F
 import os
+import copy
 import datetime
-from typing import Any
+from typing import Any, Optional
 
 
-class LinearQNet(nn.Module):
+def to_tensor(data: Any, dtype: torch.dtype) -> torch.Tensor:
+    """
+    Convert states, actions, etc. (one or a batch) to a tensor.
+
+    Batches of numpy observations (e.g. grid images) are stacked with a
+    single numpy call instead of letting torch walk them element by element.
+    """
+    if isinstance(data, np.ndarray):
+        return torch.from_numpy(data).to(dtype)
+    if isinstance(data, (list, tuple)) and len(data) and isinstance(data[0], np.ndarray):
+        return torch.from_numpy(np.stack(data)).to(dtype)
+    return torch.tensor(data, dtype=dtype)
+
+
+class QNetwork(nn.Module):
+    """
+    Base class for the Q-networks: saving and loading weights.
+
+    ``input_dims`` is the number of dimensions of one state (1 for a feature
+    vector, 3 for a channels x height x width image), which lets the trainer
+    tell a single experience from a batch.
+    """
+
+    input_dims = 1
+
+    def save(self, prefix: str = "model") -> str:
+        """
+        Save the trained model to disk with timestamp.
+
+        Returns:
+            The file name, as accepted by load()
+        """
+        # Create model directory if it doesn't exist
+        model_folder_path = './models'
+        if not os.path.exists(model_folder_path):
+            os.makedirs(model_folder_path)
+        
+        # Generate filename with timestamp
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_name = f'{prefix}_{timestamp}.pth'
+        file_path = os.path.join(model_folder_path, file_name)
+        
+        # Save the model state dictionary
+        torch.save(self.state_dict(), file_path)
+        print(f"Model saved to {file_path}")
+        return file_name
+
+    def load(self, file_name: str) -> None:
+        """Load a previously saved model from disk."""
+        # Construct full file path
+        model_folder_path = './models'
+        file_path = os.path.join(model_folder_path, file_name)
+        
+        # Load the model state dictionary
+        if os.path.exists(file_path):
+            self.load_state_dict(torch.load(file_path))
+            self.eval()
+            print(f"Model loaded from {file_path}")
+        else:
+            print(f"Model file not found: {file_path}")
+
+
+class LinearQNet(QNetwork):
     """
     A simple neural network for Q-learning in the Snake game.
 
@@ -48,35 +112,55 @@ class LinearQNet(nn.Module):
         x = self.linear2(x)
         return x
 
-    def save(self) -> None:
-        """Save the trained model to disk with timestamp."""
-        # Create model directory if it doesn't exist
-        model_folder_path = './models'
-        if not os.path.exists(model_folder_path):
-            os.makedirs(model_folder_path)
-        
-        # Generate filename with timestamp
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name = f'model_{timestamp}.pth'
-        file_path = os.path.join(model_folder_path, file_name)
-        
-        # Save the model state dictionary
-        torch.save(self.state_dict(), file_path)
-        print(f"Model saved to {file_path}")
 
-    def load(self, file_name: str) -> None:
-        """Load a previously saved model from disk."""
-        # Construct full file path
-        model_folder_path = './models'
-        file_path = os.path.join(model_folder_path, file_name)
-        
-        # Load the model state dictionary
-        if os.path.exists(file_path):
-            self.load_state_dict(torch.load(file_path))
-            self.eval()
-            print(f"Model loaded from {file_path}")
-        else:
-            print(f"Model file not found: {file_path}")
+class ConvQNet(QNetwork):
+    """
+    A small convolutional network for Q-learning on grid observations.
+
+    It sees the whole board as an image (see observation.py) instead of the
+    13 hand-made features:
+    - Two 3x3 convolutions with ReLU pick up local shapes (body, walls, food)
+    - Adaptive pooling to a fixed 4x4 map, so any board size works
+    - A fully connected head outputs the Q-values (straight, right, left)
+    """
+
+    input_dims = 3
+
+    def __init__(self, channels: int, output_size: int, hidden_size: int = 128) -> None:
+        """
+        Initialize the network layers.
+
+        Args:
+            channels: Number of observation planes (4 for GridEncoder)
+            output_size: Number of output actions (3: straight, right, left)
+            hidden_size: Neurons in the fully connected layer
+        """
+        super(ConvQNet, self).__init__()
+        self.conv1 = nn.Conv2d(channels, 16, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv2d(16, 32, kernel_size=3, stride=2, padding=1)
+        self.pool = nn.AdaptiveAvgPool2d((4, 4))
+        self.linear1 = nn.Linear(32 * 4 * 4, hidden_size)
+        self.linear2 = nn.Linear(hidden_size, output_size)
+
+    def forward(self, x: Any) -> Any:
+        """
+        Forward pass through the network.
+
+        Args:
+            x: One observation (channels, height, width) or a batch of them
+
+        Returns:
+            Output tensor with Q-values for each action
+        """
+        single = x.dim() == 3
+        if single:
+            x = x.unsqueeze(0)
+        x = F.relu(self.conv1(x))
+        x = F.relu(self.conv2(x))
+        x = self.pool(x).flatten(1)
+        x = F.relu(self.linear1(x))
+        x = self.linear2(x)
+        return x.squeeze(0) if single else x
 
 
 class QTrainer:
@@ -94,7 +178,15 @@ class QTrainer:
     - a' = possible actions in next state
     """
 
-    def __init__(self, model: Any, lr: float, gamma: float) -> None:
+    def __init__(
+        self,
+        model: Any,
+        lr: float,
+        gamma: float,
+        target_update: int = 0,
+        tau: Optional[float] = None,
+        double: bool = False,
+    ) -> None:
         """
         Initialize the trainer with model and hyperparameters.
 
@@ -102,20 +194,47 @@ class QTrainer:
             model: The neural network to train
             lr: Learning rate for the optimizer
             gamma: Discount factor for future rewards
+            target_update: Copy the model into a frozen target network every
+                this many training steps (0 = no target network)
+            tau: Instead of periodic copies, blend the target towards the
+                model after every step (Polyak averaging), e.g. 0.005
+            double: Double DQN - the model picks the next action, the target
+                network scores it (needs target_update or tau)
         """
         self.lr = lr
         self.gamma = gamma
         self.model = model
         
+        # Target network settings
+        self.target_update = target_update
+        self.tau = tau
+        self.double = double
+        self.steps = 0  # Training steps taken so far
+        
+        if double and not target_update and tau is None:
+            raise ValueError("Double DQN needs a target network (set target_update or tau)")
+        
+        # Frozen copy of the model used to compute the Bellman targets.
+        # Without it the targets move with every update we make.
+        self.target_model: Optional[nn.Module] = None
+        if target_update or tau is not None:
+            self.target_model = copy.deepcopy(model)
+            self.target_model.requires_grad_(False)
+        
         # Initialize Adam optimizer
         self.optimizer = optim.Adam(model.parameters(), lr=self.lr)
         
         # Initialize Mean Squared Error loss function
         self.criterion = nn.MSELoss()
 
+    def sync_target(self) -> None:
+        """Copy the model's current weights into the target network."""
+        if self.target_model is not None:
+            self.target_model.load_state_dict(self.model.state_dict())
+
     def train_step(
         self, state: Any, action: Any, reward: Any, next_state: Any, done: Any
-    ) -> None:
+    ) -> float:
         """
         Perform one training step on the neural network.
 
@@ -127,39 +246,62 @@ class QTrainer:
             reward: Reward(s) received
             next_state: Next game state(s)
             done: Whether the game ended
+
+        Returns:
+            The loss of this step
         """
         # Convert to tensors and handle both single experiences and batches
-        state = torch.tensor(state, dtype=torch.float)
-        next_state = torch.tensor(next_state, dtype=torch.float)
-        action = torch.tensor(action, dtype=torch.long)
-        reward = torch.tensor(reward, dtype=torch.float)
+        state = to_tensor(state, torch.float)
+        next_state = to_tensor(next_state, torch.float)
+        action = to_tensor(action, torch.long)
+        reward = to_tensor(reward, torch.float)
+        done = to_tensor(done, torch.bool)
         
         # If single experience, add batch dimension
-        if len(state.shape) == 1:
+        if state.dim() == self.model.input_dims:
             state = torch.unsqueeze(state, 0)
             next_state = torch.unsqueeze(next_state, 0)
             action = torch.unsqueeze(action, 0)
             reward = torch.unsqueeze(reward, 0)
-            done = (done, )
+            done = torch.unsqueeze(done, 0)
         
         # Get current Q-values from the model
         pred = self.model(state)
         
-        # Clone predictions to create target values
-        target = pred.clone()
+        # Value of the next state, from the target network if we have one.
+        # Targets are constants: no gradient flows through them.
+        with torch.no_grad():
+            evaluator = self.target_model if self.target_model is not None else self.model
+            next_q = evaluator(next_state)
+            if self.double:
+                # Model chooses the action, target network evaluates it
+                best = torch.argmax(self.model(next_state), dim=1, keepdim=True)
+                next_value = next_q.gather(1, best).squeeze(1)
+            else:
+                next_value = torch.max(next_q, dim=1).values
         
-        # Update target values using Bellman equation
-        for idx in range(len(done)):
-            Q_new = reward[idx]
-            if not done[idx]:
-                # Q_new = r + gamma * max(Q(s', a'))
-                Q_new = reward[idx] + self.gamma * torch.max(self.model(next_state[idx]))
-            
-            # Update the Q-value for the action taken
-            target[idx][torch.argmax(action[idx]).item()] = Q_new
+        # Bellman equation for the whole batch:
+        # Q_new = r + gamma * max(Q(s', a')), or just r when the game ended
+        q_new = reward + self.gamma * next_value * (~done)
+        
+        # Only the Q-value of the action taken is pushed towards Q_new
+        target = pred.detach().clone()
+        target[torch.arange(len(target)), torch.argmax(action, dim=1)] = q_new
         
         # Perform gradient descent
         self.optimizer.zero_grad()
         loss = self.criterion(target, pred)
         loss.backward()
-        self.optimizer.step()
\ No newline at end of file
+        self.optimizer.step()
+        
+        # Keep the target network trailing the model
+        self.steps += 1
+        if self.target_model is not None:
+            if self.tau is not None:
+                with torch.no_grad():
+                    for target_param, param in zip(self.target_model.parameters(), self.model.parameters()):
+                        target_param.mul_(1 - self.tau).add_(param, alpha=self.tau)
+            elif self.steps % self.target_update == 0:
+                self.sync_target()
+        
+        return loss.item()
@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Any, Optional, Tuple
+
+
+# Channels of the grid observation
+BODY = 0  # Every snake segment, head included
+HEAD = 1  # The head only
+FOOD = 2  # The food
+WALL = 3  # The one-cell border around the board
+NUM_CHANNELS = 4
+
+
+class GridEncoder:
+    """
+    Renders the whole board as a multi-channel image for a conv network.
+
+    The observation is a ``(NUM_CHANNELS, height + 2, width + 2)`` uint8
+    array: one 0/1 plane per kind of object, with a border of wall cells so
+    the edges of the board are visible too.
+
+    Rebuilding the image every tick would cost O(width * height). Instead the
+    encoder keeps one image and applies what ``Snake.move`` reports: a new
+    head and, unless the snake grew, the tail cell it left. That touches at
+    most five cells per tick whatever the board size. A full rebuild only
+    happens for a new snake (game reset) or if a move was missed.
+    """
+
+    def __init__(self, grid_width: int, grid_height: int) -> None:
+        """Create an empty image for a board of the given size."""
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.image = np.zeros((NUM_CHANNELS, grid_height + 2, grid_width + 2), dtype=np.uint8)
+
+        # Wall border (never changes)
+        self.image[WALL, 0, :] = 1
+        self.image[WALL, -1, :] = 1
+        self.image[WALL, :, 0] = 1
+        self.image[WALL, :, -1] = 1
+
+        # What the image currently shows
+        self.snake: Any = None
+        self.moves = 0
+        self.head: Optional[Tuple[int, int]] = None
+        self.food: Optional[Tuple[int, int]] = None
+
+    def rebuild(self, game: Any) -> None:
+        """Redraw the body, head and food planes from scratch."""
+        self.image[BODY:FOOD + 1] = 0
+        body = np.asarray(game.snake.body, dtype=np.intp).reshape(-1, 2)
+        self.image[BODY, body[:, 1] + 1, body[:, 0] + 1] = 1
+
+        self.snake = game.snake
+        self.moves = game.snake.moves
+        self.head = game.snake.head
+        self.image[HEAD, self.head[1] + 1, self.head[0] + 1] = 1
+        self.food = game.food.position
+        self.image[FOOD, self.food[1] + 1, self.food[0] + 1] = 1
+
+    def encode(self, game: Any) -> np.ndarray:
+        """
+        Bring the image up to date with ``game`` and return it.
+
+        The returned array is reused on the next call: copy it before keeping
+        it (e.g. in replay memory).
+        """
+        snake = game.snake
+        if snake is not self.snake or snake.moves not in (self.moves, self.moves + 1):
+            self.rebuild(game)
+            return self.image
+
+        # Exactly one move since last time: apply the delta
+        if snake.moves == self.moves + 1:
+            image = self.image
+            old_x, old_y = self.head
+            image[HEAD, old_y + 1, old_x + 1] = 0
+            new_x, new_y = snake.head
+            image[BODY, new_y + 1, new_x + 1] = 1
+            image[HEAD, new_y + 1, new_x + 1] = 1
+            if snake.last_tail is not None:
+                tail_x, tail_y = snake.last_tail
+                image[BODY, tail_y + 1, tail_x + 1] = 0
+            self.head = snake.head
+            self.moves = snake.moves
+
+        # Food may have respawned
+        food = game.food.position
+        if food != self.food:
+            self.image[FOOD, self.food[1] + 1, self.food[0] + 1] = 0
+            self.image[FOOD, food[1] + 1, food[0] + 1] = 1
+            self.food = food
+
+        return self.image
@@ -0,0 +1,96 @@
+import argparse
+import time
+from typing import Any, Dict
+
+import torch
+
+from agent import GAMMA, new_model
+from dataset import BatchStream, load_manifest
+from model import QTrainer
+
+
+# Define constants for offline pretraining
+PRETRAIN_BATCH_SIZE = 4096  # Much larger than online batches: data is already collected
+PRETRAIN_LR = 0.001
+PRETRAIN_TARGET_UPDATE = 200  # Offline Q-learning needs a stable target network
+REPORT_EVERY = 50  # Batches between progress lines
+
+
+def pretrain(
+    name: str,
+    epochs: int = 5,
+    batch_size: int = PRETRAIN_BATCH_SIZE,
+    lr: float = PRETRAIN_LR,
+    gamma: float = GAMMA,
+    target_update: int = PRETRAIN_TARGET_UPDATE,
+    seed: int = 0,
+    save: bool = True,
+) -> Dict[str, Any]:
+    """
+    Train a fresh network on a recorded-transition dataset.
+
+    The result is a normal model checkpoint in ./models, so a client can
+    warm-start with ``load_model`` instead of learning from random weights.
+
+    Args:
+        name: Dataset built by dataset.py
+        epochs: Passes over the dataset
+        batch_size: Transitions per training step
+        lr: Learning rate
+        gamma: Discount factor (same meaning as in the online agent)
+        target_update: Steps between target-network syncs
+        seed: Seed for the weights and the shuffling
+        save: Write the checkpoint to ./models
+
+    Returns:
+        Samples, seconds, samples/s, time waiting for data, final loss and
+        the checkpoint file name
+    """
+    torch.manual_seed(seed)
+    manifest = load_manifest(name)
+    model = new_model(manifest["observation"])
+    trainer = QTrainer(model, lr=lr, gamma=gamma, target_update=target_update)
+    stream = BatchStream(name, batch_size, epochs=epochs, seed=seed)
+
+    print(f"[PRETRAIN] {name}: {manifest['transitions']} transitions x {epochs} epochs, batches of {batch_size}")
+    samples = batches = 0
+    loss = 0.0
+    start = time.perf_counter()
+    for states, actions, rewards, next_states, dones in stream:
+        loss = trainer.train_step(states, actions, rewards, next_states, dones)
+        samples += len(rewards)
+        batches += 1
+        if batches % REPORT_EVERY == 0:
+            elapsed = time.perf_counter() - start
+            print(f"[PRETRAIN] {samples} samples, loss {loss:.4f}, {samples / elapsed:.0f} samples/s")
+    seconds = time.perf_counter() - start
+
+    result = {
+        "samples": samples,
+        "seconds": seconds,
+        "samples_per_sec": samples / seconds if seconds else 0.0,
+        "io_wait": stream.io_wait,
+        "loss": loss,
+        "file_name": model.save(prefix=f"pretrained_{name}") if save else None,
+    }
+    print(f"[PRETRAIN] {samples} samples in {seconds:.1f}s ({result['samples_per_sec']:.0f} samples/s, "
+          f"{stream.io_wait:.2f}s waiting for data), final loss {loss:.4f}")
+    if result["file_name"]:
+        print(f"[PRETRAIN] Warm start a session with load_model {{\"file_name\": \"{result['file_name']}\"}}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pretrain a Q-network offline on a recorded dataset")
+    parser.add_argument("name", help="dataset name (see dataset.py)")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=PRETRAIN_BATCH_SIZE)
+    parser.add_argument("--lr", type=float, default=PRETRAIN_LR)
+    parser.add_argument("--target-update", type=int, default=PRETRAIN_TARGET_UPDATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--threads", type=int, default=None, help="torch threads (default: torch's choice)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    pretrain(args.name, args.epochs, args.batch_size, args.lr, target_update=args.target_update, seed=args.seed)
@@ -0,0 +1,281 @@
+import os
+import re
+import secrets
+import struct
+import threading
+import time
+import zlib
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from game import Game
+
+
+# Define constants for episode recordings
+RECORDINGS_DIR = "./recordings"  # One .rec/.idx pair per recorded session
+CHUNK_TICKS = 256  # Ticks per compressed chunk (a seek decodes at most this many)
+COMPRESSION_LEVEL = 6  # zlib level for chunks
+
+# Recording ids are also file names, so only accept what new_recording_id() makes
+RECORDING_ID_PATTERN = re.compile(r"^[0-9a-f]{16}$")
+
+# One fixed-size index record per episode, so episode N is at N * size:
+# chunk table offset, ticks, final score, grid width/height, complete flag, start time
+INDEX_RECORD = struct.Struct("<QIIHHB3xd")
+
+# Chunk table entry (one per chunk of an episode): offset and size in the .rec file
+CHUNK_ENTRY = struct.Struct("<QI")
+
+# Start of every decompressed chunk: first tick, ticks, score, food x/y, body length
+CHUNK_HEADER = struct.Struct("<IHHhhH")
+
+# Per-tick columns, stored one after another inside a chunk:
+# name -> array typecode. Columns of similar values compress far better
+# than interleaved rows (the head deltas are all -1/0/1, food rarely changes).
+COLUMNS: List[Tuple[str, str]] = [
+    ("action", "B"),  # 0 = straight, 1 = right, 2 = left
+    ("dx", "b"),  # Head movement (0, 0 when the snake died this tick)
+    ("dy", "b"),
+    ("length", "H"),  # Body length after the tick
+    ("food_x", "h"),
+    ("food_y", "h"),
+    ("score", "H"),
+    ("reward", "f"),
+]
+
+
+def new_recording_id() -> str:
+    """A fresh id for a session's recording."""
+    return secrets.token_hex(8)
+
+
+def recording_paths(directory: str, recording_id: str) -> Tuple[str, str]:
+    """The data and index files of a recording."""
+    base = os.path.join(directory, recording_id)
+    return base + ".rec", base + ".idx"
+
+
+class EpisodeRecorder:
+    """
+    Appends every episode of one session to a compact recording.
+
+    Per tick only what changed is kept (action, head movement, length,
+    food, score, reward) in typed arrays, column by column. When an episode
+    ends it is cut into chunks of CHUNK_TICKS ticks; each chunk starts with
+    a keyframe (the full body) so it can be decoded on its own, and is
+    zlib-compressed. The ``.idx`` file has one fixed-size record per
+    episode, so finding an episode and the chunk holding a tick are two
+    direct reads, whatever the length of the recording.
+
+    Files are append-only and the index record is written last, so readers
+    only ever see complete episodes. ``record`` may be called from a worker
+    thread (turbo sessions); ``close`` from the event loop.
+    """
+
+    def __init__(self, recording_id: str, directory: str = RECORDINGS_DIR) -> None:
+        """Open (or continue) the recording ``recording_id``."""
+        os.makedirs(directory, exist_ok=True)
+        self.recording_id = recording_id
+        data_path, index_path = recording_paths(directory, recording_id)
+        self.data = open(data_path, "ab")
+        self.index = open(index_path, "ab")
+        self.lock = threading.Lock()
+        self.closed = False
+        self.episodes = self.index.tell() // INDEX_RECORD.size
+
+        # Current episode
+        self.columns: Dict[str, array] = {name: array(code) for name, code in COLUMNS}
+        self.keyframes: List[Tuple[int, List[Tuple[int, int]], Tuple[int, int], int]] = []
+        self.head: Tuple[int, int] = (0, 0)
+        self.grid = (0, 0)
+        self.started = 0.0
+
+    def begin(self, game: Game) -> None:
+        """Start recording a new episode from the game's current state."""
+        for column in self.columns.values():
+            del column[:]
+        self.keyframes = [(0, list(game.snake.body), game.food.position, game.score)]
+        self.head = game.snake.head
+        self.grid = (game.grid_width, game.grid_height)
+        self.started = time.time()
+
+    def record(self, game: Game, action: List[int], reward: float) -> None:
+        """Add one tick (call after ``game.step()``)."""
+        columns = self.columns
+        head = game.snake.head
+        columns["action"].append(action.index(1))
+        columns["dx"].append(head[0] - self.head[0])
+        columns["dy"].append(head[1] - self.head[1])
+        columns["length"].append(len(game.snake.body))
+        columns["food_x"].append(game.food.position[0])
+        columns["food_y"].append(game.food.position[1])
+        columns["score"].append(game.score)
+        columns["reward"].append(reward)
+        self.head = head
+
+        # Keyframe for the next chunk: the state it starts from
+        ticks = len(columns["action"])
+        if ticks % CHUNK_TICKS == 0:
+            self.keyframes.append((ticks, list(game.snake.body), game.food.position, game.score))
+
+    def finish(self, game: Game, complete: bool = True) -> None:
+        """Compress and append the current episode (call before ``game.reset()``)."""
+        with self.lock:
+            ticks = len(self.columns["action"])
+            if self.closed or not ticks:
+                return
+
+            # Compress each chunk: header + keyframe body + columns
+            chunks: List[bytes] = []
+            for first, body, food, score in self.keyframes:
+                if first >= ticks:
+                    break  # The episode ended right at a chunk boundary
+                count = min(CHUNK_TICKS, ticks - first)
+                parts = [
+                    CHUNK_HEADER.pack(first, count, score, food[0], food[1], len(body)),
+                    array("h", [c for cell in body for c in cell]).tobytes(),
+                ]
+                parts.extend(self.columns[name][first:first + count].tobytes() for name, _ in COLUMNS)
+                chunks.append(zlib.compress(b"".join(parts), COMPRESSION_LEVEL))
+
+            # Chunk table first, then the chunks, then the index record
+            table_offset = self.data.tell()
+            offset = table_offset + CHUNK_ENTRY.size * len(chunks)
+            table = []
+            for chunk in chunks:
+                table.append(CHUNK_ENTRY.pack(offset, len(chunk)))
+                offset += len(chunk)
+            self.data.write(b"".join(table) + b"".join(chunks))
+            self.data.flush()
+            self.index.write(INDEX_RECORD.pack(
+                table_offset, ticks, game.score, self.grid[0], self.grid[1], complete, self.started,
+            ))
+            self.index.flush()
+            self.episodes += 1
+
+    def close(self, game: Optional[Game] = None) -> None:
+        """Save the unfinished episode (if ``game`` is given) and close the files."""
+        if game is not None:
+            self.finish(game, complete=False)
+        with self.lock:
+            self.closed = True
+            self.data.close()
+            self.index.close()
+
+
+def apply_tick(body: List[Tuple[int, int]], dx: int, dy: int, length: int) -> None:
+    """Replay one tick on a body: move the head, then trim the tail to ``length``."""
+    if dx or dy:
+        head = body[0]
+        body.insert(0, (head[0] + dx, head[1] + dy))
+    del body[length:]
+
+
+class RecordingReader:
+    """
+    Random access to a recording written by EpisodeRecorder.
+
+    ``frames(episode, tick)`` starts at any tick after reading one index
+    record, one chunk table entry and one chunk.
+    """
+
+    def __init__(self, recording_id: str, directory: str = RECORDINGS_DIR) -> None:
+        """Open a recording (FileNotFoundError if there is none)."""
+        data_path, index_path = recording_paths(directory, recording_id)
+        self.data = open(data_path, "rb")
+        self.index = open(index_path, "rb")
+
+    def __len__(self) -> int:
+        """Number of complete episodes recorded so far."""
+        return os.fstat(self.index.fileno()).st_size // INDEX_RECORD.size
+
+    def episode(self, episode: int) -> Dict[str, Any]:
+        """Index record of an episode (IndexError if it doesn't exist)."""
+        if not 0 <= episode < len(self):
+            raise IndexError(f"No episode {episode} (recording has {len(self)})")
+        raw = os.pread(self.index.fileno(), INDEX_RECORD.size, episode * INDEX_RECORD.size)
+        table_offset, ticks, score, width, height, complete, started = INDEX_RECORD.unpack(raw)
+        return {
+            "table_offset": table_offset, "ticks": ticks, "score": score,
+            "grid_width": width, "grid_height": height,
+            "complete": bool(complete), "started": started,
+        }
+
+    def chunk(self, info: Dict[str, Any], number: int) -> Tuple[List[Tuple[int, int]], Dict[str, Any], Dict[str, array]]:
+        """
+        Decode one chunk of an episode.
+
+        Returns:
+            The keyframe body, the keyframe header fields and the columns
+        """
+        raw = os.pread(self.data.fileno(), CHUNK_ENTRY.size, info["table_offset"] + number * CHUNK_ENTRY.size)
+        offset, size = CHUNK_ENTRY.unpack(raw)
+        payload = zlib.decompress(os.pread(self.data.fileno(), size, offset))
+
+        first, count, score, food_x, food_y, body_len = CHUNK_HEADER.unpack_from(payload)
+        position = CHUNK_HEADER.size
+        cells = array("h")
+        cells.frombytes(payload[position:position + body_len * 4])
+        position += body_len * 4
+        body = list(zip(cells[0::2], cells[1::2]))
+
+        columns: Dict[str, array] = {}
+        for name, code in COLUMNS:
+            column = array(code)
+            width = column.itemsize * count
+            column.frombytes(payload[position:position + width])
+            position += width
+            columns[name] = column
+        header = {"first": first, "count": count, "score": score, "food": (food_x, food_y)}
+        return body, header, columns
+
+    def frames(self, episode: int, start_tick: int = 0) -> Iterator[Dict[str, Any]]:
+        """
+        Game states of an episode from ``start_tick`` on.
+
+        Each frame has the same fields as a ``game_update`` (snake, food,
+        score, grid size) plus the tick, the action and the reward that led
+        to it. Tick -1 is the state before the first move.
+        """
+        info = self.episode(episode)
+        start_tick = max(-1, min(start_tick, info["ticks"] - 1))
+        number = max(start_tick, 0) // CHUNK_TICKS
+        body, header, columns = self.chunk(info, number)
+
+        def frame(tick: int, food: Tuple[int, int], score: int, action: int, reward: float) -> Dict[str, Any]:
+            return {
+                "episode": episode, "tick": tick,
+                "grid_width": info["grid_width"], "grid_height": info["grid_height"],
+                "snake": list(body), "food": food, "score": score,
+                "running": tick < info["ticks"] - 1 or not info["complete"],
+                "action": action, "reward": reward,
+            }
+
+        if start_tick < 0:
+            yield frame(-1, header["food"], header["score"], -1, 0.0)
+
+        while True:
+            for i in range(header["count"]):
+                tick = header["first"] + i
+                apply_tick(body, columns["dx"][i], columns["dy"][i], columns["length"][i])
+                if tick >= start_tick:
+                    yield frame(
+                        tick, (columns["food_x"][i], columns["food_y"][i]), columns["score"][i],
+                        columns["action"][i], columns["reward"][i],
+                    )
+            number += 1
+            if number * CHUNK_TICKS >= info["ticks"]:
+                return
+            body, header, columns = self.chunk(info, number)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Ticks, score and size of every recorded episode."""
+        return [
+            {key: value for key, value in self.episode(n).items() if key != "table_offset"}
+            for n in range(len(self))
+        ]
+
+    def close(self) -> None:
+        """Close the files."""
+        self.data.close()
+        self.index.close()
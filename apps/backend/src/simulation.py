@@ -0,0 +1,146 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent import DQN
+from game import Game
+from recorder import EpisodeRecorder
+
+
+# Define constants for turbo (training-speed) sessions
+TURBO_FRAME_TIME = 1 / 30  # Seconds of simulation between preview frames (~30 fps)
+
+# Turning right/left from each direction: (dx, dy) -> new direction name
+RIGHT_TURNS = {(0, -1): "RIGHT", (1, 0): "DOWN", (0, 1): "LEFT", (-1, 0): "UP"}
+LEFT_TURNS = {(0, -1): "LEFT", (-1, 0): "DOWN", (0, 1): "RIGHT", (1, 0): "UP"}
+
+
+def apply_action(game: Game, action: List[int]) -> None:
+    """
+    Convert agent action to game direction change.
+
+    Actions: [1,0,0] = straight, [0,1,0] = right, [0,0,1] = left
+    """
+    if action[1] == 1:  # Turn right
+        game.queue_change(RIGHT_TURNS[game.snake.direction])
+    elif action[2] == 1:  # Turn left
+        game.queue_change(LEFT_TURNS[game.snake.direction])
+    # If action[0] == 1, continue straight (do nothing)
+
+
+def play_step(game: Game, agent: DQN, recorder: Optional[EpisodeRecorder] = None) -> Tuple[float, bool]:
+    """
+    Run one step of the observe -> act -> learn cycle.
+
+    If a ``recorder`` is given the tick is added to the session's recording.
+
+    Returns:
+        The reward for the step and whether the game ended
+    """
+    # Get current state and pick an action
+    current_state = agent.get_state(game)
+    action = agent.get_action(current_state)
+
+    # Apply the action and step the game forward
+    apply_action(game, action)
+    game.step()
+
+    # Observe the result and score it
+    new_state = agent.get_state(game)
+    done = not game.running
+    reward = agent.calculate_reward(game, done)
+    if recorder is not None:
+        recorder.record(game, action, reward)
+
+    # Train short memory (immediate learning) and remember the experience
+    agent.train_short_memory(current_state, action, reward, new_state, done)
+    agent.remember(current_state, action, reward, new_state, done)
+
+    return reward, done
+
+
+def end_episode(game: Game, agent: DQN, recorder: Optional[EpisodeRecorder] = None) -> Dict[str, Any]:
+    """
+    Book-keeping after a game ends: statistics, batch training and reset.
+
+    The finished episode is written to the ``recorder``, which then starts
+    recording the next one.
+
+    Returns:
+        The game-over statistics (score of the finished game, games, record)
+    """
+    # Update statistics
+    score = game.score
+    agent.n_games += 1
+    if score > agent.record:
+        agent.record = score
+
+    # Train long memory (batch learning)
+    agent.train_long_memory()
+
+    # Reset game and reward trackers for the next round
+    if recorder is not None:
+        recorder.finish(game)
+    game.reset()
+    agent.prev_distance = None
+    agent.prev_length = 1
+    if recorder is not None:
+        recorder.begin(game)
+
+    return {"score": score, "games": agent.n_games, "record": agent.record}
+
+
+class RateMeter:
+    """Steps per second, smoothed over roughly the last second."""
+
+    def __init__(self) -> None:
+        """Start measuring from now."""
+        self.window_start = time.perf_counter()
+        self.window_steps = 0
+        self.rate = 0.0
+
+    def add(self, steps: int = 1) -> None:
+        """Count completed steps and refresh the rate once per second."""
+        self.window_steps += steps
+        elapsed = time.perf_counter() - self.window_start
+        if elapsed >= 1.0:
+            self.rate = self.window_steps / elapsed
+            self.window_start += elapsed
+            self.window_steps = 0
+
+
+class TurboRunner:
+    """
+    Runs a session's simulation and learning as fast as the CPU allows.
+
+    Meant to be called from a worker thread (the compute pool): each call
+    simulates for a fixed slice of wall-clock time, with no tick sleeps or
+    game-over pauses, and hands back what the client needs to see.
+    """
+
+    def __init__(self, game: Game, agent: DQN, recorder: Optional[EpisodeRecorder] = None) -> None:
+        """Wrap the game and agent (and optional recorder) of one session."""
+        self.game = game
+        self.agent = agent
+        self.recorder = recorder
+        self.meter = RateMeter()
+
+    def run_for(self, seconds: float) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Simulate for ``seconds`` of wall-clock time.
+
+        Returns:
+            Game-over statistics for every episode finished in the slice,
+            and the state of the game at the end of the slice
+        """
+        episodes: List[Dict[str, Any]] = []
+        deadline = time.perf_counter() + seconds
+        steps = 0
+        while time.perf_counter() < deadline:
+            _, done = play_step(self.game, self.agent, self.recorder)
+            steps += 1
+            if done:
+                episodes.append(end_episode(self.game, self.agent, self.recorder))
+        self.meter.add(steps)
+
+        # Snapshot taken in the worker thread, so it is never half-updated
+        return episodes, self.game.to_dict()
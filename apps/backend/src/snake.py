@@ -1,5 +1,5 @@
 import random
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Optional
 
 
 class Snake:
@@ -10,6 +10,9 @@ class Snake:
     It can grow when eating food and will die if it hits walls or itself.
     """
 
+    # Fixed attribute layout (no per-instance __dict__)
+    __slots__ = ("game", "body", "head", "direction", "grow", "moves", "last_tail")
+
     def __init__(self, game: Any) -> None:
         """Initialize the snake at a random position near the center of the grid."""
         self.game = game
@@ -33,6 +36,12 @@ class Snake:
         # Flag to indicate if the snake should grow on the next move
         self.grow: bool = False
 
+        # What the last move changed, so observers can update incrementally:
+        # number of moves made so far and the tail cell the last move vacated
+        # (None if the snake grew instead)
+        self.moves: int = 0
+        self.last_tail: Optional[Tuple[int, int]] = None
+
     def move(self) -> None:
         """
         Move the snake forward in its current direction.
@@ -66,12 +75,14 @@ class Snake:
         # If we're not growing, remove the tail to maintain snake length
         # If we are growing, keep the tail to make the snake longer
         if not self.grow:
-            self.body.pop()  # Remove the last segment (tail)
+            self.last_tail = self.body.pop()  # Remove the last segment (tail)
         else:
             self.grow = False  # Reset growth flag after growing
+            self.last_tail = None
 
         # Update the head reference
         self.head = new_head
+        self.moves += 1
 
     def grow_snake(self) -> None:
         """
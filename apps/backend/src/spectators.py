@@ -0,0 +1,239 @@
+import secrets
+import socketio
+from typing import Any, Dict, Optional, Set
+
+from backpressure import outgoing_backlog
+
+
+# Define constants for spectator streams
+SWEEP_EVERY = 30  # Ticks between slow-viewer checks (keeps per-tick cost O(1))
+MAX_VIEWER_BACKLOG = 8  # Queued packets before a viewer counts as "slow"
+
+
+def room_for(game_id: str) -> str:
+    """Name of the Socket.IO room that spectators of a game join."""
+    return f"watch:{game_id}"
+
+
+def new_game_id() -> str:
+    """Random public name of a game (what spectators join and /games lists)."""
+    return secrets.token_hex(8)
+
+
+class GameFeed:
+    """
+    The spectator side of one running game.
+
+    Spectators get a full snapshot when they join (or when the snake resets)
+    and small deltas afterwards. A delta only needs the new head, the new
+    length and the food, because the body always moves head-first:
+    prepend the head and trim the tail to ``length``. A delta has no
+    ``head`` when the snake didn't move (the tick it died), so clients
+    never prepend the same head twice.
+    """
+
+    def __init__(self, owner: str, game: Any) -> None:
+        """Start a feed for ``game``, owned by the session ``owner``."""
+        self.owner = owner
+        self.game = game
+
+        # Owner sids are never published: viewers only ever see game_id
+        self.game_id = new_game_id()
+        self.room = room_for(self.game_id)
+
+        # Sequence number of the last published frame
+        self.seq = 0
+
+        # Viewers currently receiving deltas, and viewers skipping frames
+        self.viewers: Set[str] = set()
+        self.lagging: Set[str] = set()
+
+        # Identity of the snake we last published, to detect game resets,
+        # and how many moves it had made then
+        self.snake_id: Optional[int] = None
+        self.moves = 0
+
+        # Latest agent statistics, sent along with every snapshot
+        self.agent_stats: Dict[str, Any] = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full game state for a viewer that has no previous frames."""
+        state = self.game.to_dict()
+        state["seq"] = self.seq
+        state["game_id"] = self.game_id
+        state["agent_stats"] = self.agent_stats
+        return state
+
+    def delta(self) -> Dict[str, Any]:
+        """Changes since the previous frame (see class docstring)."""
+        snake = self.game.snake
+        delta = {
+            "seq": self.seq,
+            "length": len(snake.body),
+            "food": self.game.food.position,
+            "score": self.game.score,
+            "running": self.game.running,
+        }
+        if snake.moves != self.moves:
+            delta["head"] = snake.head
+        return delta
+
+
+class SpectatorHub:
+    """
+    Fan-out of game streams to any number of spectators.
+
+    Each game publishes once per tick into its own room. python-socketio
+    encodes a room emit a single time and hands the same packet to every
+    member, so an extra viewer costs a queue insert instead of a second
+    simulation or a second JSON encode.
+
+    Feeds are keyed by their owner's sid, but everything viewers see (the
+    spectate event, snapshots, /games) uses the feed's random public
+    ``game_id`` instead, so watching a game never reveals who plays it.
+
+    Slow viewers are handled by frame skipping: every ``SWEEP_EVERY`` ticks
+    viewers with a large outgoing backlog leave the room and stop receiving
+    frames. Once their backlog has drained they rejoin with a fresh snapshot,
+    so nothing is buffered on their behalf in between.
+    """
+
+    def __init__(self, sio: socketio.AsyncServer) -> None:
+        """Create an empty hub bound to a Socket.IO server."""
+        self.sio = sio
+        self.feeds: Dict[str, GameFeed] = {}
+
+        # Public game id -> feed, for the spectate event
+        self.public: Dict[str, GameFeed] = {}
+
+        # Which game each spectator is watching, by owner (for cleanup on disconnect)
+        self.watching: Dict[str, str] = {}
+
+    def open(self, owner: str, game: Any) -> str:
+        """
+        Register (or re-point) the feed for a game owner's session.
+
+        Returns the game's public id, which stays the same across re-points.
+        """
+        feed = self.feeds.get(owner)
+        if feed is None:
+            feed = self.feeds[owner] = GameFeed(owner, game)
+            self.public[feed.game_id] = feed
+        else:
+            feed.game = game
+            feed.snake_id = None  # Force a snapshot for existing viewers
+        return feed.game_id
+
+    async def close(self, owner: str) -> None:
+        """Stop a feed and tell its spectators the game is gone."""
+        feed = self.feeds.pop(owner, None)
+        if feed is None:
+            return
+        self.public.pop(feed.game_id, None)
+        for viewer in feed.viewers | feed.lagging:
+            self.watching.pop(viewer, None)
+        await self.sio.emit("spectate_ended", {"game_id": feed.game_id}, room=feed.room)
+        await self.sio.close_room(feed.room)
+
+    async def add_viewer(self, viewer: str, game_id: str) -> bool:
+        """
+        Start streaming a game to a viewer.
+
+        ``game_id`` is the public id returned by ``open``.
+        Returns False if there is no such game.
+        """
+        feed = self.public.get(game_id)
+        if feed is None:
+            return False
+
+        # Leave whatever this viewer was watching before
+        await self.remove_viewer(viewer)
+
+        # Join the room before building the snapshot: the join does not yield
+        # to the event loop, so the first delta the viewer sees is seq + 1
+        await self.sio.enter_room(viewer, feed.room)
+        feed.viewers.add(viewer)
+        self.watching[viewer] = feed.owner
+        await self.sio.emit("spectate_snapshot", feed.snapshot(), to=viewer)
+        return True
+
+    async def remove_viewer(self, viewer: str) -> None:
+        """Stop streaming to a viewer (no-op if it is not watching anything)."""
+        owner = self.watching.pop(viewer, None)
+        feed = self.feeds.get(owner) if owner else None
+        if feed is None:
+            return
+        feed.viewers.discard(viewer)
+        feed.lagging.discard(viewer)
+        await self.sio.leave_room(viewer, feed.room)
+
+    async def publish(self, owner: str, agent_stats: Dict[str, Any], keyframe: bool = False) -> None:
+        """
+        Broadcast the current frame of a game to its spectators.
+
+        Args:
+            owner: The owner's sid
+            agent_stats: Latest training statistics
+            keyframe: Send a full snapshot instead of a delta (needed when
+                frames were skipped, e.g. turbo previews)
+        """
+        feed = self.feeds.get(owner)
+        if feed is None:
+            return
+
+        feed.seq += 1
+        feed.agent_stats = agent_stats
+
+        # Nobody is watching: only keep the sequence number moving
+        if not feed.viewers and not feed.lagging:
+            feed.snake_id = id(feed.game.snake)
+            feed.moves = feed.game.snake.moves
+            return
+
+        # A new snake (game reset) can't be described as a delta
+        snake_id = id(feed.game.snake)
+        if keyframe or snake_id != feed.snake_id:
+            feed.snake_id = snake_id
+            await self.sio.emit("spectate_snapshot", feed.snapshot(), room=feed.room)
+        elif feed.viewers:
+            await self.sio.emit("spectate_delta", feed.delta(), room=feed.room)
+        feed.moves = feed.game.snake.moves
+
+        if feed.seq % SWEEP_EVERY == 0:
+            await self._sweep(feed)
+
+    async def publish_game_over(self, owner: str, payload: Dict[str, Any]) -> None:
+        """Forward a game-over notification to a game's spectators."""
+        feed = self.feeds.get(owner)
+        if feed is None or not feed.viewers:
+            return
+        await self.sio.emit("game_over", dict(payload, game_id=feed.game_id), room=feed.room)
+
+    async def _sweep(self, feed: GameFeed) -> None:
+        """Move slow viewers out of the room and bring caught-up ones back."""
+        for viewer in list(feed.viewers):
+            if outgoing_backlog(self.sio, viewer) > MAX_VIEWER_BACKLOG:
+                # Too far behind: stop sending frames (skip) until drained
+                feed.viewers.discard(viewer)
+                feed.lagging.add(viewer)
+                await self.sio.leave_room(viewer, feed.room)
+
+        for viewer in list(feed.lagging):
+            if outgoing_backlog(self.sio, viewer) == 0:
+                # Caught up: resume from the latest state
+                feed.lagging.discard(viewer)
+                feed.viewers.add(viewer)
+                await self.sio.enter_room(viewer, feed.room)
+                await self.sio.emit("spectate_snapshot", feed.snapshot(), to=viewer)
+
+    def summary(self) -> Dict[str, Any]:
+        """Live games, by public id, and their audience sizes (for the /games endpoint)."""
+        return {
+            game_id: {
+                "viewers": len(feed.viewers),
+                "lagging": len(feed.lagging),
+                "seq": feed.seq,
+                "score": feed.game.score,
+            }
+            for game_id, feed in self.public.items()
+        }
@@ -0,0 +1,259 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Define constants for the persistent stats store
+STATS_DB = "./stats.db"  # SQLite file holding every finished game
+FLUSH_INTERVAL = 1.0  # Seconds between batched writes
+FLUSH_BATCH = 5000  # Most games written in one transaction
+MAX_PENDING = 100_000  # Games buffered before new ones are dropped (disk stalled)
+CACHE_TTL = 2.0  # Seconds a query's JSON response is reused
+TOP_LIMIT = 100  # Largest leaderboard / history page served
+CURVE_BUCKETS = 100  # Points in a score-over-time curve
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run TEXT NOT NULL,
+    model TEXT NOT NULL,
+    game INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    record INTEGER NOT NULL,
+    grid_width INTEGER NOT NULL,
+    grid_height INTEGER NOT NULL,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC, finished);
+CREATE INDEX IF NOT EXISTS games_by_model ON games (model, finished);
+CREATE INDEX IF NOT EXISTS games_by_model_score ON games (model, score DESC, finished);
+CREATE INDEX IF NOT EXISTS games_by_run ON games (run, game);
+CREATE INDEX IF NOT EXISTS games_by_time ON games (finished);
+"""
+
+Row = Tuple[str, str, int, int, int, int, int, float]
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open the stats database (one connection per thread)."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # Queries don't wait for the writer
+    conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; a crash loses at most the last batch
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class StatsStore:
+    """
+    Every finished game, kept across restarts in SQLite.
+
+    ``add`` is what the game loops call at game over: it only puts a tuple
+    on a queue, never touches the disk and never blocks. A writer thread
+    drains the queue every FLUSH_INTERVAL seconds and inserts everything
+    in one transaction, so a thousand games over cost one commit rather
+    than a thousand. If the disk stalls for long enough that MAX_PENDING
+    games pile up, newer games are dropped (and counted) instead of
+    slowing the game loops down.
+
+    Nothing touches the disk until ``start``, so a store can be created at
+    import time (app.py starts it from main).
+
+    Queries (leaderboard, per-run and per-model history, score curves)
+    use the indexes in SCHEMA and return JSON bytes that are reused for
+    CACHE_TTL seconds, so a busy dashboard doesn't turn into a query per
+    request.
+    """
+
+    def __init__(
+        self,
+        db_path: str = STATS_DB,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        """An idle store; ``start`` opens the database and the writer thread."""
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+
+        self.pending: "queue.Queue[Optional[Row]]" = queue.Queue(maxsize=max_pending)
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+
+        # Queries run in executor threads, one read connection each
+        self.local = threading.local()
+        self.cache: Dict[Tuple[Any, ...], Tuple[float, bytes]] = {}
+        self.cache_lock = threading.Lock()  # Several executor threads share the cache
+
+        self.writer: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Create the database if needed and start the writer thread."""
+        if self.writer is not None:
+            raise RuntimeError("Stats store is already started")
+        connect(self.db_path).close()  # Create the schema before anyone queries
+        self.writer = threading.Thread(target=self.write_loop, name="stats-writer", daemon=True)
+        self.writer.start()
+
+    def add(self, run: str, model: str, game: int, score: int, record: int, grid_width: int, grid_height: int) -> None:
+        """
+        Queue one finished game for the next batch (non-blocking).
+
+        ``run`` is published by the leaderboard and history queries, so it
+        must be a public id (eviction.public_run_id), never a resume token.
+        """
+        try:
+            self.pending.put_nowait((run, model, game, score, record, grid_width, grid_height, time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def write_loop(self) -> None:
+        """Writer thread: insert whatever is queued, in batches, until close()."""
+        conn = connect(self.db_path)
+        running = True
+        while running:
+            # Wait for the first game, then give the rest of the interval
+            # to fill the batch (no wait while there's a backlog)
+            first = self.pending.get()
+            batch: List[Row] = []
+            if first is None:
+                running = False
+            else:
+                batch.append(first)
+                if self.pending.qsize() < FLUSH_BATCH:
+                    time.sleep(self.flush_interval)
+            while len(batch) < FLUSH_BATCH:
+                try:
+                    row = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    running = False
+                else:
+                    batch.append(row)
+            if batch:
+                self.write(conn, batch)
+        conn.close()
+
+    def write(self, conn: sqlite3.Connection, batch: List[Row]) -> None:
+        """Insert one batch in a single transaction."""
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO games (run, model, game, score, record, grid_width, grid_height, finished) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    batch,
+                )
+        except sqlite3.Error as e:
+            print(f"[ERROR][stats] lost {len(batch)} games -> {e}")
+            self.dropped += len(batch)
+            return
+        self.written += len(batch)
+        self.flushes += 1
+        self.flush_seconds += time.perf_counter() - start
+
+    def close(self) -> None:
+        """Write what is still queued and stop the writer."""
+        if self.writer is None:
+            return
+        self.pending.put(None)
+        self.writer.join()
+
+    def reader(self) -> sqlite3.Connection:
+        """This thread's read connection."""
+        if self.writer is None:
+            raise RuntimeError("Stats store is not started")
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = self.local.conn = sqlite3.connect(self.db_path, timeout=30)
+        return conn
+
+    def cached(self, key: Tuple[Any, ...], query: Any) -> bytes:
+        """JSON of ``query()``, reused for CACHE_TTL seconds per ``key``."""
+        now = time.monotonic()
+        with self.cache_lock:
+            hit = self.cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+        # The query itself runs unlocked, so a slow one doesn't hold up the rest
+        body = json.dumps(query()).encode()
+        with self.cache_lock:
+            self.cache[key] = (now + CACHE_TTL, body)
+            # Forget expired entries so odd query strings can't grow the cache forever
+            if len(self.cache) > 1000:
+                self.cache = {k: v for k, v in self.cache.items() if v[0] > now}
+        return body
+
+    def leaderboard(self, limit: int = 10, model: Optional[str] = None) -> bytes:
+        """The ``limit`` best games, of every model or of one."""
+        limit = max(1, min(limit, TOP_LIMIT))
+
+        def query() -> List[Dict[str, Any]]:
+            sql = "SELECT run, model, game, score, grid_width, grid_height, finished FROM games"
+            args: Tuple[Any, ...] = ()
+            if model is not None:
+                sql += " WHERE model = ?"
+                args = (model,)
+            rows = self.reader().execute(sql + " ORDER BY score DESC, finished LIMIT ?", args + (limit,))
+            keys = ("run", "model", "game", "score", "grid_width", "grid_height", "finished")
+            return [dict(zip(keys, row)) for row in rows]
+
+        return self.cached(("leaderboard", limit, model), query)
+
+    def history(self, run: Optional[str] = None, model: Optional[str] = None, limit: int = TOP_LIMIT) -> bytes:
+        """The latest ``limit`` games of one run or one model, oldest first."""
+        limit = max(1, min(limit, TOP_LIMIT))
+
+        def query() -> List[Dict[str, Any]]:
+            if run is not None:
+                sql = "SELECT game, score, record, finished FROM games WHERE run = ? ORDER BY game DESC LIMIT ?"
+                args: Tuple[Any, ...] = (run, limit)
+            else:
+                sql = "SELECT game, score, record, finished FROM games WHERE model = ? ORDER BY finished DESC LIMIT ?"
+                args = (model, limit)
+            rows = self.reader().execute(sql, args).fetchall()
+            keys = ("game", "score", "record", "finished")
+            return [dict(zip(keys, row)) for row in reversed(rows)]
+
+        return self.cached(("history", run, model, limit), query)
+
+    def curve(self, model: Optional[str] = None, since: float = 0.0, buckets: int = CURVE_BUCKETS) -> bytes:
+        """Mean and best score over time, in up to ``buckets`` equal time slices."""
+        buckets = max(1, min(buckets, CURVE_BUCKETS * 10))
+
+        def query() -> List[Dict[str, Any]]:
+            where = "WHERE finished >= ?"
+            args: Tuple[Any, ...] = (since,)
+            if model is not None:
+                where += " AND model = ?"
+                args += (model,)
+            conn = self.reader()
+            first, last = conn.execute(f"SELECT MIN(finished), MAX(finished) FROM games {where}", args).fetchone()
+            if first is None:
+                return []
+            width = max((last - first) / buckets, 1e-6)
+            rows = conn.execute(
+                f"SELECT MIN(CAST((finished - ?) / ? AS INTEGER), ?) AS bucket, "
+                f"COUNT(*), AVG(score), MAX(score) FROM games {where} GROUP BY bucket ORDER BY bucket",
+                (first, width, buckets - 1) + args,
+            )
+            return [
+                {"time": first + bucket * width, "games": games, "mean_score": round(mean, 3), "best": best}
+                for bucket, games, mean, best in rows
+            ]
+
+        return self.cached(("curve", model, since, buckets), query)
+
+    def stats(self) -> Dict[str, Any]:
+        """Writer throughput and backlog."""
+        return {
+            "pending": self.pending.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "mean_flush_ms": round(1000 * self.flush_seconds / self.flushes, 3) if self.flushes else 0.0,
+        }
@@ -0,0 +1,279 @@
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+
+import torch
+
+from headless import train
+
+
+# Define constants for hyperparameter sweeps
+SWEEP_DB = "./sweeps.db"  # SQLite file holding every sweep's results
+ETA = 3  # Successive halving keeps the best 1/ETA of trials at each rung
+
+# What a sweep searches over: DQN() argument -> (distribution, parameters)
+SEARCH_SPACE: Dict[str, Tuple[str, Any, Any]] = {
+    "lr": ("log", 1e-4, 1e-2),
+    "gamma": ("uniform", 0.8, 0.99),
+    "batch_size": ("choice", [250, 500, 1000, 2000], None),
+    "max_memory": ("choice", [10_000, 50_000, 100_000], None),
+    "epsilon_start": ("uniform", 40, 120),
+    "epsilon_decay": ("uniform", 40, 160),
+    "reward_closer": ("uniform", 0.0, 2.0),
+    "reward_away": ("uniform", -3.0, 0.0),
+    "reward_food": ("uniform", 5.0, 20.0),
+    "reward_death": ("uniform", -20.0, -5.0),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    sweep TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    games INTEGER NOT NULL DEFAULT 0,
+    steps INTEGER NOT NULL DEFAULT 0,
+    cpu_seconds REAL NOT NULL DEFAULT 0,
+    mean_score REAL,
+    record INTEGER NOT NULL DEFAULT 0,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS trials_by_sweep ON trials (sweep, games, mean_score);
+CREATE TABLE IF NOT EXISTS rungs (
+    trial_id INTEGER NOT NULL,
+    sweep TEXT NOT NULL,
+    rung INTEGER NOT NULL,
+    mean_score REAL NOT NULL,
+    PRIMARY KEY (trial_id, rung)
+);
+CREATE INDEX IF NOT EXISTS rungs_by_score ON rungs (sweep, rung, mean_score);
+CREATE TABLE IF NOT EXISTS curves (
+    trial_id INTEGER NOT NULL,
+    game INTEGER NOT NULL,
+    score INTEGER NOT NULL,
+    mean_score REAL NOT NULL,
+    record INTEGER NOT NULL,
+    PRIMARY KEY (trial_id, game)
+);
+"""
+
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """Open the results database (shared by every trial process)."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writing trials
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def sample_params(rng: random.Random) -> Dict[str, Any]:
+    """Draw one configuration from SEARCH_SPACE."""
+    params: Dict[str, Any] = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        if kind == "log":
+            params[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        elif kind == "uniform":
+            params[name] = rng.uniform(low, high)
+        else:
+            params[name] = rng.choice(low)
+    return params
+
+
+def rung_schedule(min_games: int, max_games: int, eta: int) -> List[int]:
+    """Game counts at which trials are compared: min, min*eta, ... up to max."""
+    rungs = []
+    games = min_games
+    while games < max_games:
+        rungs.append(games)
+        games *= eta
+    rungs.append(max_games)
+    return rungs
+
+
+def promotable(conn: sqlite3.Connection, sweep: str, rung: int, mean_score: float, eta: int) -> bool:
+    """
+    Asynchronous successive halving: may a trial continue past this rung?
+
+    A trial continues if it is in the top 1/eta of all trials that have
+    reached the rung so far. Nobody waits for stragglers, so the first
+    trials at a rung are judged against fewer rivals (and tend to be let
+    through); later ones face the full field.
+    """
+    rivals = conn.execute(
+        "SELECT COUNT(*), SUM(mean_score > ?) FROM rungs WHERE sweep = ? AND rung = ?",
+        (mean_score, sweep, rung),
+    ).fetchone()
+    reached, better = rivals[0], rivals[1] or 0
+    return better < max(1, reached // eta)
+
+
+def run_trial(
+    db_path: str,
+    sweep: str,
+    trial_id: int,
+    params: Dict[str, Any],
+    rungs: List[int],
+    window: int,
+    eta: int,
+    cpu_seconds: float,
+    threads: int,
+    seed: int,
+) -> Dict[str, Any]:
+    """
+    Train one configuration in a worker process, stopping early if it loses.
+
+    The trial gets ``threads`` torch threads and ``cpu_seconds`` of CPU
+    time; it ends when it completes the last rung, is eliminated at a rung,
+    or runs out of budget.
+    """
+    torch.set_num_threads(threads)
+    conn = connect(db_path)
+    conn.execute("UPDATE trials SET status = 'running', started = ? WHERE id = ?", (time.time(), trial_id))
+    conn.commit()
+
+    cpu_start = time.process_time()
+    curve: List[Tuple[int, int, int, float, int]] = []
+    outcome = {"status": "complete", "rung": 0}
+
+    def on_game(stats: Dict[str, Any]) -> bool:
+        curve.append((trial_id, stats["games"], stats["score"], stats["mean_score"], stats["record"]))
+
+        # Out of CPU budget
+        if time.process_time() - cpu_start > cpu_seconds:
+            outcome["status"] = "budget"
+            return True
+
+        if stats["games"] < rungs[outcome["rung"]]:
+            return False
+
+        # Reached a rung: record it and compare against the other trials
+        rung = outcome["rung"]
+        conn.executemany("INSERT OR REPLACE INTO curves VALUES (?, ?, ?, ?, ?)", curve)
+        curve.clear()
+        conn.execute(
+            "INSERT OR REPLACE INTO rungs VALUES (?, ?, ?, ?)",
+            (trial_id, sweep, rung, stats["mean_score"]),
+        )
+        conn.commit()
+        outcome["rung"] += 1
+        if outcome["rung"] == len(rungs):
+            return True
+        if not promotable(conn, sweep, rung, stats["mean_score"], eta):
+            outcome["status"] = "stopped"
+            return True
+        return False
+
+    result = train(episodes=rungs[-1], window=window, seed=seed, on_game=on_game, **params)
+
+    conn.executemany("INSERT OR REPLACE INTO curves VALUES (?, ?, ?, ?, ?)", curve)
+    conn.execute(
+        "UPDATE trials SET status = ?, games = ?, steps = ?, cpu_seconds = ?, mean_score = ?, "
+        "record = ?, finished = ? WHERE id = ?",
+        (
+            outcome["status"], result["games"], result["steps"], time.process_time() - cpu_start,
+            result["mean_score"], result["record"], time.time(), trial_id,
+        ),
+    )
+    conn.commit()
+    conn.close()
+    return {"id": trial_id, "status": outcome["status"], "games": result["games"], "mean_score": result["mean_score"]}
+
+
+def run_sweep(
+    name: str,
+    trials: int,
+    parallel: int,
+    min_games: int,
+    max_games: int,
+    eta: int = ETA,
+    window: int = 20,
+    cpu_seconds: float = 600.0,
+    threads: int = 1,
+    db_path: str = SWEEP_DB,
+    seed: int = 0,
+) -> None:
+    """Run ``trials`` random configurations, ``parallel`` at a time, with early stopping."""
+    rng = random.Random(seed)
+    rungs = rung_schedule(min_games, max_games, eta)
+    conn = connect(db_path)
+
+    # Register every trial up front so progress is visible in the database
+    jobs = []
+    for index in range(trials):
+        params = sample_params(rng)
+        cursor = conn.execute(
+            "INSERT INTO trials (sweep, params, status) VALUES (?, ?, 'pending')",
+            (name, json.dumps(params)),
+        )
+        jobs.append((cursor.lastrowid, params, seed + index))
+    conn.commit()
+
+    print(f"[SWEEP] {name}: {trials} trials, {parallel} in parallel, rungs at {rungs} games")
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=parallel, mp_context=context) as pool:
+        futures = {
+            pool.submit(run_trial, db_path, name, trial_id, params, rungs, window, eta, cpu_seconds, threads, trial_seed): trial_id
+            for trial_id, params, trial_seed in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # One broken trial must not end the sweep (or hide the report)
+                trial_id = futures[future]
+                print(f"[ERROR][sweep] trial {trial_id} -> {e!r}")
+                conn.execute("UPDATE trials SET status = 'failed', finished = ? WHERE id = ?", (time.time(), trial_id))
+                conn.commit()
+                continue
+            print(
+                f"[SWEEP] trial {result['id']} {result['status']} after {result['games']} games "
+                f"(mean score {result['mean_score']:.1f})"
+            )
+    print(f"[SWEEP] finished in {time.perf_counter() - start:.0f}s")
+    report(conn, name)
+
+
+def report(conn: sqlite3.Connection, sweep: str, top: int = 10) -> None:
+    """Print the best trials of a sweep: furthest rung first, then score."""
+    rows = conn.execute(
+        "SELECT id, status, games, steps, cpu_seconds, mean_score, record, params FROM trials "
+        "WHERE sweep = ? ORDER BY games DESC, mean_score DESC LIMIT ?",
+        (sweep, top),
+    ).fetchall()
+    print(f"{'trial':>5} {'status':>9} {'games':>6} {'steps':>8} {'cpu s':>7} {'mean':>6} {'record':>6}  params")
+    for trial_id, status, games, steps, cpu, mean, record, params in rows:
+        short = ", ".join(f"{k}={v:.3g}" for k, v in json.loads(params).items())
+        print(f"{trial_id:>5} {status:>9} {games:>6} {steps:>8} {cpu:>7.1f} {mean or 0:>6.1f} {record:>6}  {short}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hyperparameter sweep over headless training runs")
+    parser.add_argument("--name", default=time.strftime("sweep_%Y%m%d_%H%M%S"))
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--parallel", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--min-games", type=int, default=20)
+    parser.add_argument("--max-games", type=int, default=180)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--cpu-seconds", type=float, default=600.0, help="CPU budget per trial")
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per trial")
+    parser.add_argument("--db", default=SWEEP_DB)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", action="store_true", help="only print the results of --name")
+    args = parser.parse_args()
+
+    if args.report:
+        report(connect(args.db), args.name)
+    else:
+        run_sweep(
+            args.name, args.trials, args.parallel, args.min_games, args.max_games, args.eta,
+            args.window, args.cpu_seconds, args.threads, args.db, args.seed,
+        )
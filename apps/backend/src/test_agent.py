@@ -0,0 +1,34 @@
+import random
+
+from agent import GRID_MEMORY_BYTES, DQN
+from board import make_game
+from simulation import end_episode, play_step
+
+
+def play(agent: DQN, grid_width: int, grid_height: int, ticks: int) -> None:
+    """Run ``ticks`` training steps of ``agent`` on a fresh board."""
+    random.seed(0)
+    game = make_game(grid_width, grid_height)
+    for _ in range(ticks):
+        _, done = play_step(game, agent)
+        if done:
+            end_episode(game, agent)
+
+
+def test_grid_experiences_share_board_images() -> None:
+    agent = DQN(observation="grid")
+    play(agent, 10, 10, 300)
+
+    memory = list(agent.memory)
+    for experience, following in zip(memory, memory[1:]):
+        if not experience[4]:
+            assert experience[3] is following[0]
+
+
+def test_grid_memory_is_bounded_by_bytes() -> None:
+    agent = DQN(observation="grid")
+    play(agent, 64, 64, 10)
+
+    frame_bytes = agent.memory[0][0].nbytes
+    assert agent.memory.maxlen == GRID_MEMORY_BYTES // frame_bytes
+    assert agent.memory.maxlen * frame_bytes <= GRID_MEMORY_BYTES
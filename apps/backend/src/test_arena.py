@@ -0,0 +1,79 @@
+from agent import REWARD_AWAY, REWARD_CLOSER, REWARD_DEATH, REWARD_FOOD
+from arena import Arena, Cell
+
+
+def place(arena: Arena, snake_id: int, body: list, direction: Cell) -> None:
+    """Put snake ``snake_id`` on the board with ``body`` (head first), heading ``direction``."""
+    snake = arena.snakes[snake_id]
+    for cell in snake.body:
+        del arena.occupancy[cell]
+    snake.body.clear()
+    snake.body.extend(body)
+    snake.direction = direction
+    snake.alive = True
+    snake.grow = False
+    for cell in body:
+        arena.occupancy[cell] = snake_id
+
+
+def two_snake_arena() -> Arena:
+    """A 10x10 arena with two snakes and no food."""
+    return Arena(10, 10, snakes=2, foods=0, seed=0)
+
+
+def test_length_one_snakes_swapping_cells_both_die() -> None:
+    arena = two_snake_arena()
+    place(arena, 0, [(4, 5)], (1, 0))
+    place(arena, 1, [(5, 5)], (-1, 0))
+
+    _, dones = arena.step([0, 0])
+
+    assert dones.tolist() == [True, True]
+
+
+def test_longer_snakes_meeting_head_on_both_die() -> None:
+    arena = two_snake_arena()
+    place(arena, 0, [(4, 5), (3, 5)], (1, 0))
+    place(arena, 1, [(5, 5), (6, 5)], (-1, 0))
+
+    _, dones = arena.step([0, 0])
+
+    assert dones.tolist() == [True, True]
+
+
+def test_head_may_follow_a_tail_into_the_cell_it_left() -> None:
+    arena = two_snake_arena()
+    place(arena, 0, [(4, 5)], (1, 0))
+    place(arena, 1, [(5, 5)], (1, 0))
+
+    _, dones = arena.step([0, 0])
+
+    assert dones.tolist() == [False, False]
+    assert list(arena.snakes[0].body) == [(5, 5)]
+    assert list(arena.snakes[1].body) == [(6, 5)]
+
+
+def test_rewards_add_up_like_calculate_reward() -> None:
+    arena = Arena(10, 10, snakes=1, foods=0, seed=0)
+    place(arena, 0, [(2, 5)], (1, 0))
+    arena.foods.add((5, 5))
+
+    rewards = [arena.step([0])[0][0] for _ in range(3)]
+
+    # First move only measures the distance; then closer, then closer + food
+    assert rewards == [0, REWARD_CLOSER, REWARD_CLOSER + REWARD_FOOD]
+    assert arena.snakes[0].score == 1
+
+
+def test_moving_away_and_dying_rewards() -> None:
+    arena = Arena(10, 10, snakes=1, foods=0, seed=0)
+    place(arena, 0, [(2, 5)], (1, 0))
+    arena.foods.add((5, 5))
+    arena.step([0])
+
+    away, _ = arena.step([1])  # Turn down into (3, 6), away from the food
+    assert away[0] == REWARD_AWAY
+
+    place(arena, 0, [(9, 5)], (1, 0))
+    rewards, dones = arena.step([0])  # Into the wall
+    assert dones[0] and rewards[0] == REWARD_DEATH
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+
+from agent import DQN
+from batch_rewards import BatchRewards, EpisodeStats
+from game import Game
+from simulation import apply_action
+
+
+def test_batched_rewards_match_calculate_reward() -> None:
+    rng = random.Random(0)
+    random.seed(0)
+    games = [Game() for _ in range(50)]
+    agents = [DQN() for _ in games]
+    batch = BatchRewards(len(games))
+    stats = EpisodeStats()
+    scores = []
+
+    for _ in range(300):
+        for game in games:
+            move = [0, 0, 0]
+            # Mostly straight, with enough turns to survive a while and eat
+            move[0 if rng.random() < 0.7 else rng.randint(1, 2)] = 1
+            apply_action(game, move)
+            game.step()
+        heads = np.array([game.snake.head for game in games])
+        foods = np.array([game.food.position for game in games])
+        lengths = np.array([len(game.snake.body) for game in games])
+        dones = np.array([not game.running for game in games])
+
+        expected = [agent.calculate_reward(game, not game.running) for game, agent in zip(games, agents)]
+        assert batch(heads, foods, lengths, dones).tolist() == expected
+
+        stats.update(np.array([game.score for game in games]), dones)
+        for game, agent, done in zip(games, agents, dones):
+            if done:
+                scores.append(game.score)
+                agent.prev_distance = None
+                agent.prev_length = 1
+                game.reset()
+
+    summary = stats.stats()
+    assert scores and summary["episodes"] == len(scores)
+    assert summary["record"] == max(scores)
+    assert summary["mean_score"] == sum(scores) / len(scores)
@@ -0,0 +1,70 @@
+import asyncio
+import os
+
+from agent import DQN
+from eviction import EvictionManager, new_token
+from game import Game
+from simulation import end_episode, play_step
+
+
+def trained_agent(observation: str = "features") -> DQN:
+    """An agent with weights, optimizer state and replay memory of its own."""
+    game, agent = Game(), DQN(observation=observation)
+    while agent.n_games < 2:
+        _, done = play_step(game, agent)
+        if done:
+            end_episode(game, agent)
+    return agent
+
+
+def test_suspended_session_resumes_with_its_training(tmp_path) -> None:
+    agent = trained_agent()
+    evictions = EvictionManager(str(tmp_path), park_seconds=0)
+    token = new_token()
+
+    async def round_trip() -> dict:
+        await evictions.park(token, Game(), agent, turbo=True)
+        assert os.listdir(tmp_path) == [f"{token}.pt"]
+        return await evictions.resume(token)
+
+    resumed = asyncio.run(round_trip())
+
+    restored = resumed["agent"]
+    assert resumed["turbo"] is True
+    assert restored.n_games == agent.n_games
+    assert len(restored.memory) == len(agent.memory)
+    assert restored.memory[0][2] == agent.memory[0][2]
+    for name, weights in agent.model.state_dict().items():
+        assert restored.model.state_dict()[name].equal(weights)
+    assert os.listdir(tmp_path) == []
+
+
+def test_resume_during_a_write_waits_for_the_writer(tmp_path) -> None:
+    agent = trained_agent()
+    evictions = EvictionManager(str(tmp_path))
+    token = new_token()
+    written = []
+    write = evictions.write
+    evictions.write = lambda *args: written.append(write(*args))
+
+    async def race() -> dict:
+        await evictions.park(token, Game(), agent, turbo=False)
+        suspend = asyncio.create_task(evictions.suspend(token))
+        await asyncio.sleep(0)  # The write has started
+        assert token in evictions.writing
+        resumed = await evictions.resume(token)
+        # Handed back only after the snapshot is complete
+        assert written and resumed["agent"] is agent
+        await suspend
+        return resumed
+
+    asyncio.run(race())
+
+    # The snapshot of a resumed session is never left behind
+    assert os.listdir(tmp_path) == []
+    assert evictions.suspended == 0 and evictions.resumed == 1
+
+
+def test_unknown_token_resumes_nothing(tmp_path) -> None:
+    evictions = EvictionManager(str(tmp_path))
+    assert asyncio.run(evictions.resume(new_token())) is None
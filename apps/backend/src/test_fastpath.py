@@ -0,0 +1,67 @@
+import asyncio
+from typing import Any, Callable, List
+
+import numpy as np
+
+from fastpath import (
+    ACTION_RIGHT, CONTROL_CLIENT, ERROR, FLAG_RESET, FLAG_RUNNING, OP_ERROR, OP_START, OP_STARTED, OP_STATE,
+    OP_STOP, START, STARTED, STATE, STOP, FastPathConnection, decode_states, encode_actions, request_game_id,
+)
+
+
+class FakeSocket:
+    """Collects what the server sends."""
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.sent: List[bytes] = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.sent.append(data)
+
+
+async def run_inline(session: Any, fn: Callable[..., Any], *args: Any) -> Any:
+    """Stand-in for ComputePool.run."""
+    return fn(*args)
+
+
+def test_client_game_round_trip() -> None:
+    ws = FakeSocket()
+    connection = FastPathConnection(ws, run_inline)
+
+    async def play() -> None:
+        await connection.receive(START.pack(OP_START, 7, 20, 20, 1, CONTROL_CLIENT))
+        snake = connection.games[7].game.snake
+        snake.body[:] = [(5, 5)]
+        snake.head = (5, 5)
+        snake.direction = (1, 0)
+        await connection.receive(encode_actions([(7, ACTION_RIGHT), (99, ACTION_RIGHT)]))
+        while not any(message[0] == OP_STATE for message in ws.sent):
+            await asyncio.sleep(0.001)
+        await connection.receive(STOP.pack(OP_STOP, 7))
+        await asyncio.sleep(0.01)
+        connection.close()
+
+    asyncio.run(play())
+
+    op, width, height = STARTED.unpack_from(ws.sent[0])
+    started = np.frombuffer(ws.sent[0], dtype=STATE, offset=STARTED.size)
+    assert (op, width, height) == (OP_STARTED, 20, 20)
+    assert started["game"].tolist() == [7] and started["flags"][0] == FLAG_RUNNING | FLAG_RESET
+
+    tick_ms, tick, records = decode_states(ws.sent[1])
+    assert (ws.sent[1][0], tick_ms, tick) == (OP_STATE, 1, 1)
+    # Turned right from heading right: one cell down
+    assert records[["game", "head_x", "head_y", "length"]].tolist() == [(7, 5, 6, 1)]
+    assert records["flags"][0] & FLAG_RUNNING
+    assert connection.games == {}
+
+
+def test_error_replies_name_the_game_when_they_can() -> None:
+    assert request_game_id(STOP.pack(OP_STOP, 9)) == 9
+    assert request_game_id(START.pack(OP_START, 3, 0, 0, 0, 0)) == 3
+    assert request_game_id(bytes([OP_START, 1])) == 0  # Too short to hold a game id
+    assert request_game_id(b"") == 0
+
+    message = ERROR.pack(OP_ERROR, 9) + "bad".encode()
+    assert ERROR.unpack_from(message) == (OP_ERROR, 9) and message[ERROR.size:] == b"bad"
@@ -0,0 +1,17 @@
+from curriculum import Curriculum
+from headless import train
+
+
+def test_every_game_reaches_on_game_including_promotions() -> None:
+    # Promote after every 2 games, whatever the score
+    curriculum = Curriculum(24, 24, stages=[(0.5, 0.0, 80), (0.75, 0.0, 80), (1.0, None, 80)], window=2)
+    reported = []
+
+    def on_game(stats: dict) -> bool:
+        reported.append(stats["games"])
+        return False
+
+    result = train(episodes=8, seed=0, curriculum=curriculum, on_game=on_game)
+
+    assert [stage["games"] for stage in result["stages"]] == [0, 2, 4]
+    assert reported == list(range(1, 9))
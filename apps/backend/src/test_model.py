@@ -0,0 +1,67 @@
+import pytest
+import torch
+
+from model import LinearQNet, QTrainer
+
+
+def experience() -> tuple:
+    """One non-terminal experience for a 4-input network."""
+    return [0.1, 0.2, 0.3, 0.4], [0, 1, 0], 1.0, [0.4, 0.3, 0.2, 0.1], False
+
+
+def parameters(model: torch.nn.Module) -> list:
+    return [param.detach().clone() for param in model.parameters()]
+
+
+def test_polyak_target_trails_the_model() -> None:
+    torch.manual_seed(0)
+    trainer = QTrainer(LinearQNet(4, 8, 3), lr=0.01, gamma=0.9, tau=0.1)
+    with torch.no_grad():
+        for param in trainer.target_model.parameters():
+            param.add_(1.0)  # Start the target away from the model
+    before = parameters(trainer.target_model)
+
+    trainer.train_step(*experience())
+
+    for old, new, model in zip(before, trainer.target_model.parameters(), trainer.model.parameters()):
+        assert torch.allclose(new, 0.9 * old + 0.1 * model.detach())
+
+
+def test_target_is_synced_every_target_update_steps() -> None:
+    torch.manual_seed(0)
+    trainer = QTrainer(LinearQNet(4, 8, 3), lr=0.01, gamma=0.9, target_update=3)
+    initial = parameters(trainer.target_model)
+
+    for _ in range(2):
+        trainer.train_step(*experience())
+    assert all(torch.equal(a, b) for a, b in zip(initial, trainer.target_model.parameters()))
+
+    trainer.train_step(*experience())
+    assert all(torch.equal(a, b) for a, b in zip(trainer.model.parameters(), trainer.target_model.parameters()))
+
+
+def test_double_dqn_target() -> None:
+    torch.manual_seed(0)
+    trainer = QTrainer(LinearQNet(4, 8, 3), lr=0.0, gamma=0.9, tau=0.0, double=True)
+    trainer.target_model = LinearQNet(4, 8, 3)  # Disagrees with the model
+    state, action, reward, next_state, done = experience()
+
+    with torch.no_grad():
+        pred = trainer.model(torch.tensor(state))[1]
+        online = trainer.model(torch.tensor(next_state))
+        # Make the target network prefer another action than the model
+        list(trainer.target_model.parameters())[-1][(int(online.argmax()) + 1) % 3] += 5.0
+        target = trainer.target_model(torch.tensor(next_state))
+    double = reward + 0.9 * target[online.argmax()]
+    plain = reward + 0.9 * target.max()
+    assert double != plain
+
+    loss = trainer.train_step(state, action, reward, next_state, done)
+
+    # Only the taken action's Q-value differs from the prediction
+    assert loss == pytest.approx(float((double - pred) ** 2 / 3), rel=1e-5)
+
+
+def test_double_dqn_needs_a_target_network() -> None:
+    with pytest.raises(ValueError):
+        QTrainer(LinearQNet(4, 8, 3), lr=0.01, gamma=0.9, double=True)
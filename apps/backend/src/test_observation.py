@@ -0,0 +1,33 @@
+import random
+
+import numpy as np
+
+from game import Game
+from observation import GridEncoder
+from simulation import apply_action
+
+
+def test_incremental_image_matches_a_rebuild() -> None:
+    random.seed(0)
+    rng = random.Random(0)
+    game = Game()
+    encoder = GridEncoder(game.grid_width, game.grid_height)
+    episodes = meals = 0
+
+    for _ in range(2000):
+        move = [0, 0, 0]
+        move[0 if rng.random() < 0.7 else rng.randint(1, 2)] = 1
+        apply_action(game, move)
+        score = game.score
+        game.step()
+        meals += game.score > score
+        if not game.running:
+            game.reset()
+            episodes += 1
+
+        fresh = GridEncoder(game.grid_width, game.grid_height)
+        fresh.rebuild(game)
+        assert np.array_equal(encoder.encode(game), fresh.image)
+
+    # Both growing and resets were covered
+    assert meals > 0 and episodes > 0
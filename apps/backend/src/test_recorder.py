@@ -0,0 +1,64 @@
+import random
+
+import recorder
+from game import Game
+from recorder import EpisodeRecorder, RecordingReader, new_recording_id
+from simulation import apply_action
+
+
+def record_episodes(directory: str, episodes: int) -> list:
+    """Play and record random episodes; returns the states after every tick."""
+    random.seed(0)
+    rng = random.Random(0)
+    game = Game()
+    writer = EpisodeRecorder("0123456789abcdef", directory)
+    writer.begin(game)
+    played = [[]]
+    while len(played) <= episodes:
+        move = [0, 0, 0]
+        move[0 if rng.random() < 0.7 else rng.randint(1, 2)] = 1
+        apply_action(game, move)
+        game.step()
+        writer.record(game, move, 1.5)
+        played[-1].append((list(game.snake.body), game.food.position, game.score, move.index(1)))
+        if not game.running:
+            writer.finish(game)
+            game.reset()
+            writer.begin(game)
+            played.append([])
+    writer.close()
+    return played[:episodes]
+
+
+def test_recorded_episodes_replay_exactly(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(recorder, "CHUNK_TICKS", 4)  # Several chunks per episode
+    played = record_episodes(str(tmp_path), 5)
+
+    reader = RecordingReader("0123456789abcdef", str(tmp_path))
+    assert len(reader) == 5
+    for episode, ticks in enumerate(played):
+        info = reader.episode(episode)
+        assert info["ticks"] == len(ticks) and info["complete"]
+        frames = [frame for frame in reader.frames(episode) if frame["tick"] >= 0]
+        assert [(f["snake"], f["food"], f["score"], f["action"]) for f in frames] == ticks
+        assert all(frame["reward"] == 1.5 for frame in frames)
+    reader.close()
+
+
+def test_seeking_into_an_episode(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(recorder, "CHUNK_TICKS", 4)
+    played = record_episodes(str(tmp_path), 3)
+    episode = max(range(3), key=lambda n: len(played[n]))
+    start = len(played[episode]) - 3
+
+    reader = RecordingReader("0123456789abcdef", str(tmp_path))
+    frames = list(reader.frames(episode, start))
+    reader.close()
+
+    assert [frame["tick"] for frame in frames] == list(range(start, len(played[episode])))
+    assert [frame["snake"] for frame in frames] == [state[0] for state in played[episode][start:]]
+    assert not frames[-1]["running"]
+
+
+def test_recording_ids_are_file_name_safe() -> None:
+    assert recorder.RECORDING_ID_PATTERN.match(new_recording_id())
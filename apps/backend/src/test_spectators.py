@@ -0,0 +1,62 @@
+import asyncio
+import random
+from typing import Any, List, Tuple
+
+from game import Game
+from spectators import SpectatorHub
+
+
+class FakeServer:
+    """Records emits; rooms are not needed to test what gets sent."""
+
+    def __init__(self) -> None:
+        self.emitted: List[Tuple[str, Any]] = []
+
+    async def emit(self, event: str, data: Any, **kwargs: Any) -> None:
+        self.emitted.append((event, data))
+
+    async def enter_room(self, *args: Any) -> None:
+        pass
+
+    async def leave_room(self, *args: Any) -> None:
+        pass
+
+    async def close_room(self, *args: Any) -> None:
+        pass
+
+
+def test_deltas_rebuild_the_body_up_to_game_over() -> None:
+    random.seed(1)
+    sio = FakeServer()
+    hub = SpectatorHub(sio)
+    game = Game()
+
+    async def watch() -> list:
+        await hub.add_viewer("viewer", hub.open("owner", game))
+        body: list = []
+        while game.running:
+            game.step()
+            await hub.publish("owner", {})
+            event, frame = sio.emitted[-1]
+            if event == "spectate_snapshot":
+                body = [tuple(cell) for cell in frame["snake"]]
+            else:
+                if "head" in frame:
+                    body.insert(0, frame["head"])
+                del body[frame["length"]:]
+        return body
+
+    body = asyncio.run(watch())
+
+    assert body == game.snake.body
+    # The snake didn't move on the tick it died
+    assert "head" not in sio.emitted[-1][1] and not sio.emitted[-1][1]["running"]
+
+
+def test_games_are_listed_and_joined_by_public_id() -> None:
+    hub = SpectatorHub(FakeServer())
+    game_id = hub.open("owner", Game())
+
+    assert list(hub.summary()) == [game_id] and game_id != "owner"
+    assert not asyncio.run(hub.add_viewer("viewer", "owner"))
+    assert asyncio.run(hub.add_viewer("viewer", game_id))
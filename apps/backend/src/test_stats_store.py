@@ -0,0 +1,31 @@
+import json
+import os
+
+from stats_store import StatsStore
+
+
+def test_store_touches_nothing_until_started(tmp_path) -> None:
+    path = str(tmp_path / "stats.db")
+    store = StatsStore(path)
+    store.add("run", "features", 1, 5, 5, 29, 19)
+    store.close()
+
+    assert not os.path.exists(path)
+    assert store.writer is None
+
+
+def test_finished_games_are_written_and_queried(tmp_path) -> None:
+    store = StatsStore(str(tmp_path / "stats.db"), flush_interval=0)
+    store.start()
+    for game, score in enumerate([3, 9, 1]):
+        store.add("run-a", "features", game + 1, score, 9, 29, 19)
+    store.add("run-b", "grid", 1, 7, 7, 29, 19)
+    store.close()
+
+    assert store.stats()["written"] == 4
+    best = json.loads(store.leaderboard(2))
+    assert [(row["run"], row["score"]) for row in best] == [("run-a", 9), ("run-b", 7)]
+    history = json.loads(store.history(run="run-a"))
+    assert [row["score"] for row in history] == [3, 9, 1]
+    curve = json.loads(store.curve("grid"))
+    assert [(point["games"], point["best"]) for point in curve] == [(1, 7)]
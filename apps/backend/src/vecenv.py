@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import socketio
+
+from agent import DQN
+from batch_rewards import BatchRewards, EpisodeStats
+from board import LARGE_BOARD_CELLS, LargeGame, make_game
+from game import Game
+from simulation import apply_action
+
+
+# Define constants for client-driven environments
+VECENV_MAX_GAMES = 4096  # Games in one environment
+ONE_HOT = ([1, 0, 0], [0, 1, 0], [0, 0, 1])  # Action index -> agent action (straight, right, left)
+
+
+class VecEnv:
+    """
+    M games stepped in lockstep by an external agent (gym-style vector env).
+
+    ``step()`` takes one action per game (0 = straight, 1 = right,
+    2 = left) and returns every game's observation, reward and done flag.
+    Observations and rewards are exactly what a server-side DQN would see
+    (``get_state``, and ``calculate_reward`` as computed for the whole
+    batch by BatchRewards), so a network trained remotely can be loaded
+    into a session and vice versa.
+
+    Games that end are reset on the spot: their row in the returned
+    observations is the first state of the next episode, and the finished
+    score is reported in ``scores``.
+    """
+
+    def __init__(
+        self,
+        games: int,
+        grid_width: Optional[int] = None,
+        grid_height: Optional[int] = None,
+        observation: str = "features",
+    ) -> None:
+        """Create ``games`` games of the given size."""
+        if not 1 <= games <= VECENV_MAX_GAMES:
+            raise ValueError(f"An environment holds 1 to {VECENV_MAX_GAMES} games")
+        self.games: List[Game] = [make_game(grid_width, grid_height) for _ in range(games)]
+        if observation == "grid" and isinstance(self.games[0], LargeGame):
+            raise ValueError(f"The grid observation needs a board of at most {LARGE_BOARD_CELLS} cells")
+
+        # One untrained agent per game, only to observe it (they share the
+        # initial network and never allocate memory)
+        self.trackers: List[DQN] = [DQN(observation=observation) for _ in range(games)]
+        self.observation = observation
+        self.rewards = BatchRewards(games)
+        self.episode_stats = EpisodeStats()
+
+        self.steps = 0  # Lockstep steps taken
+        self.step_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def observe(self) -> np.ndarray:
+        """Current observations of every game, stacked."""
+        dtype = np.uint8 if self.observation == "grid" else np.float32
+        return np.stack([
+            np.asarray(tracker.get_state(game), dtype=dtype) for game, tracker in zip(self.games, self.trackers)
+        ])
+
+    def reset(self) -> np.ndarray:
+        """Start a new episode in every game and return the observations."""
+        for game in self.games:
+            game.reset()
+        self.rewards.reset(slice(None))
+        return self.observe()
+
+    def step(self, actions: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """
+        Apply one action per game and advance every game one tick.
+
+        Returns:
+            Observations, rewards (float32), dones (bool) and the scores
+            of the episodes that ended
+        """
+        if len(actions) != len(self.games):
+            raise ValueError(f"Expected {len(self.games)} actions, got {len(actions)}")
+        if not self.step_lock.acquire(blocking=False):
+            raise RuntimeError("A step is already in progress")
+        try:
+            # Step every game, noting what the rewards need before resets
+            count = len(self.games)
+            heads = np.empty((count, 2), dtype=np.int64)
+            foods = np.empty((count, 2), dtype=np.int64)
+            lengths = np.empty(count, dtype=np.int64)
+            scores = np.empty(count, dtype=np.int64)
+            dones = np.empty(count, dtype=np.bool_)
+            for i, (game, action) in enumerate(zip(self.games, actions)):
+                apply_action(game, ONE_HOT[action])
+                game.step()
+                heads[i] = game.snake.head
+                foods[i] = game.food.position
+                lengths[i] = len(game.snake.body)
+                scores[i] = game.score
+                dones[i] = not game.running
+                if dones[i]:
+                    game.reset()
+
+            rewards = self.rewards(heads, foods, lengths, dones)
+            self.episode_stats.update(scores, dones)
+            self.steps += 1
+            return self.observe(), rewards, dones, scores[dones].tolist()
+        finally:
+            self.step_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Steps plus the episode statistics of all games (see EpisodeStats)."""
+        return dict(self.episode_stats.stats(), games=len(self.games), steps=self.steps)
+
+
+def pack_observations(observations: np.ndarray) -> Dict[str, Any]:
+    """Observations as a binary attachment plus what is needed to rebuild the array."""
+    return {
+        "observations": observations.tobytes(),
+        "shape": list(observations.shape),
+        "dtype": observations.dtype.str,
+    }
+
+
+def unpack_observations(message: Dict[str, Any]) -> np.ndarray:
+    """Client side: the observation array of an env_create or env_step reply."""
+    return np.frombuffer(message["observations"], dtype=message["dtype"]).reshape(message["shape"])
+
+
+class RemoteVecEnv:
+    """
+    Client for a VecEnv on a game server (the ``env_create`` and
+    ``env_step`` Socket.IO events).
+    """
+
+    def __init__(self, url: str) -> None:
+        """Talk to the server at ``url``."""
+        self.url = url
+        self.sio = socketio.AsyncClient()
+
+    async def create(self, games: int, **options: Any) -> np.ndarray:
+        """Connect and create the environment; returns the first observations."""
+        if not self.sio.connected:
+            await self.sio.connect(self.url, transports=["websocket"])
+        return unpack_observations(await self.call("env_create", dict(options, games=games)))
+
+    async def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """One lockstep step of every game on the server."""
+        reply = await self.call("env_step", {"actions": np.asarray(actions, dtype=np.uint8).tobytes()})
+        rewards = np.frombuffer(reply["rewards"], dtype=np.float32)
+        dones = np.frombuffer(reply["dones"], dtype=np.bool_)
+        return unpack_observations(reply), rewards, dones, reply["scores"]
+
+    async def call(self, event: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and wait for the server's reply."""
+        reply = await self.sio.call(event, data)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def close(self) -> None:
+        """Drop the environment and disconnect."""
+        await self.sio.disconnect()
+
+
+class RemotePool:
+    """
+    VecEnvs on several game servers, stepped together as one batch.
+
+    Actions are split by server and every server steps concurrently, so a
+    trainer can gather rollouts from a pool of game processes.
+    """
+
+    def __init__(self, urls: List[str]) -> None:
+        """One RemoteVecEnv per server URL."""
+        self.envs = [RemoteVecEnv(url) for url in urls]
+        self.sizes: List[int] = []
+
+    async def create(self, games_per_server: int, **options: Any) -> np.ndarray:
+        """Create an environment on every server; returns all first observations."""
+        observations = await asyncio.gather(*(env.create(games_per_server, **options) for env in self.envs))
+        self.sizes = [len(o) for o in observations]
+        return np.concatenate(observations)
+
+    async def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        """One lockstep step of every game on every server."""
+        bounds = np.cumsum([0] + self.sizes)
+        results = await asyncio.gather(*(
+            env.step(actions[bounds[i]:bounds[i + 1]]) for i, env in enumerate(self.envs)
+        ))
+        return (
+            np.concatenate([r[0] for r in results]),
+            np.concatenate([r[1] for r in results]),
+            np.concatenate([r[2] for r in results]),
+            [score for r in results for score in r[3]],
+        )
+
+    async def close(self) -> None:
+        """Close every environment."""
+        await asyncio.gather(*(env.close() for env in self.envs))
+
+
+async def rollout(urls: List[str], games: int, steps: int) -> None:
+    """Random-action rollouts against a pool of servers, reporting throughput."""
+    pool = RemotePool(urls)
+    observations = await pool.create(games)
+    total = len(observations)
+    print(f"[VECENV] {total} games on {len(urls)} servers, observations {observations.shape[1:]}")
+    rng = np.random.default_rng(0)
+    episodes: List[int] = []
+    start = time.perf_counter()
+    for _ in range(steps):
+        observations, rewards, dones, scores = await pool.step(rng.integers(0, 3, total))
+        episodes.extend(scores)
+    seconds = time.perf_counter() - start
+    await pool.close()
+    print(f"[VECENV] {steps} steps in {seconds:.2f}s: {steps / seconds:.0f} steps/s, "
+          f"{steps * total / seconds:.0f} game steps/s, {len(episodes)} episodes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random rollouts through remote VecEnvs")
+    parser.add_argument("--url", nargs="+", default=["http://localhost:8765"])
+    parser.add_argument("--games", type=int, default=64, help="games per server")
+    parser.add_argument("--steps", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(rollout(args.url, args.games, args.steps))
@@ -12,6 +12,12 @@ interface GameState {
   food: [number, number];
   score: number;
   running?: boolean;
+  resume_token?: string;
+  // Arena mode (several snakes on one board)
+  snakes?: { id: number; body: [number, number][]; score: number }[];
+  foods?: [number, number][];
+  // Large boards: only this window around the head is sent (board coordinates)
+  viewport?: { x: number; y: number; width: number; height: number };
   agent_stats?: {
     games: number;
     record: number;
@@ -19,17 +25,34 @@ interface GameState {
   };
 }
 
+// Large boards: whole-board overview, sent every few ticks
+interface Minimap {
+  size: number;
+  bin_width: number;
+  bin_height: number;
+  head: [number, number];
+  snake: ArrayBuffer; // size x size row-major counts (uint8)
+  foods: ArrayBuffer;
+}
+
+const MINIMAP_PX = 160;
+
 export default function Home() {
   const canvasRef = useRef<HTMLCanvasElement>(null);
   const socketRef = useRef<Socket>();
   const [game, setGame] = useState<GameState | null>(null);
   const [connected, setConnected] = useState(false);
   const [isTraining, setIsTraining] = useState(false);
+  // Lets a reconnecting client continue its previous training session
+  const resumeTokenRef = useRef<string | null>(null);
+  const minimapRef = useRef<Minimap | null>(null);
 
   // === Connect to backend & listen for updates ===
   useEffect(() => {
     if (!socketRef.current) {
-      socketRef.current = io("http://localhost:8765");
+      // WebSocket only: keeps the connection on one worker when the backend
+      // runs as several processes (cluster.py)
+      socketRef.current = io("http://localhost:8765", { transports: ["websocket"] });
 
       const socket = socketRef.current;
 
@@ -46,6 +69,9 @@ export default function Home() {
 
       const onGameStarted = (data: GameState) => {
         console.log("[GAME_STARTED]", data);
+        if (data.resume_token) {
+          resumeTokenRef.current = data.resume_token;
+        }
         setGame(data);
         setIsTraining(true);
       };
@@ -54,6 +80,10 @@ export default function Home() {
         setGame(data);
       };
 
+      const onMinimap = (data: Minimap) => {
+        minimapRef.current = data;
+      };
+
       const onGameOver = (data: { score: number; games: number; record: number }) => {
         console.log("[GAME_OVER] Game:", data.games, "Score:", data.score, "Record:", data.record);
         // Don't show overlay - AI will auto-restart
@@ -68,6 +98,7 @@ export default function Home() {
       socket.on("game_started", onGameStarted);
       socket.on("game_update", onGameUpdate);
       socket.on("game_over", onGameOver);
+      socket.on("minimap", onMinimap);
       socket.on("error", onError);
 
       return () => {
@@ -76,6 +107,7 @@ export default function Home() {
         socket.off("game_started", onGameStarted);
         socket.off("game_update", onGameUpdate);
         socket.off("game_over", onGameOver);
+        socket.off("minimap", onMinimap);
         socket.off("error", onError);
         socket.disconnect();
       };
@@ -89,15 +121,18 @@ export default function Home() {
 
     if (!ctx || !game) return;
 
+    // Cells on screen: the whole board, or the viewport of a large board
+    const view = game.viewport ?? { x: 0, y: 0, width: game.grid_width, height: game.grid_height };
+
     // Resize canvas to fill available space under header
     const containerWidth = window.innerWidth;
     const containerHeight = window.innerHeight - HEADER_HEIGHT_PX;
     const cellSize = Math.floor(
-      Math.min(containerWidth / game.grid_width, containerHeight / game.grid_height)
+      Math.min(containerWidth / view.width, containerHeight / view.height)
     );
 
-    canvas.width = game.grid_width * cellSize;
-    canvas.height = game.grid_height * cellSize;
+    canvas.width = view.width * cellSize;
+    canvas.height = view.height * cellSize;
 
     // Clear canvas
     ctx.clearRect(0, 0, canvas.width, canvas.height);
@@ -109,26 +144,42 @@ export default function Home() {
     // Draw grid lines
     ctx.strokeStyle = "#1a1a1a";
     ctx.lineWidth = 1;
-    for (let x = 0; x <= game.grid_width; x++) {
+    for (let x = 0; x <= view.width; x++) {
       ctx.beginPath();
       ctx.moveTo(x * cellSize, 0);
       ctx.lineTo(x * cellSize, canvas.height);
       ctx.stroke();
     }
-    for (let y = 0; y <= game.grid_height; y++) {
+    for (let y = 0; y <= view.height; y++) {
       ctx.beginPath();
       ctx.moveTo(0, y * cellSize);
       ctx.lineTo(canvas.width, y * cellSize);
       ctx.stroke();
     }
 
-    // Draw snake
+    // Draw the other snakes and food items of an arena
+    if (Array.isArray(game.snakes)) {
+      game.snakes.forEach((other) => {
+        ctx.fillStyle = `hsl(${(other.id * 47) % 360}, 60%, 45%)`;
+        other.body.forEach((segment) => {
+          ctx.fillRect((segment[0] - view.x) * cellSize + 1, (segment[1] - view.y) * cellSize + 1, cellSize - 2, cellSize - 2);
+        });
+      });
+    }
+    if (Array.isArray(game.foods)) {
+      ctx.fillStyle = "#ef4444";
+      game.foods.forEach(([fx, fy]) => {
+        ctx.fillRect((fx - view.x) * cellSize + 1, (fy - view.y) * cellSize + 1, cellSize - 2, cellSize - 2);
+      });
+    }
+
+    // Draw snake (the leader, in an arena)
     if (Array.isArray(game.snake)) {
       game.snake.forEach((segment, index) => {
         ctx.fillStyle = index === 0 ? "#22c55e" : "#4ade80"; // head is darker green
         ctx.fillRect(
-          segment[0] * cellSize + 1,
-          segment[1] * cellSize + 1,
+          (segment[0] - view.x) * cellSize + 1,
+          (segment[1] - view.y) * cellSize + 1,
           cellSize - 2,
           cellSize - 2
         );
@@ -143,8 +194,8 @@ export default function Home() {
       ctx.shadowColor = "#ef4444";
       ctx.beginPath();
       ctx.arc(
-        fx * cellSize + cellSize / 2,
-        fy * cellSize + cellSize / 2,
+        (fx - view.x) * cellSize + cellSize / 2,
+        (fy - view.y) * cellSize + cellSize / 2,
         cellSize / 3,
         0,
         2 * Math.PI
@@ -153,6 +204,31 @@ export default function Home() {
       ctx.shadowBlur = 0;
     }
 
+    // Draw the minimap of a large board (top right)
+    const minimap = minimapRef.current;
+    if (game.viewport && minimap) {
+      const bin = MINIMAP_PX / minimap.size;
+      const left = canvas.width - MINIMAP_PX - 4;
+      const snakeBins = new Uint8Array(minimap.snake);
+      const foodBins = new Uint8Array(minimap.foods);
+      ctx.fillStyle = "rgba(0, 0, 0, 0.7)";
+      ctx.fillRect(left, 4, MINIMAP_PX, MINIMAP_PX);
+      for (let i = 0; i < foodBins.length; i++) {
+        if (snakeBins[i] || foodBins[i]) {
+          ctx.fillStyle = snakeBins[i] ? "#4ade80" : `rgba(239, 68, 68, ${Math.min(1, foodBins[i] / 8)})`;
+          ctx.fillRect(left + (i % minimap.size) * bin, 4 + Math.floor(i / minimap.size) * bin, bin, bin);
+        }
+      }
+      // Outline of the current viewport
+      ctx.strokeStyle = "white";
+      ctx.strokeRect(
+        left + (view.x / minimap.bin_width) * bin,
+        4 + (view.y / minimap.bin_height) * bin,
+        Math.max(2, (view.width / minimap.bin_width) * bin),
+        Math.max(2, (view.height / minimap.bin_height) * bin)
+      );
+    }
+
     // Draw stats overlay (top left)
     const fontSize = Math.max(14, Math.floor(cellSize * 0.7));
     ctx.font = `${fontSize}px monospace`;
@@ -186,14 +262,15 @@ export default function Home() {
         if (canvas) {
           const ctx = canvas.getContext("2d");
           if (ctx) {
+            const view = game.viewport ?? { width: game.grid_width, height: game.grid_height };
             const cellSize = Math.floor(
               Math.min(
-                window.innerWidth / game.grid_width,
-                (window.innerHeight - HEADER_HEIGHT_PX) / game.grid_height
+                window.innerWidth / view.width,
+                (window.innerHeight - HEADER_HEIGHT_PX) / view.height
               )
             );
-            canvas.width = game.grid_width * cellSize;
-            canvas.height = game.grid_height * cellSize;
+            canvas.width = view.width * cellSize;
+            canvas.height = view.height * cellSize;
           }
         }
       }
@@ -208,6 +285,7 @@ export default function Home() {
         grid_width: 29,
         grid_height: 19,
         game_tick: 0.05,
+        resume_token: resumeTokenRef.current,
       });
     }
   };